@@ -17,12 +17,14 @@ function App() {
   const [timer, setTimer] = useState(20);
   const [finished, setFinished] = useState(false);
   const timerRef = useRef(null);
+  const manifestRef = useRef(null);                // signed list of the quizzed words
 
   // 拉取题目
   useEffect(() => {
     (async () => {
       try {
         const res = await fetch('/quiz/?user_id=anonymous&limit=10');
+        manifestRef.current = res.headers?.get('X-Quiz-Manifest') ?? null;
         const data = await res.json();
         setQuestions(Array.isArray(data) ? data : [data]);
       } catch (e) {
@@ -67,12 +69,13 @@ function App() {
     if (finished) {
       (async () => {
         try {
-          await fetch('/quiz/feedback', {             // ③ 根据实际接口改路径
+          await fetch('/quiz/quiz_result', {          // ③
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
               user_id: 'anonymous',
-              wrong_word_ids: wrongWordIds
+              wrong_word_ids: wrongWordIds,
+              manifest: manifestRef.current           // echo it back so the server can check IDs in memory
             })
           });
         } catch (e) {
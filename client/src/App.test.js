@@ -195,4 +195,26 @@ describe('App Component', () => {
       expect(screen.getByText('Time Left: 20s')).toBeInTheDocument();
     });
   });
+
+  test('submits the result with the quiz manifest', async () => {
+    fetch.mockResolvedValueOnce({
+      headers: { get: (name) => (name === 'X-Quiz-Manifest' ? 'signed-manifest' : null) },
+      json: async () => [mockQuizData[0]],
+    });
+    fetch.mockResolvedValueOnce({ json: async () => ({}) });
+
+    renderWithRouter(<App />);
+
+    await waitFor(() => {
+      expect(screen.getByText('kia ora')).toBeInTheDocument();
+    });
+    fireEvent.click(screen.getByText('goodbye'));
+    fireEvent.click(await screen.findByText('Finish'));
+
+    await waitFor(() => {
+      expect(fetch).toHaveBeenCalledWith('/quiz/quiz_result', expect.objectContaining({ method: 'POST' }));
+    });
+    const body = JSON.parse(fetch.mock.calls[1][1].body);
+    expect(body).toEqual({ user_id: 'anonymous', wrong_word_ids: ['1'], manifest: 'signed-manifest' });
+  });
 });
\ No newline at end of file
@@ -2,10 +2,11 @@ import secrets
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, status
-from passlib.context import CryptContext
+from pymongo import ASCENDING
 from pymongo.errors import DuplicateKeyError
 
 from app.db.mongodb import db
+from app.db.indexes import declare_index, declare_query
 from app.constants import COLLECTION_USERS, COLLECTION_CODES
 from app.schema.auth import (
     RegisterRequest, RegisterResponse,
@@ -13,15 +14,38 @@ from app.schema.auth import (
     LoginRequest, LoginResponse,
 )
 from app.core.config import settings
+from app.core.security import pwd_ctx, password_pool, PasswordPoolSaturated
 from app.utils.email import send_verification_email
 
 router = APIRouter(tags=["auth"])
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+declare_index(COLLECTION_USERS, "username", unique=True)
+declare_index(COLLECTION_USERS, "email", unique=True)
+declare_index(COLLECTION_CODES, [("email", ASCENDING), ("code", ASCENDING)])
+# MongoDB deletes codes once expires_at has passed
+declare_index(COLLECTION_CODES, "expires_at", expire_after_seconds=0)
+declare_query(COLLECTION_USERS, "register uniqueness",
+              {"$or": [{"username": "alice"}, {"email": "alice@example.com"}]})
+declare_query(COLLECTION_USERS, "login", {"username": "alice"})
+declare_query(COLLECTION_CODES, "verify code", {"email": "alice@example.com", "code": "abc123"})
 
 # Helper to hash passwords
 def hash_password(plain: str) -> str:
     return pwd_ctx.hash(plain)
 
+async def run_password_job(fn, *args):
+    """
+    Run a bcrypt call on the password pool; 429 when the pool is saturated.
+    """
+    try:
+        return await password_pool.run(fn, *args)
+    except PasswordPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many password checks in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
 @router.post(
         "/register",
         response_model=RegisterResponse,
@@ -45,9 +69,10 @@ async def register(
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
     # 2) insert user and generate verification code
+    password_hash = await run_password_job(hash_password, req.password)
     user = {
         "username": req.username,
-        "password_hash": hash_password(req.password),
+        "password_hash": password_hash,
         "email": req.email,
         "email_verified": False,
         "created_at": datetime.utcnow(),
@@ -77,7 +102,7 @@ async def register(
 async def verify(req: VerifyRequest):
     """
     1) Look up code record by email.
-    2) Reject if not found, wrong, or expired.
+    2) Reject if not found, wrong, or expired (expired records are removed by a TTL index).
     3) Mark user.email_verified=True and delete code record.
     """
     coll = db[COLLECTION_CODES]
@@ -86,8 +111,6 @@ async def verify(req: VerifyRequest):
     if not record:
         raise HTTPException(status_code=400, detail="Invalid code")
     if record["expires_at"] < datetime.utcnow():
-        # delete expired
-        await coll.delete_one({"_id": record["_id"]})
         raise HTTPException(status_code=400, detail="Code has expired")
 
     # mark user
@@ -105,7 +128,7 @@ async def login(req: LoginRequest):
     """
     1) Look up user by user id.
     2) Reject if user not found or email not verified.
-    3) Check password using bcrypt.
+    3) Check password using bcrypt (on the password worker pool, off the event loop).
     4) Return success message (or token in future).
     """
     user = await db[COLLECTION_USERS].find_one({"username": req.username})
@@ -115,7 +138,7 @@ async def login(req: LoginRequest):
     if not user.get("email_verified", False):
         raise HTTPException(status_code=403, detail="Email not verified")
 
-    if not pwd_ctx.verify(req.password, user["password_hash"]):
+    if not await run_password_job(pwd_ctx.verify, req.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     return {
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import read_cache
+from app.core.metrics import registry
+from app.core.security import password_pool
+from app.utils.email import email_queue
+
+router = APIRouter()
+
+
+def _prefixed(prefix: str, stats: dict) -> dict:
+    return {f"{prefix}_{name}": value for name, value in stats.items() if isinstance(value, (int, float))}
+
+
+# components that keep their own counters are read at scrape time
+registry.register_collector(lambda: _prefixed("read_cache", read_cache.stats()))
+registry.register_collector(lambda: _prefixed("password_pool", password_pool.stats()))
+registry.register_collector(lambda: {"email_sent": email_queue.sent, "email_failed": email_queue.failed})
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition of request, MongoDB, bcrypt and SMTP metrics.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Query
+from pymongo import DESCENDING
+from app.db.mongodb import db
+from app.db.dataloader import current_loader
+from app.core.progress import COUNTERS, current_streak, day_key
+from app.schema.progress_schema import ProgressResponse
+from app.constants import (
+    COLLECTION_PROGRESS,
+    COLLECTION_PROGRESS_DAILY,
+)
+
+router = APIRouter()
+
+async def get_daily_rollups(user_id: str, since: str, days: int):
+    cursor = db[COLLECTION_PROGRESS_DAILY]\
+        .find({"user_id": user_id, "day": {"$gte": since}}, {"_id": 0, "user_id": 0})\
+        .sort("day", DESCENDING)\
+        .limit(days)
+    return await cursor.to_list(None)
+
+@router.get("/", response_model=ProgressResponse)
+async def get_progress(
+    user_id: str = "anonymous",
+    days: int = Query(30, ge=1, le=366, description="Number of recent days to include")
+):
+    """
+    Return the user's progress: lifetime totals, streaks and per-day activity.
+
+    Reads the user's rollup document and at most `days` daily documents
+    (both maintained on every quiz submission and study session).
+    """
+    today = datetime.now(timezone.utc).date()
+    since = day_key(today - timedelta(days=days - 1))
+
+    loader = current_loader()
+    totals, daily = await loader.gather(
+        db[COLLECTION_PROGRESS].find_one({"_id": user_id}),
+        get_daily_rollups(user_id, since, days),
+    )
+    totals = totals or {}
+    return ProgressResponse(
+        user_id=user_id,
+        **{name: totals.get(name, 0) for name in COUNTERS},
+        current_streak=current_streak(totals, today),
+        longest_streak=totals.get("longest_streak", 0),
+        last_active_day=totals.get("last_active_day"),
+        daily=daily,
+    )
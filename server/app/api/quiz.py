@@ -1,77 +1,106 @@
-import random
-from fastapi import APIRouter, HTTPException
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 from app.db.mongodb import db
-from app.schema.mistake_schema import MistakeSubmission, QuizItem
+from app.db.indexes import declare_index, declare_query
+from app.data.catalog import catalog
+from app.core.sampling import make_rng, sample_distractors, sample_indices
+from app.core.scheduler import scheduler
+from app.core.prefetch import QuizPrefetcher
+from app.core.config import settings
+from app.core.cache import read_cache
+from app.core.manifest import ManifestError, ManifestReplayed, claim, manifest_signer
+from app.core.progress import progress_writes
+from app.core.history import bucket_update
+from app.db.dataloader import RequestLoader, current_loader
+from app.schema.mistake_schema import MistakeSubmission, QuizBatchRequest, QuizItem
 from app.constants import (
-    COLLECTION_NAME,
-    COLLECTION_USER_MISTAKES,
-    COLLECTION_QUIZ_HISTORY
+    COLLECTION_MISTAKES,
+    COLLECTION_QUIZ_BUCKETS
 )
 
 router = APIRouter()
 
-async def get_total_words():
-    """
-    Get the total number of words in the collection.
-    """
-    return await db[COLLECTION_NAME].estimated_document_count({})
+# review selection is an indexed top-k per user
+declare_index(COLLECTION_MISTAKES, [("user_id", ASCENDING), ("count", DESCENDING), ("last_wrong", DESCENDING)])
+declare_query(COLLECTION_MISTAKES, "top mistakes", {"user_id": "u"},
+              sort=[("count", DESCENDING), ("last_wrong", DESCENDING)], limit=10)
 
-async def get_sorted_user_mistakes(user_id):
+prefetcher = QuizPrefetcher(settings.QUIZ_PREFETCH_MAX_USERS, settings.QUIZ_PREFETCH_TTL_SECONDS)
+
+async def get_sorted_user_mistakes(user_id, limit):
     """
-    Fetch and sort the user's mistake words by count and last_wrong date.
+    Fetch the user's top `limit` mistake words by count and last_wrong date.
     Returns a list of word dicts sorted by (-count, -last_wrong).
     """
-    mistake_doc = await db[COLLECTION_USER_MISTAKES].find_one({"_id": user_id})
-    mistakes = mistake_doc.get("wrong_words", []) if mistake_doc else []
-    mistakes = sorted(
-        mistakes,
-        key=lambda m: (-m.get("count", 0), -(m.get("last_wrong") or datetime.min).timestamp())
-    )
-    return mistakes
+    cursor = db[COLLECTION_MISTAKES]\
+        .find({"user_id": user_id}, {"_id": 0, "word_id": 1, "count": 1, "last_wrong": 1})\
+        .sort([("count", DESCENDING), ("last_wrong", DESCENDING)])\
+        .limit(limit)
+    return [
+        {"id": m["word_id"], "count": m["count"], "last_wrong": m.get("last_wrong")}
+        async for m in cursor
+    ]
 
-async def get_candidate_ids(wrong_ids, limit):
+async def get_sorted_mistakes_for_users(user_ids, limit):
     """
-    Select candidate quiz word IDs: prioritize wrong_ids, fill up with random if needed.
+    Top `limit` mistakes for each of several users in one aggregation.
+    Returns {user_id: [mistake dicts as in get_sorted_user_mistakes()]}.
+
+    `$topN` keeps only `limit` entries per user while grouping, so heavy
+    users never build a full mistake list in memory (MongoDB 5.2+).
     """
-    candidate_ids = wrong_ids[:]
-    if len(candidate_ids) < limit:
-        all_ids = [str(word["_id"]) async for word in db[COLLECTION_NAME].find({}, {"_id": 1})]
-        rest_ids = [id for id in all_ids if id not in candidate_ids]
-        random.shuffle(rest_ids)
-        candidate_ids.extend(rest_ids[:limit - len(candidate_ids)])
-    return candidate_ids[:limit]
+    pipeline = [
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$group": {
+            "_id": "$user_id",
+            "mistakes": {"$topN": {
+                "n": limit,
+                "sortBy": {"count": DESCENDING, "last_wrong": DESCENDING},
+                "output": {"id": "$word_id", "count": "$count", "last_wrong": "$last_wrong"},
+            }},
+        }},
+    ]
+    found = {doc["_id"]: doc["mistakes"] async for doc in db[COLLECTION_MISTAKES].aggregate(pipeline)}
+    return {user_id: found.get(user_id, []) for user_id in user_ids}
 
-async def get_id2word(candidate_ids):
+def get_candidate_ids(words, wrong_ids, limit, rng):
     """
-    Get a mapping from word ID to word document for the quiz questions.
+    Select candidate quiz word IDs: prioritize wrong_ids, fill up with random if needed.
+    Random fill-up draws catalog positions directly, so it costs O(limit), not O(total words).
     """
-    id2_word = {}
-    cursor = db[COLLECTION_NAME].find({"_id": {"$in": [ObjectId(id) for id in candidate_ids]}})
-    async for word in cursor:
-        id2_word[str(word["_id"])] = word
-    return id2_word
+    candidate_ids = wrong_ids[:limit]
+    if len(candidate_ids) < limit:
+        taken = {words.positions[id] for id in candidate_ids if id in words.positions}
+        fill = sample_indices(len(words), limit - len(candidate_ids), rng, exclude=taken)
+        candidate_ids.extend(words.ids[i] for i in fill)
+    return candidate_ids
 
-async def get_all_english_words():
+def pick_distractors(words, qid, correct, rng, k=3):
     """
-    Get all English translations in the collection (for distractors).
+    Up to k wrong options: drawn from the word's precomputed similar words
+    (see app/core/distractors.py), topped up at random from the whole catalog.
     """
-    all_words = [w async for w in db[COLLECTION_NAME].find({}, {"_id": 1, "english": 1})]
-    return [w["english"] for w in all_words]
+    similar = [text for text in dict.fromkeys(words.similar_english(qid)) if text != correct]
+    picked = rng.sample(similar, min(k, len(similar)))
+    if len(picked) < k:
+        picked += sample_distractors(words.english, correct, k - len(picked), rng, exclude=picked)
+    return picked
 
-def make_quiz_question(qid, word, all_english, is_review):
+def make_quiz_question(qid, word, words, is_review, rng):
     """
     Create a single QuizItem with up to 3 distractors.
     Handles cases where the pool is too small gracefully.
     """
     correct = word["english"]
-    possible_distractors = [eng for eng in all_english if eng != correct]
-    num_distractors = min(3, len(possible_distractors))
-    distractors = random.sample(possible_distractors, num_distractors) if num_distractors > 0 else []
+    distractors = pick_distractors(words, qid, correct, rng)
     options = [correct] + distractors
-    random.shuffle(options)
+    rng.shuffle(options)
     return QuizItem(
         id=qid,
         maori=word["maori"],
@@ -80,8 +109,85 @@ def make_quiz_question(qid, word, all_english, is_review):
         is_review=is_review
     )
 
+def make_quiz_questions(words, candidate_ids, review_ids, rng):
+    quiz_questions = []
+    for qid in candidate_ids:
+        if word := words.word(qid):
+            quiz_questions.append(
+                make_quiz_question(qid, word, words, is_review=(qid in review_ids), rng=rng)
+            )
+    return quiz_questions
+
+def build_quiz(words, mistakes, limit, rng):
+    """
+    Build one quiz of `limit` questions from the catalog snapshot and the user's top mistakes.
+    """
+    wrong_ids = [m["id"] for m in mistakes[:limit]]
+    candidate_ids = get_candidate_ids(words, wrong_ids, limit, rng)
+    return make_quiz_questions(words, candidate_ids, set(wrong_ids), rng)
+
+def build_session(words, mistakes, limit, count, rng):
+    """
+    Build `count` quizzes for one user: the top mistakes are spread across
+    the quizzes, and the random fill for the whole session is drawn in one
+    `sample_indices` call, so no word repeats within the session while the
+    catalog is large enough.
+    """
+    wrong_ids = [m["id"] for m in mistakes[:limit * count]]
+    chunks = [wrong_ids[i * limit:(i + 1) * limit] for i in range(count)]
+    taken = {words.positions[i] for i in wrong_ids if i in words.positions}
+    need = sum(limit - len(chunk) for chunk in chunks)
+    fill = [words.ids[i] for i in sample_indices(len(words), need, rng, exclude=taken)]
+
+    quizzes = []
+    for chunk in chunks:
+        n = limit - len(chunk)
+        candidate_ids, fill = chunk + fill[:n], fill[n:]
+        if len(candidate_ids) < limit:
+            # session longer than the catalog: repeat words across quizzes
+            candidate_ids = get_candidate_ids(words, candidate_ids, limit, rng)
+        quizzes.append(make_quiz_questions(words, candidate_ids, set(chunk), rng))
+    return quizzes
+
+async def load_quiz_inputs(loader, user_id, limit):
+    """
+    Load the catalog and the user's top mistakes (read-cached) concurrently.
+    `limit` is the requested size (1–100), clamped to the catalog when it is already loaded.
+    """
+    return await loader.gather(
+        catalog.get(db),
+        read_cache.load(loader, user_id, f"mistakes:{limit}", lambda: get_sorted_user_mistakes(user_id, limit)),
+    )
+
+def sign_quiz(user_id, quiz_questions) -> Optional[str]:
+    """
+    Signed manifest for a quiz, or None when manifests are disabled.
+    """
+    if manifest_signer is None:
+        return None
+    return manifest_signer.sign(user_id, [q.id for q in quiz_questions])
+
+def set_manifest_header(response: Response, user_id, quiz_questions):
+    if (manifest := sign_quiz(user_id, quiz_questions)) is not None:
+        response.headers["X-Quiz-Manifest"] = manifest
+
+def prefetch_next_quiz(user_id, limit):
+    """
+    Build the user's next quiz in the background so the next GET /quiz/ is O(1).
+    """
+    async def build():
+        words, mistakes = await load_quiz_inputs(RequestLoader(), user_id, limit)
+        return build_quiz(words, mistakes, limit, make_rng())
+
+    prefetcher.schedule(user_id, limit, build)
+
 @router.get("/", response_model=List[QuizItem])
-async def get_quiz(user_id: str = "anonymous", limit: int = 10):
+async def get_quiz(
+    response: Response,
+    user_id: str = "anonymous",
+    limit: int = Query(10, ge=1, le=100, description="Number of questions"),
+    seed: Optional[int] = None
+):
     """
     Get a quiz with multiple-choice questions (4 options per Māori word).
 
@@ -89,27 +195,81 @@ async def get_quiz(user_id: str = "anonymous", limit: int = 10):
     - User's previous mistake words are prioritized for selection,
       and are sorted first by highest wrong count, then by most recent mistake date (descending).
     - If there are not enough mistake words, random words are used to fill up the remaining questions.
+    - Pass `seed` to get a reproducible quiz for the same data.
+    - With QUIZ_PREFETCH_ENABLED, a quiz prefetched after the user's previous
+      quiz or submission is served directly, and the next one is queued.
+    - The `X-Quiz-Manifest` response header carries a signed manifest of the
+      quiz (when QUIZ_MANIFEST_SECRET is set); send it back with the result
+      to skip the word lookup.
     """
-    total_words = await get_total_words()
+    use_prefetch = settings.QUIZ_PREFETCH_ENABLED and seed is None
+    words = catalog.snapshot
+    if words:
+        # clamp before it reaches the query and the cache key
+        limit = min(limit, max(1, len(words)))
+    if use_prefetch and words:
+        if (quiz_questions := prefetcher.pop(user_id, limit)) is not None:
+            prefetch_next_quiz(user_id, limit)
+            set_manifest_header(response, user_id, quiz_questions)
+            return quiz_questions
+
+    words, mistakes = await load_quiz_inputs(current_loader(), user_id, limit)
+    total_words = len(words)
     if total_words == 0:
         raise HTTPException(status_code=404, detail="No words available for quiz")
 
     limit = max(1, min(limit, total_words))  # Clamp limit to [1, total_words]
-    mistakes = await get_sorted_user_mistakes(user_id)
-    wrong_ids = [m["id"] for m in mistakes]
+    quiz_questions = build_quiz(words, mistakes, limit, make_rng(seed))
+    if use_prefetch:
+        prefetch_next_quiz(user_id, limit)
+    set_manifest_header(response, user_id, quiz_questions)
+    return quiz_questions
 
-    candidate_ids = await get_candidate_ids(wrong_ids, limit)
-    id2_word = await get_id2word(candidate_ids)
-    all_english = await get_all_english_words()
+@router.post("/batch")
+async def get_quiz_batch(req: QuizBatchRequest):
+    """
+    Generate many quizzes in one request, streamed as NDJSON (one line per quiz).
+
+    - `user_ids`: one quiz per user, e.g. for a whole class.
+    - `user_id` + `count`: a session of `count` quizzes for one user; the
+      user's top mistakes are spread across the quizzes, so each reviews different words.
+
+    One catalog read and one `$in` aggregation over all users' mistakes
+    (users with cached mistake lists skip it); every quiz is built in memory,
+    with each user's random words drawn once for their whole session.
+    Each line is `{"user_id": ..., "index": ..., "quiz": [QuizItem, ...], "manifest": ...}`.
+    """
+    loader = current_loader()
+    user_ids = req.user_ids if req.user_ids is not None else [req.user_id]
+    per_user = req.limit * req.count
+    words, mistakes = await loader.gather(
+        catalog.get(db),
+        read_cache.fetch_many(
+            user_ids, f"mistakes:{per_user}",
+            lambda missing: get_sorted_mistakes_for_users(missing, per_user)
+        ),
+    )
+    if len(words) == 0:
+        raise HTTPException(status_code=404, detail="No words available for quiz")
+
+    limit = min(req.limit, len(words))
+    rng = make_rng(req.seed)
+
+    async def lines():
+        for user_id in user_ids:
+            session = build_session(words, mistakes.get(user_id, []), limit, req.count, rng)
+            for index, quiz in enumerate(session):
+                yield json.dumps({
+                    "user_id": user_id,
+                    "index": index,
+                    "quiz": [item.model_dump() for item in quiz],
+                    "manifest": sign_quiz(user_id, quiz),
+                }) + "\n"
+                # let other requests run between quizzes of a large batch
+                await asyncio.sleep(0)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-    quiz_questions = []
-    for qid in candidate_ids:
-        if word := id2_word.get(qid):
-            quiz_questions.append(
-                make_quiz_question(qid, word, all_english, is_review=(qid in wrong_ids))
-            )
-    return quiz_questions
-    
 async def filter_valid_word_ids(db, word_ids):
     """
     Ensure all IDs are ObjectId, and only return those that exist in DB.
@@ -122,37 +282,23 @@ async def filter_valid_word_ids(db, word_ids):
     return [str(doc["_id"]) for doc in existing]
 
 async def update_mistake_records(db, user_id, valid_word_ids, now):
-    for word_id in valid_word_ids:
-        result = await db[COLLECTION_USER_MISTAKES].update_one(
-            {"_id": user_id, "wrong_words.id": word_id},
-            {
-                "$inc": {"wrong_words.$.count": 1},
-                "$set": {"wrong_words.$.last_wrong": now}
-            },
-            upsert=False
-        )
-        if result.matched_count == 0:
-            await db[COLLECTION_USER_MISTAKES].update_one(
-                {"_id": user_id},
-                {
-                    "$push": {
-                        "wrong_words": {
-                            "id": word_id,
-                            "count": 1,
-                            "last_wrong": now
-                        }
-                    }
-                },
-                upsert=True
-            )
+    """
+    Apply every mistake of one submission in a single unordered bulk_write.
+
+    Each (user, word) pair is its own document, so each upsert is atomic per
+    word and concurrent submissions from the same user simply add up. The
+    scheduler's policy recomputes next_due in the same write.
+    """
+    if not valid_word_ids:
+        return
+    await db[COLLECTION_MISTAKES].bulk_write(
+        scheduler.mistake_updates(user_id, valid_word_ids, now),
+        ordered=False
+    )
 
 async def save_quiz_history(db, user_id, valid_word_ids, now):
-    if valid_word_ids:
-        await db[COLLECTION_QUIZ_HISTORY].insert_one({
-            "user_id": user_id,
-            "wrong_word_ids": valid_word_ids,
-            "timestamp": now
-        })
+    # perfect quizzes are recorded too: history is what progress rollups are reconciled against
+    await db[COLLECTION_QUIZ_BUCKETS].update_one(*bucket_update(user_id, valid_word_ids, now), upsert=True)
 
 
 @router.post("/quiz_result")
@@ -160,8 +306,12 @@ async def submit_quiz_result(submission: MistakeSubmission):
     """
     Record the user's quiz mistakes and update their mistake log.
 
-    - For each wrong word, increment the mistake count or add a new entry.
-    - Save the current quiz result to the history collection.
+    - For each wrong word, increment the mistake count or add a new entry (one bulk write for all words).
+    - Append the quiz result to the user's quiz history bucket for the day.
+    - With a `manifest` from GET /quiz/, wrong IDs are checked against it in
+      memory (IDs not in the quiz are ignored); without one, or with manifests
+      disabled, against the words collection. A manifest is accepted once;
+      submitting it again returns 409.
 
     Args:
         submission (MistakeSubmission): Contains user_id and wrong_word_ids.
@@ -174,9 +324,39 @@ async def submit_quiz_result(submission: MistakeSubmission):
     wrong_word_ids = submission.wrong_word_ids or []
 
     
-    valid_word_ids = await filter_valid_word_ids(db, wrong_word_ids)
+    loader = current_loader()
+    questions = 0
+    if submission.manifest and manifest_signer is not None:
+        try:
+            claims = manifest_signer.claims(submission.manifest, user_id)
+            await claim(db, claims)
+        except ManifestReplayed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ManifestError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        quizzed = set(claims["w"])
+        valid_word_ids = [i for i in dict.fromkeys(wrong_word_ids) if i in quizzed]
+        questions = len(quizzed)
+    else:
+        valid_word_ids = await filter_valid_word_ids(db, wrong_word_ids)
+
+    # one round-trip per collection, issued concurrently (progress rollups included)
+    await loader.gather(
+        update_mistake_records(db, user_id, valid_word_ids, now),
+        save_quiz_history(db, user_id, valid_word_ids, now),
+        *(
+            write for write in progress_writes(
+                db, user_id, now, quizzes=1, questions=questions, wrong_answers=len(valid_word_ids)
+            )
+        ),
+    )
+
+    # mistakes changed: drop the user's cached mistake and review lists
+    if valid_word_ids:
+        await read_cache.invalidate(user_id)
 
-    await update_mistake_records(db, user_id, valid_word_ids, now)
-    await save_quiz_history(db, user_id, valid_word_ids, now)
+    # any prefetched quiz is stale, build a fresh one
+    if settings.QUIZ_PREFETCH_ENABLED and (limit := prefetcher.last_limit(user_id)):
+        prefetch_next_quiz(user_id, limit)
 
     return {"message": "Quiz result recorded.", "wrong_count": len(valid_word_ids)}
\ No newline at end of file
@@ -1,60 +1,69 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Query
-from typing import List
-from bson import ObjectId
-from app.schema.word_schema import WordPublic
+from datetime import datetime
+from itertools import islice
+from fastapi import APIRouter, Query, Request
+from pymongo import ReturnDocument
+from typing import List, Literal, Optional
+from app.schema.word_schema import WordMatch, WordPublic
 from app.schema.user_learned_schema import UserLearnedWords
 from app.db.mongodb import db
+from app.data.catalog import catalog
+from app.core.bitmap import WordBitmap
+from app.core.scheduler import scheduler
+from app.core.cache import read_cache
+from app.core.progress import progress_writes
+from app.core.search import MAX_DISTANCE, search_index
+from app.db.dataloader import current_loader
+from app.utils.assets import REVALIDATE, asset_response
 from app.constants import (
-    COLLECTION_NAME,
     COLLECTION_USER_LEARNED,
-    COLLECTION_USER_MISTAKES,
 )
 
 router = APIRouter()
 
-async def get_due_mistake_word_ids(user_id: str, now: datetime) -> List[str]:
+# the index is re-synced once per new catalog snapshot, not on every search
+catalog.on_load(search_index.follow)
+
+async def get_due_mistake_ids(user_id: str, now: datetime, limit: int) -> List[str]:
     """
-    Fetch the list of mistake word IDs that are due for review according to the memory curve.
+    Fetch up to `limit` mistake words due for review at `now` (memory curve), most overdue first.
+    `next_due` is precomputed by the scheduler when the mistake is recorded.
     """
-    doc = await db[COLLECTION_USER_MISTAKES].find_one({"_id": user_id})
-    if not doc or "wrong_words" not in doc:
-        return []
-    result = []
-    for w in doc["wrong_words"]:
-        last = w.get("last_wrong")
-        count = w.get("count", 0)
-        # Simple memory curve for demo: higher count = longer interval
-        if count >= 3:
-            interval = timedelta(days=7)
-        elif count == 2:
-            interval = timedelta(days=3)
-        else:
-            interval = timedelta(days=1)
-        if last and now - last >= interval:
-            result.append(w["id"])
-    return result
-
-async def get_learned_ids(user_id: str) -> set:
+    return await scheduler.due_word_ids(db, user_id, now, limit)
+
+async def get_learned_chunks(user_id: str) -> dict:
     """
-    Fetch the set of learned word IDs for the given user.
+    Fetch the user's learned-word bitmap in its stored chunk form.
     """
-    raw = await db[COLLECTION_USER_LEARNED].find_one({"_id": user_id})
+    raw = await db[COLLECTION_USER_LEARNED].find_one({"_id": user_id}, {"learned_bits": 1})
     if raw:
-        user_learned = UserLearnedWords.model_validate(raw)
-        return set(user_learned.learned_ids)
-    else:
-        return set()
+        return UserLearnedWords.model_validate(raw).learned_bits
+    return {}
 
-async def add_learned_ids(user_id: str, new_word_ids: List[str]):
+async def add_learned_ids(user_id: str, new_word_ids: List[str], words) -> int:
     """
     Add the given word IDs to the user's learned words in the database.
+    Bits are OR-ed in with `$bit`, so concurrent requests never lose an update.
+    Returns how many bits this write actually set, diffed against the
+    document as it was just before it (the cached bitmap may be stale).
     """
-    await db[COLLECTION_USER_LEARNED].update_one(
+    new_words = WordBitmap.from_indexes(
+        idx for idx in map(words.index_of, new_word_ids) if idx is not None
+    )
+    if not new_words:
+        return 0
+    chunks = new_words.to_chunks()
+    before = await db[COLLECTION_USER_LEARNED].find_one_and_update(
         {"_id": user_id},
-        {"$addToSet": {"learned_ids": {"$each": new_word_ids}}},
-        upsert=True
+        {"$bit": {f"learned_bits.{chunk}": {"or": value} for chunk, value in chunks.items()}},
+        projection={f"learned_bits.{chunk}": 1 for chunk in chunks},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
     )
+    # bits only ever get set, so the cached bitmap can take the same OR
+    await read_cache.update(
+        user_id, "learned", lambda chunks: (WordBitmap.from_chunks(chunks) | new_words).to_chunks()
+    )
+    return len(new_words - WordBitmap.from_chunks((before or {}).get("learned_bits") or {}))
 
 @router.get("/", response_model=List[WordPublic])
 async def get_vocabulary(
@@ -75,61 +84,99 @@ async def get_vocabulary(
     results = []
     used_ids = set()
 
-    # 1. Select 20% mistake words due for review
-    due_mistake_ids = await get_due_mistake_word_ids(user_id, now)
     n_mistake = max(1, int(limit * 0.2))  # At least 1 if there are any due
-    selected_mistakes = due_mistake_ids[:n_mistake]
-    if selected_mistakes:
-        object_ids = [ObjectId(w_id) for w_id in selected_mistakes]
-        cursor = db[COLLECTION_NAME].find({"_id": {"$in": object_ids}})
-        async for word in cursor:
-            results.append({
-                "id": str(word["_id"]),
-                "maori": word["maori"],
-                "english": word["english"]
-            })
-            used_ids.add(str(word["_id"]))
-            if len(results) >= n_mistake:
-                break
 
-    # 2. Fill with unlearned words
+    # Catalog, due mistakes and learned set are independent: load them together.
+    # The learned set comes from the read cache when this user was seen recently;
+    # what is due depends on the clock, so that is an indexed query every time.
+    loader = current_loader()
+    words, due_mistake_ids, learned_chunks = await loader.gather(
+        catalog.get(db),
+        get_due_mistake_ids(user_id, now, n_mistake),
+        read_cache.load(loader, user_id, "learned", lambda: get_learned_chunks(user_id)),
+    )
+    learned = WordBitmap.from_chunks(learned_chunks)
+
+    # 1. Select 20% mistake words due for review
+    for w_id in due_mistake_ids:
+        if word := words.word(w_id):
+            results.append(word)
+            used_ids.add(w_id)
+
+    # 2. Fill with unlearned words, walking the catalog's dense index order
+    #    and skipping learned bits in memory, so cost tracks `limit`.
+    #    Due mistakes beyond the review slots stay out too: each batch of
+    #    candidates is checked against the mistake book with one bounded query.
     if len(results) < limit:
-        learned_ids = await get_learned_ids(user_id)
-        # exclude anything we've already returned (used_ids),
-        # anything already learned, AND *all* mistake IDs
-        all_mistake_ids = set(due_mistake_ids)
-        exclude_object_ids = [ObjectId(s) for s in (learned_ids | used_ids | all_mistake_ids)]
-        unseen_cursor = db[COLLECTION_NAME].find({"_id": {"$nin": exclude_object_ids}}).limit(limit - len(results))
-        async for word in unseen_cursor:
-            results.append({
-                "id": str(word["_id"]),
-                "maori": word["maori"],
-                "english": word["english"]
-            })
-            used_ids.add(str(word["_id"]))
-            if len(results) >= limit:
+        skip = learned | WordBitmap.from_indexes(
+            idx for idx in map(words.index_of, used_ids) if idx is not None
+        )
+        pending = skip.iter_missing(words.index_limit)
+        while len(results) < limit:
+            indexes = list(islice(pending, 2 * (limit - len(results))))
+            if not indexes:
                 break
+            # gaps left by deleted words have no ID
+            candidates = [sid for sid in map(words.id_of_index, indexes) if sid is not None]
+            due = await scheduler.due_among(db, user_id, candidates, now)
+            for sid in candidates:
+                if sid in due:
+                    continue
+                results.append(words.word(sid))
+                used_ids.add(sid)
+                if len(results) >= limit:
+                    break
 
     # 3. If still not enough, fill with already learned (but not mistake) words
     if len(results) < limit:
-        learned = await get_learned_ids(user_id)
-        available = [ObjectId(x) for x in learned if x not in used_ids]
-        if available:
-            cursor = db[COLLECTION_NAME]\
-                .find({"_id": {"$in": available}})\
-                .limit(limit - len(results))
-            async for word in cursor:
-                sid = str(word["_id"])
-                results.append({
-                    "id": sid,
-                    "maori": word["maori"],
-                    "english": word["english"],
-                })
+        for idx in learned:
+            sid = words.id_of_index(idx)
+            if sid and sid not in used_ids and (word := words.word(sid)):
+                results.append(word)
                 used_ids.add(sid)
                 if len(results) >= limit:
                     break
 
-    # 4. Mark all returned words as learned for this user
-    await add_learned_ids(user_id, list(used_ids))
+    # 4. Mark all returned words as learned for this user (skip the write if they all are)
+    new_ids = [w_id for w_id in used_ids if (idx := words.index_of(w_id)) is not None and idx not in learned]
+    if new_ids:
+        added = await add_learned_ids(user_id, new_ids, words)
+        await loader.gather(*progress_writes(db, user_id, now, words_learned=added))
 
     return results
+
+@router.get("/search", response_model=List[WordMatch])
+async def search_vocabulary(
+    q: str = Query(..., min_length=1, max_length=100, description="Māori or English text; macrons optional"),
+    mode: Literal["auto", "exact", "prefix", "fuzzy", "english"] = "auto",
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches"),
+    max_distance: int = Query(1, ge=0, le=MAX_DISTANCE, description="Edit distance allowed for fuzzy matches")
+):
+    """
+    Look up words by Māori form (exact, prefix or within a few typos) or English gloss.
+
+    Served from the in-memory search index; no database query unless the
+    word catalog itself needs refreshing.
+    """
+    words = await catalog.get(db)
+    return [
+        WordMatch(**words.word(word_id), match=kind, distance=distance)
+        for word_id, kind, distance in search_index.search(q, mode, limit, max_distance)
+    ]
+
+@router.get("/catalog")
+async def get_catalog(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Catalog version the client already has")
+):
+    """
+    The whole word list, or with `since` only the words changed after that version,
+    so clients can keep an offline copy of the dictionary.
+
+    Both are encoded and compressed once per catalog change and served with
+    an ETag (If-None-Match → 304). The response's `version` is what to pass
+    as `since` next time.
+    """
+    words = await catalog.get(db)
+    export = await (words.export() if since is None else words.delta(since))
+    return asset_response(export, request, REVALIDATE)
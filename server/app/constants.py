@@ -1,6 +1,17 @@
 COLLECTION_NAME = "words"
-COLLECTION_USER_MISTAKES = "user_mistakes"
-COLLECTION_QUIZ_HISTORY = "quiz_history"
+COLLECTION_USER_MISTAKES = "user_mistakes"  # legacy embedded-array format, see scripts/migrate_mistakes.py
+COLLECTION_MISTAKES = "mistakes"
+COLLECTION_QUIZ_HISTORY = "quiz_history"  # legacy one-document-per-submission, see scripts/migrate_quiz_history.py
+COLLECTION_QUIZ_BUCKETS = "quiz_history_buckets"
 COLLECTION_USER_LEARNED = "user_learned"
 COLLECTION_USERS = "users"
-COLLECTION_CODES = "codes"
\ No newline at end of file
+COLLECTION_CODES = "codes"
+COLLECTION_EMAIL_DEAD_LETTERS = "email_dead_letters"
+COLLECTION_USED_MANIFESTS = "used_quiz_manifests"
+COLLECTION_PROGRESS = "progress"
+COLLECTION_PROGRESS_DAILY = "progress_daily"
+COLLECTION_META = "meta"
+META_WORDS_VERSION = "words_version"
+META_WORD_INDEX = "word_index"
+META_SCHEMA_VERSION = "schema_version"
+META_SCHEMA_LOCK = "schema_lock"
@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, Iterator
+
+from bson.int64 import Int64
+
+CHUNK_BITS = 64
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+class WordBitmap:
+    """
+    Set of dense word indexes stored as the bits of one Python int.
+
+    Membership is a shift and a mask, and union/difference are single
+    big-int operations, so 50k learned words take ~6KB and checks take
+    well under a microsecond. In MongoDB the bitmap is stored as a
+    sub-document of signed 64-bit chunks, {"<chunk no>": Int64}, which
+    lets writers set bits atomically with `$bit`.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def from_indexes(cls, indexes: Iterable[int]) -> "WordBitmap":
+        bitmap = cls()
+        bitmap.update(indexes)
+        return bitmap
+
+    @classmethod
+    def from_chunks(cls, chunks: Dict[str, int]) -> "WordBitmap":
+        bits = 0
+        for key, value in chunks.items():
+            bits |= (value & CHUNK_MASK) << (CHUNK_BITS * int(key))
+        return cls(bits)
+
+    def to_chunks(self) -> Dict[str, Int64]:
+        """
+        Non-empty chunks as {"<chunk no>": Int64}, ready for `$bit: {or: ...}`.
+        """
+        chunks = {}
+        bits = self.bits
+        chunk_no = 0
+        while bits:
+            value = bits & CHUNK_MASK
+            if value:
+                chunks[str(chunk_no)] = Int64(value - (1 << CHUNK_BITS) if value >> (CHUNK_BITS - 1) else value)
+            bits >>= CHUNK_BITS
+            chunk_no += 1
+        return chunks
+
+    def add(self, index: int):
+        self.bits |= 1 << index
+
+    def update(self, indexes: Iterable[int]):
+        bits = self.bits
+        for index in indexes:
+            bits |= 1 << index
+        self.bits = bits
+
+    def __contains__(self, index: int) -> bool:
+        return (self.bits >> index) & 1 == 1
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Set indexes in ascending order. Empty stretches are skipped with one
+        lowest-set-bit jump, so iterating a sparse bitmap costs O(set chunks).
+        """
+        bits = self.bits
+        base = 0
+        while bits:
+            skip = (bits & -bits).bit_length() - 1
+            bits >>= skip
+            base += skip
+            chunk = bits & CHUNK_MASK
+            while chunk:
+                low = chunk & -chunk
+                yield base + low.bit_length() - 1
+                chunk ^= low
+            bits >>= CHUNK_BITS
+            base += CHUNK_BITS
+
+    def iter_missing(self, stop: int) -> Iterator[int]:
+        """
+        Indexes in range(stop) that are NOT in the set, ascending and lazily.
+        """
+        return iter(WordBitmap(~self.bits & ((1 << stop) - 1)))
+
+    def __or__(self, other: "WordBitmap") -> "WordBitmap":
+        return WordBitmap(self.bits | other.bits)
+
+    def __and__(self, other: "WordBitmap") -> "WordBitmap":
+        return WordBitmap(self.bits & other.bits)
+
+    def __sub__(self, other: "WordBitmap") -> "WordBitmap":
+        return WordBitmap(self.bits & ~other.bits)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, WordBitmap) and self.bits == other.bits
+
+    def __repr__(self):
+        return f"WordBitmap({len(self)} words)"
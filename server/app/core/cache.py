@@ -0,0 +1,249 @@
+"""
+Per-user read-model cache.
+
+Vocabulary and quiz reads keep materializing the same per-user state (top
+mistakes, the due-review list, the learned bitmap). These are cached under
+(user_id, name) and dropped per user by the write paths that change them,
+so repeat reads within a session are served without touching MongoDB.
+
+Two backends:
+- `MemoryBackend`: in-process LRU with a TTL. Invalidation only reaches
+  the process that made the write, so it is only correct with a single
+  worker; other workers would serve stale data for up to the TTL.
+- `RedisBackend`: one hash per user in a Redis-compatible server, shared by
+  all workers; values are BSON-encoded
+
+READ_CACHE_BACKEND=auto (the default) uses Redis when WEB_CONCURRENCY > 1.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+import bson
+
+from app.core.config import settings
+
+MISS = object()
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._names: Dict[str, Set[str]] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, user_id: str, name: str) -> Any:
+        key = (user_id, name)
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISS
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            return MISS
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, user_id: str, name: str, value: Any):
+        key = (user_id, name)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        self._names.setdefault(user_id, set()).add(name)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def invalidate(self, user_id: str, *names: str):
+        for name in names or list(self._names.get(user_id, ())):
+            self._drop((user_id, name))
+
+    async def clear(self):
+        self._entries.clear()
+        self._names.clear()
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        user_id, name = key
+        names = self._names.get(user_id)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._names[user_id]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "evictions": self.evictions, "expirations": self.expirations}
+
+
+class RedisBackend:
+    """
+    `client` is a redis.asyncio-compatible client (hget/hset/hdel/expire/
+    delete/scan_iter). Redis enforces the TTL and its own eviction policy.
+    """
+
+    def __init__(self, client, ttl_seconds: float, prefix: str = "readmodel:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, user_id: str, name: str) -> Any:
+        raw = await self.client.hget(self.prefix + user_id, name)
+        if raw is None:
+            return MISS
+        return bson.decode(raw)["v"]
+
+    async def set(self, user_id: str, name: str, value: Any):
+        key = self.prefix + user_id
+        await self.client.hset(key, name, bson.encode({"v": value}))
+        await self.client.expire(key, max(1, int(self.ttl_seconds)))
+
+    async def invalidate(self, user_id: str, *names: str):
+        if names:
+            await self.client.hdel(self.prefix + user_id, *names)
+        else:
+            await self.client.delete(self.prefix + user_id)
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ReadCache:
+    """
+    Counts hits and misses in front of a backend.
+
+    A read that misses while a write for the same user is in flight does not
+    store its result, so an invalidation can't be undone by a slower read.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._loading: Dict[str, int] = {}
+        self._writes: Dict[str, int] = {}
+
+    async def get(self, user_id: str, name: str) -> Any:
+        value = await self.backend.get(user_id, name)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def fetch(self, user_id: str, name: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value, or `fetch()` it and cache it.
+        """
+        value = await self.get(user_id, name)
+        if value is not MISS:
+            return value
+
+        async def fetch_one(_):
+            return {user_id: await fetch()}
+
+        values = await self._fetch_missing([user_id], name, fetch_one)
+        return values[user_id]
+
+    async def fetch_many(
+        self, user_ids: List[str], name: str, fetch_many: Callable[[List[str]], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Cached values for several users; the misses are read with one
+        `fetch_many(missing_user_ids)` call returning {user_id: value}.
+        """
+        values = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            value = await self.get(user_id, name)
+            if value is MISS:
+                missing.append(user_id)
+            else:
+                values[user_id] = value
+        if missing:
+            values.update(await self._fetch_missing(missing, name, fetch_many))
+        return values
+
+    async def _fetch_missing(self, user_ids, name, fetch_many):
+        writes = {}
+        for user_id in user_ids:
+            self._loading[user_id] = self._loading.get(user_id, 0) + 1
+            writes[user_id] = self._writes.get(user_id, 0)
+        try:
+            fetched = await fetch_many(user_ids)
+            for user_id, value in fetched.items():
+                if self._writes.get(user_id, 0) == writes[user_id]:
+                    await self.backend.set(user_id, name, value)
+            return fetched
+        finally:
+            for user_id in user_ids:
+                self._loading[user_id] -= 1
+                if not self._loading[user_id]:
+                    del self._loading[user_id]
+                    self._writes.pop(user_id, None)
+
+    def load(self, loader, user_id: str, name: str, fetch: Callable[[], Awaitable[Any]]):
+        """
+        `fetch()` memoized for the request and cached across requests.
+        """
+        return loader.load((user_id, name), lambda: self.fetch(user_id, name, fetch))
+
+    async def set(self, user_id: str, name: str, value: Any):
+        await self.backend.set(user_id, name, value)
+
+    async def update(self, user_id: str, name: str, apply: Callable[[Any], Any]):
+        """
+        Write-through: apply a change the caller just wrote to the database
+        to the cached value, if there is one.
+        """
+        self._note_write(user_id)
+        value = await self.backend.get(user_id, name)
+        if value is not MISS:
+            await self.backend.set(user_id, name, apply(value))
+
+    async def invalidate(self, user_id: str, *names: str):
+        """
+        Drop the given read models for a user (all of them if none are named).
+        """
+        self.invalidations += 1
+        self._note_write(user_id)
+        await self.backend.invalidate(user_id, *names)
+
+    def _note_write(self, user_id: str):
+        if user_id in self._loading:
+            self._writes[user_id] = self._writes.get(user_id, 0) + 1
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations, **self.backend.stats()}
+
+
+def build_read_cache(backend: str = None, workers: int = None) -> ReadCache:
+    backend = backend or settings.READ_CACHE_BACKEND
+    workers = workers or settings.WEB_CONCURRENCY
+    if backend == "auto":
+        backend = "redis" if workers > 1 else "memory"
+    if backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            print("⚠️  READ_CACHE_BACKEND=redis but the redis package is not installed; using the in-process cache")
+        else:
+            client = redis.from_url(settings.READ_CACHE_REDIS_URL)
+            return ReadCache(RedisBackend(client, settings.READ_CACHE_TTL_SECONDS))
+    if workers > 1:
+        print(f"⚠️  in-process read cache with {workers} workers: writes on one worker leave the others "
+              f"stale for up to {settings.READ_CACHE_TTL_SECONDS:.0f}s; use READ_CACHE_BACKEND=redis")
+    return ReadCache(MemoryBackend(settings.READ_CACHE_MAX_ENTRIES, settings.READ_CACHE_TTL_SECONDS))
+
+
+read_cache = build_read_cache()
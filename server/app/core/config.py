@@ -17,4 +17,65 @@ class Settings(BaseSettings):
     # How long a code remains valid
     VERIFICATION_CODE_EXPIRE_MINUTES: int = 10
 
+    # Email delivery queue (see app/utils/email.py)
+    EMAIL_QUEUE_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_MAX_ATTEMPTS: int = 4
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 2.0
+
+    # Password hashing: bcrypt cost factor and the dedicated worker pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Run index builds / seeding at startup if the schema marker is behind.
+    # Disable to run `python -m app.db.migrations` once per deploy instead.
+    SCHEMA_SETUP_ON_STARTUP: bool = True
+    # How long (seconds) a worker waits for another one's setup; 0 waits as long
+    # as the holder is alive (a crashed holder's lock expires and is taken over)
+    SCHEMA_SETUP_WAIT_SECONDS: float = 0.0
+
+    # How often (seconds) each worker checks the word catalog version marker
+    CATALOG_CHECK_SECONDS: float = 5.0
+
+    # Signed quiz manifests (see app/core/manifest.py). Set the same secret on every
+    # worker; left empty, manifests are disabled.
+    QUIZ_MANIFEST_SECRET: str = ""
+    QUIZ_MANIFEST_TTL_SECONDS: float = 7200.0
+
+    # Similar-word distractors stored per word (see app/core/distractors.py)
+    DISTRACTOR_TOP_K: int = 8
+
+    # Review interval policy used to schedule mistake words (see app/core/scheduler.py)
+    REVIEW_POLICY: str = "fixed"
+
+    # Background prefetch of each user's next quiz (see app/core/prefetch.py)
+    QUIZ_PREFETCH_ENABLED: bool = False
+    QUIZ_PREFETCH_MAX_USERS: int = 10000
+    QUIZ_PREFETCH_TTL_SECONDS: float = 300.0
+
+    # Per-user read-model cache (see app/core/cache.py): "auto", "memory" or "redis".
+    # "memory" invalidates only its own process, so it is only correct with a
+    # single worker; "auto" picks redis when WEB_CONCURRENCY > 1. Several
+    # replicas can't be detected: set "redis" explicitly for them.
+    READ_CACHE_BACKEND: str = "auto"
+    READ_CACHE_MAX_ENTRIES: int = 50000
+    READ_CACHE_TTL_SECONDS: float = 300.0
+    READ_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    # worker processes per instance (read by uvicorn/gunicorn as well)
+    WEB_CONCURRENCY: int = 1
+
+    # Quiz history buckets (see app/core/history.py) and their retention
+    QUIZ_HISTORY_BUCKET_SIZE: int = 200
+    QUIZ_HISTORY_RETENTION_DAYS: int = 365
+    QUIZ_HISTORY_ARCHIVE_DIR: str = "archives/quiz_history"
+
+    # Request metrics at /metrics (see app/core/metrics.py); optional JSON log line per request
+    METRICS_ENABLED: bool = True
+    METRICS_LOG_REQUESTS: bool = False
+    METRICS_MEASURE_REPLY_BYTES: bool = True
+
+    # How often (seconds) a cached client build file is checked for changes
+    ASSET_CHECK_SECONDS: float = 2.0
+
 settings = Settings()
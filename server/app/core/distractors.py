@@ -0,0 +1,167 @@
+"""
+Offline distractor index: for every word, the top-K other words whose
+English gloss makes a plausible wrong answer.
+
+Candidates are scored on part of speech (from `explanation`), character
+trigram similarity of the glosses and gloss token overlap. Near-synonyms
+(same gloss, or mostly the same tokens) are excluded, since they would be
+a second correct answer. Each word only scores a shortlist: words sharing
+its rarer trigrams plus a sample of words with the same part of speech,
+so a build is roughly linear in the number of words.
+
+Built by app/scripts/build_distractors.py and stored on each word as
+`distractors` (a list of dense word indexes); the catalog keeps them in a
+flat array so a quiz picks distractors in O(K).
+"""
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+STOPWORDS = frozenset("a an the to be of for in on at by or and is it".split())
+# trigrams shared by more words than this carry no signal and are skipped
+MAX_POSTING = 2000
+SHORTLIST = 64
+# sharing this share of the shorter gloss's tokens means "same meaning"
+SYNONYM_OVERLAP = 0.6
+
+_token_re = re.compile(r"[a-z]+")
+
+
+class WordFeatures:
+    __slots__ = ("idx", "gloss", "pos", "tokens", "grams")
+
+    def __init__(self, idx: int, english: str, explanation: str):
+        self.idx = idx
+        self.gloss = " ".join(_token_re.findall(english.lower()))
+        self.pos = parse_pos(explanation)
+        self.tokens = {t for t in self.gloss.split() if t not in STOPWORDS} or set(self.gloss.split())
+        padded = f"  {self.gloss} "
+        self.grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def parse_pos(explanation: str) -> Set[str]:
+    """
+    "adjective/noun" → {"adjective", "noun"}; "grammatical particle" → {"particle"}.
+    """
+    tags = set()
+    for part in (explanation or "").lower().split("/"):
+        words = part.split()
+        if words:
+            tags.add(words[-1])
+    return tags
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def score(word: WordFeatures, other: WordFeatures) -> Optional[float]:
+    """
+    How good `other` is as a distractor for `word`; None if it is unusable.
+    """
+    if other.idx == word.idx or not other.gloss or other.gloss == word.gloss:
+        return None
+    shared = len(word.tokens & other.tokens)
+    if shared and shared >= SYNONYM_OVERLAP * min(len(word.tokens), len(other.tokens)):
+        return None
+    pos = 1.0 if word.pos & other.pos else 0.0
+    return pos + _jaccard(word.grams, other.grams) + 0.5 * _jaccard(word.tokens, other.tokens)
+
+
+class DistractorIndex:
+    """
+    Scoring state over a whole word list (features, trigram postings, POS buckets).
+    """
+
+    def __init__(self, words: Iterable[dict], k: int):
+        self.k = k
+        self.features: Dict[int, WordFeatures] = {
+            w["idx"]: WordFeatures(w["idx"], w.get("english", ""), w.get("explanation", "")) for w in words
+        }
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.by_pos: Dict[str, List[int]] = defaultdict(list)
+        for f in self.features.values():
+            for gram in f.grams:
+                self.postings[gram].append(f.idx)
+            for tag in f.pos:
+                self.by_pos[tag].append(f.idx)
+        self._all = sorted(self.features)
+
+    def shortlist(self, f: WordFeatures) -> Set[int]:
+        counts = Counter()
+        for gram in f.grams:
+            posting = self.postings.get(gram, ())
+            if len(posting) <= MAX_POSTING:
+                counts.update(posting)
+        counts.pop(f.idx, None)
+        candidates = {idx for idx, _ in counts.most_common(SHORTLIST)}
+        # deterministic per word, so rebuilding unchanged data gives the same lists
+        rng = random.Random(f.idx)
+        for tag in sorted(f.pos):
+            bucket = self.by_pos[tag]
+            candidates.update(rng.sample(bucket, min(SHORTLIST, len(bucket))))
+        candidates.discard(f.idx)
+        return candidates
+
+    def top_k(self, idx: int) -> List[int]:
+        f = self.features[idx]
+        scored = [
+            (s, other) for other in self.shortlist(f)
+            if (s := score(f, self.features[other])) is not None
+        ]
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        picked = [other for _, other in scored[:self.k]]
+        if len(picked) < self.k:
+            # tiny vocabularies: fill with any usable word
+            rng = random.Random(idx)
+            taken = set(picked)
+            for other in rng.sample(self._all, min(len(self._all), 4 * self.k + 8)):
+                if len(picked) >= self.k:
+                    break
+                if other not in taken and score(f, self.features[other]) is not None:
+                    picked.append(other)
+                    taken.add(other)
+        return picked
+
+    def build(self) -> Dict[int, List[int]]:
+        return {idx: self.top_k(idx) for idx in self._all}
+
+    def update(self, current: Dict[int, List[int]], changed: Set[int]) -> Dict[int, List[int]]:
+        """
+        Incremental rebuild after `changed` words were added or edited.
+
+        Recomputes the changed words' lists and every list that points at a
+        changed word, then offers each changed word to the lists of its own
+        shortlist. Returns only the lists that differ from `current`.
+        """
+        changed = {idx for idx in changed if idx in self.features}
+        recompute = set(changed)
+        recompute.update(
+            idx for idx, others in current.items()
+            if idx in self.features and changed.intersection(others)
+        )
+        recompute.update(idx for idx in self.features if idx not in current)
+        lists = {idx: self.top_k(idx) for idx in recompute}
+
+        for idx in changed:
+            for other in self.shortlist(self.features[idx]):
+                if other in recompute:
+                    continue
+                merged = lists.get(other, current.get(other, []))
+                if idx in merged:
+                    continue
+                f = self.features[other]
+                s = score(f, self.features[idx])
+                if s is None:
+                    continue
+                ranked = sorted(
+                    [(score(f, self.features[o]) or 0.0, o) for o in merged if o in self.features] + [(s, idx)],
+                    key=lambda t: (-t[0], t[1]),
+                )
+                lists[other] = [o for _, o in ranked[:self.k]]
+
+        return {idx: others for idx, others in lists.items() if current.get(idx) != others}
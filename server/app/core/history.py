@@ -0,0 +1,48 @@
+"""
+Bucketed quiz history.
+
+Submissions are packed into one document per user per (UTC) day instead
+of one document each:
+
+    {user_id, day: "YYYY-MM-DD", count, wrong_count, first, last,
+     submissions: [{at, wrong_word_ids}, ...]}
+
+A submission is a single upsert (`$push` + `$inc`) on the user's open
+bucket for the day. A bucket holds at most QUIZ_HISTORY_BUCKET_SIZE
+submissions; a full bucket no longer matches the filter, so the upsert
+starts a new one. Old buckets are moved to gzip JSONL archives by
+app/scripts/compact_quiz_history.py.
+"""
+from datetime import datetime
+from typing import List, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from app.constants import COLLECTION_QUIZ_BUCKETS
+from app.core.config import settings
+from app.core.progress import day_key
+from app.db.indexes import declare_index, declare_query
+
+declare_index(COLLECTION_QUIZ_BUCKETS, [("user_id", ASCENDING), ("day", DESCENDING)])
+declare_index(COLLECTION_QUIZ_BUCKETS, [("day", ASCENDING), ("user_id", ASCENDING), ("_id", ASCENDING)])
+declare_query(COLLECTION_QUIZ_BUCKETS, "open bucket", {"user_id": "u", "day": "2024-01-01", "count": {"$lt": 200}})
+declare_query(COLLECTION_QUIZ_BUCKETS, "expired buckets", {"day": {"$lt": "2024-01-01"}}, sort=[("day", ASCENDING)])
+declare_query(COLLECTION_QUIZ_BUCKETS, "expired day by user", {"day": "2024-01-01"},
+              sort=[("user_id", ASCENDING), ("_id", ASCENDING)])
+
+
+def bucket_update(user_id: str, wrong_word_ids: List[str], now: datetime,
+                  bucket_size: int = None) -> Tuple[dict, dict]:
+    """
+    Filter and update that append one submission to the user's open bucket for `now`'s day.
+    """
+    bucket_size = bucket_size or settings.QUIZ_HISTORY_BUCKET_SIZE
+    return (
+        {"user_id": user_id, "day": day_key(now), "count": {"$lt": bucket_size}},
+        {
+            "$push": {"submissions": {"at": now, "wrong_word_ids": wrong_word_ids}},
+            "$inc": {"count": 1, "wrong_count": len(wrong_word_ids)},
+            "$min": {"first": now},
+            "$max": {"last": now},
+        },
+    )
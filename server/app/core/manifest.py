@@ -0,0 +1,122 @@
+"""
+Signed quiz manifests.
+
+GET /quiz/ hands out a manifest naming the user, the quizzed word IDs, a
+nonce and an expiry, signed with HMAC-SHA256; the client echoes it back
+with its result. POST /quiz/quiz_result can then check submitted word IDs
+against it in memory instead of querying `words`, and IDs that were never
+part of the quiz are ignored. Each manifest is accepted once: its nonce is
+recorded on first use (`claim()`, expired by a TTL index), so a replay
+can't count the same quiz twice.
+
+Token format: base64url(JSON payload) "." base64url(signature).
+
+Manifests need QUIZ_MANIFEST_SECRET, shared by every worker. Without it
+`manifest_signer` is None (the app warns at startup): no manifests are
+handed out and submitted ones are ignored (IDs are checked against
+`words` instead), since a key made up per process would reject manifests
+signed by another worker or before a restart.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.constants import COLLECTION_USED_MANIFESTS
+from app.core.config import settings
+from app.db.indexes import declare_index
+
+declare_index(COLLECTION_USED_MANIFESTS, "expires_at", expire_after_seconds=0)
+
+
+class ManifestError(ValueError):
+    """
+    Raised for a manifest that is malformed, tampered with, expired or for another user.
+    """
+
+
+class ManifestReplayed(ManifestError):
+    """
+    Raised for a manifest whose quiz result was already recorded.
+    """
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class ManifestSigner:
+    def __init__(self, secret: str, ttl_seconds: float):
+        self._key = secret.encode("utf-8")
+        self.ttl_seconds = ttl_seconds
+
+    def _signature(self, payload: bytes) -> bytes:
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def sign(self, user_id: str, word_ids: Iterable[str], now: Optional[float] = None) -> str:
+        expires = int((now if now is not None else time.time()) + self.ttl_seconds)
+        payload = json.dumps(
+            {"u": user_id, "w": list(word_ids), "n": secrets.token_urlsafe(12), "e": expires},
+            separators=(",", ":")
+        ).encode("utf-8")
+        return f"{_b64encode(payload)}.{_b64encode(self._signature(payload))}"
+
+    def verify(self, token: str, user_id: str, now: Optional[float] = None) -> List[str]:
+        """
+        Return the manifest's word IDs, or raise ManifestError.
+        """
+        return self.claims(token, user_id, now)["w"]
+
+    def claims(self, token: str, user_id: str, now: Optional[float] = None) -> dict:
+        """
+        The verified payload ({"u", "w", "n", "e"}), or raise ManifestError.
+        """
+        try:
+            encoded_payload, encoded_signature = token.split(".")
+            payload = _b64decode(encoded_payload)
+            signature = _b64decode(encoded_signature)
+        except ValueError as e:
+            raise ManifestError("Malformed quiz manifest") from e
+        if not hmac.compare_digest(signature, self._signature(payload)):
+            raise ManifestError("Invalid quiz manifest")
+
+        data = json.loads(payload)
+        if data["u"] != user_id:
+            raise ManifestError("Quiz manifest belongs to another user")
+        if data["e"] < (now if now is not None else time.time()):
+            raise ManifestError("Quiz manifest has expired")
+        if "n" not in data:
+            raise ManifestError("Malformed quiz manifest")
+        return data
+
+
+async def claim(db, claims: dict):
+    """
+    Record a verified manifest as used, or raise ManifestReplayed if it already was.
+    """
+    try:
+        await db[COLLECTION_USED_MANIFESTS].insert_one({
+            "_id": claims["n"],
+            "expires_at": datetime.fromtimestamp(claims["e"], timezone.utc),
+        })
+    except DuplicateKeyError as e:
+        raise ManifestReplayed("Quiz result was already submitted") from e
+
+
+def build_manifest_signer(secret: str, ttl_seconds: float) -> Optional[ManifestSigner]:
+    if not secret:
+        return None
+    return ManifestSigner(secret, ttl_seconds)
+
+
+manifest_signer = build_manifest_signer(settings.QUIZ_MANIFEST_SECRET, settings.QUIZ_MANIFEST_TTL_SECONDS)
@@ -0,0 +1,265 @@
+"""
+Per-request instrumentation and a Prometheus text-format registry.
+
+Each HTTP request gets a `RequestSpan` in a context variable. Motor runs
+pymongo calls in executor threads with a copy of the caller's context, so
+`MongoCommandListener` (the one listener registered on the Motor client)
+can attribute every MongoDB command (count, duration, reply size) to the
+request that issued it, and charge it to the request's data loader for
+the X-DB-Round-Trips header. bcrypt and SMTP time are added with `observe_span()`.
+
+The middleware in app/main.py turns a finished span into histograms and
+counters, a `Server-Timing` header and, optionally, one JSON log line.
+Everything is exposed at GET /metrics.
+"""
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import bson
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.db.dataloader import record_round_trip
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+BYTES_BUCKETS = (1 << 10, 1 << 13, 1 << 16, 1 << 19, 1 << 22, 1 << 25)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for values, total in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labels, values)} {total}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for values, series in sorted(self._series.items()):
+            for bound, n in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labels, values, le)} {n}"
+            inf = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labels, values, inf)} {series[-1]}"
+            yield f"{self.name}_sum{_labels(self.labels, values)} {series[-2]}"
+            yield f"{self.name}_count{_labels(self.labels, values)} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect: Callable[[], Dict[str, float]]):
+        """
+        `collect()` returns {metric name: value}, rendered as gauges on each scrape
+        (for components that keep their own counters, e.g. read_cache.stats()).
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+                continue
+            for name, value in values.items():
+                if value is None:
+                    continue
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", LATENCY_BUCKETS, ("method", "route"))
+request_mongo_commands = registry.histogram(
+    "http_request_mongo_commands", "MongoDB commands issued per request.", COUNT_BUCKETS, ("route",))
+request_mongo_bytes = registry.histogram(
+    "http_request_mongo_reply_bytes", "MongoDB reply bytes per request.", BYTES_BUCKETS, ("route",))
+mongo_command_latency = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency.", LATENCY_BUCKETS, ("command",))
+mongo_command_failures = registry.counter(
+    "mongo_command_failures_total", "Failed MongoDB commands.", ("command",))
+span_seconds = registry.histogram(
+    "span_duration_seconds", "Time spent in slow dependencies (bcrypt, smtp).", LATENCY_BUCKETS, ("span",))
+
+
+class RequestSpan:
+    """
+    Timing and MongoDB usage of one request. Updated from executor threads.
+    """
+
+    __slots__ = ("started", "mongo_commands", "mongo_seconds", "mongo_bytes", "spans", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.mongo_bytes = 0
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_command(self, seconds: float, reply_bytes: int):
+        with self._lock:
+            self.mongo_commands += 1
+            self.mongo_seconds += seconds
+            self.mongo_bytes += reply_bytes
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'db;dur={self.mongo_seconds * 1000:.1f};desc="{self.mongo_commands} cmds"']
+        parts.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items())
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestSpan]] = ContextVar("request_span", default=None)
+
+
+def begin_span() -> RequestSpan:
+    span = RequestSpan()
+    _current.set(span)
+    return span
+
+
+def current_span() -> Optional[RequestSpan]:
+    return _current.get()
+
+
+def observe_span(name: str, seconds: float):
+    """
+    Record time spent in a slow dependency, globally and on the current request.
+    """
+    span_seconds.observe(seconds, name)
+    if (span := _current.get()) is not None:
+        span.add_span(name, seconds)
+
+
+def finish_request(span: RequestSpan, method: str, route: str, status: int) -> float:
+    total = span.elapsed()
+    http_requests.inc(method, route, str(status))
+    http_latency.observe(total, method, route)
+    request_mongo_commands.observe(span.mongo_commands, route)
+    request_mongo_bytes.observe(span.mongo_bytes, route)
+    if settings.METRICS_LOG_REQUESTS:
+        print(json.dumps({
+            "event": "request",
+            "method": method,
+            "route": route,
+            "status": status,
+            "duration_ms": round(total * 1000, 2),
+            "mongo_commands": span.mongo_commands,
+            "mongo_ms": round(span.mongo_seconds * 1000, 2),
+            "mongo_reply_bytes": span.mongo_bytes,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in span.spans.items()},
+        }))
+    return total
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Attributes each command to the request span and the data loader of the
+    context it ran in. Reply sizes are measured by re-encoding the reply; set
+    METRICS_MEASURE_REPLY_BYTES=false to skip that cost.
+    """
+
+    def __init__(self, measure_reply_bytes: bool = True):
+        self.measure_reply_bytes = measure_reply_bytes
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        mongo_command_latency.observe(seconds, event.command_name)
+        record_round_trip()
+        if (span := _current.get()) is not None:
+            reply_bytes = len(bson.encode(event.reply)) if self.measure_reply_bytes else 0
+            span.add_command(seconds, reply_bytes)
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        mongo_command_latency.observe(seconds, event.command_name)
+        mongo_command_failures.inc(event.command_name)
+        record_round_trip()
+        if (span := _current.get()) is not None:
+            span.add_command(seconds, 0)
+
+
+command_listener = MongoCommandListener(settings.METRICS_MEASURE_REPLY_BYTES)
@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class QuizPrefetcher:
+    """
+    Bounded LRU/TTL store of ready-to-serve quizzes, one per user.
+
+    `schedule()` builds a user's next quiz in a background task; `pop()`
+    hands it out in O(1) if it is ready, matches the requested size and has
+    not expired. Scheduling again for a user cancels any build in flight,
+    so a quiz is never served from state older than the user's last write.
+    Builds run in an empty context, so their MongoDB commands aren't
+    charged to the request that scheduled them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._ready: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._limits: "OrderedDict[str, int]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def pop(self, user_id: str, limit: int) -> Optional[Any]:
+        entry = self._ready.pop(user_id, None)
+        if entry is None:
+            return None
+        expires_at, built_limit, quiz = entry
+        if built_limit != limit or expires_at < time.monotonic():
+            return None
+        return quiz
+
+    def last_limit(self, user_id: str) -> Optional[int]:
+        """
+        Quiz size the user last asked for, if we still remember it.
+        """
+        return self._limits.get(user_id)
+
+    def discard(self, user_id: str):
+        self._ready.pop(user_id, None)
+        task = self._tasks.pop(user_id, None)
+        if task is not None:
+            task.cancel()
+
+    def schedule(self, user_id: str, limit: int, build: Callable[[], Awaitable[Any]]):
+        """
+        Start building the user's next quiz in the background, replacing any older one.
+        """
+        self.discard(user_id)
+        self._remember(self._limits, user_id, limit)
+        task = contextvars.Context().run(asyncio.create_task, self._run(user_id, limit, build))
+        self._tasks[user_id] = task
+
+    async def _run(self, user_id, limit, build):
+        try:
+            quiz = await build()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # prefetch is best-effort; the request path will build the quiz itself
+            print(f"Quiz prefetch failed for {user_id}: {e}")
+            return
+        finally:
+            if self._tasks.get(user_id) is asyncio.current_task():
+                del self._tasks[user_id]
+        self._remember(self._ready, user_id, (time.monotonic() + self.ttl_seconds, limit, quiz))
+
+    def _remember(self, store: OrderedDict, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+
+    def __len__(self):
+        return len(self._ready)
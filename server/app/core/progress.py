@@ -0,0 +1,116 @@
+"""
+Per-user progress rollups.
+
+Every submission and study session updates two small documents next to
+its own writes (issued concurrently with them):
+
+- `progress`: one per user (_id = user_id), lifetime totals plus the
+  current/longest streak of consecutive active days (UTC)
+- `progress_daily`: one per user per day, `$inc` counters
+
+so a progress view reads one document plus one per day shown, never the
+quiz history.
+
+The rollups are eventually consistent with the history: their writes go
+to other collections than the mistake/history writes, so they can't share
+one write (and the app doesn't use transactions). A failed rollup write is
+logged, not raised, and app/scripts/backfill_progress.py reconciles the
+rollups with the quiz history buckets and learned-word bitmaps.
+"""
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+from app.constants import COLLECTION_PROGRESS, COLLECTION_PROGRESS_DAILY
+from app.db.indexes import declare_index, declare_query
+
+COUNTERS = ("quizzes", "questions", "wrong_answers", "words_learned")
+
+declare_index(COLLECTION_PROGRESS_DAILY, [("user_id", ASCENDING), ("day", ASCENDING)], unique=True)
+declare_query(COLLECTION_PROGRESS_DAILY, "recent days", {"user_id": "u", "day": {"$gte": "2024-01-01"}},
+              sort=[("day", DESCENDING)], limit=30)
+
+
+def day_key(when) -> str:
+    return when.strftime("%Y-%m-%d")
+
+
+def user_rollup_pipeline(today: str, yesterday: str, counts: Dict[str, int]) -> List[dict]:
+    """
+    Update-pipeline for the per-user document: add the counters and advance
+    the streak (same day: unchanged; day after the last active one: +1; else 1).
+    """
+    return [
+        {"$set": {
+            **{name: {"$add": [{"$ifNull": [f"${name}", 0]}, value]} for name, value in counts.items()},
+            "current_streak": {"$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$last_active_day", today]}, "then": "$current_streak"},
+                    {"case": {"$eq": ["$last_active_day", yesterday]},
+                     "then": {"$add": [{"$ifNull": ["$current_streak", 0]}, 1]}},
+                ],
+                "default": 1,
+            }},
+        }},
+        {"$set": {
+            "longest_streak": {"$max": [{"$ifNull": ["$longest_streak", 0]}, "$current_streak"]},
+            "last_active_day": today,
+        }},
+    ]
+
+
+async def _best_effort(write: Awaitable, user_id: str):
+    try:
+        await write
+    except PyMongoError as e:
+        print(f"⚠️  progress rollup write failed for {user_id} (reconciled by backfill_progress): {e}")
+
+
+def progress_writes(db, user_id: str, now: datetime, **counts: int) -> List[Awaitable]:
+    """
+    The two rollup writes for one activity, e.g. progress_writes(db, u, now, quizzes=1, wrong_answers=3).
+    Returned unawaited so the caller can run (and count) them alongside its own writes;
+    they never fail the caller's request.
+    """
+    unknown = set(counts) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown progress counters: {', '.join(sorted(unknown))}")
+    counts = {name: value for name, value in counts.items() if value}
+    if not counts:
+        return []
+    today = day_key(now)
+    yesterday = day_key(now - timedelta(days=1))
+    return [
+        _best_effort(db[COLLECTION_PROGRESS].update_one(
+            {"_id": user_id}, user_rollup_pipeline(today, yesterday, counts), upsert=True
+        ), user_id),
+        _best_effort(db[COLLECTION_PROGRESS_DAILY].update_one(
+            {"user_id": user_id, "day": today}, {"$inc": counts}, upsert=True
+        ), user_id),
+    ]
+
+
+def current_streak(totals: dict, today: date) -> int:
+    """
+    The stored streak only moves on activity; it is broken once a whole day passes without any.
+    """
+    last = totals.get("last_active_day")
+    if last is None or last < day_key(today - timedelta(days=1)):
+        return 0
+    return totals.get("current_streak", 0)
+
+
+def streaks(days: List[str]) -> Dict[str, Optional[object]]:
+    """
+    Current/longest streak over sorted active days (used by the backfill).
+    """
+    longest = current = 0
+    previous = None
+    for day in days:
+        d = date.fromisoformat(day)
+        current = current + 1 if previous is not None and d - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = d
+    return {"current_streak": current, "longest_streak": longest, "last_active_day": days[-1] if days else None}
@@ -0,0 +1,61 @@
+import random
+from typing import Collection, List, Optional, Sequence
+
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    """
+    Return a private RNG. The same seed always yields the same quiz.
+    """
+    return random.Random(seed)
+
+
+def sample_indices(n: int, k: int, rng: random.Random, exclude: Collection[int] = ()) -> List[int]:
+    """
+    Draw up to k distinct indices from range(n), skipping those in `exclude`.
+
+    Uses rejection sampling, so the cost is proportional to k while the
+    excluded share of the range is small. When most of the range is taken
+    it falls back to sampling from the explicit remainder.
+    """
+    k = min(k, n - len(exclude))
+    if k <= 0:
+        return []
+    if 2 * (k + len(exclude)) > n:
+        pool = [i for i in range(n) if i not in exclude]
+        return rng.sample(pool, k)
+
+    seen = set(exclude)
+    picked = []
+    while len(picked) < k:
+        i = rng.randrange(n)
+        if i not in seen:
+            seen.add(i)
+            picked.append(i)
+    return picked
+
+
+def sample_distractors(
+    pool: Sequence[str], correct: str, k: int, rng: random.Random, exclude: Collection[str] = ()
+) -> List[str]:
+    """
+    Pick up to k distinct texts from `pool` that differ from `correct` (and from `exclude`).
+
+    Draws random positions and rejects repeats; after a bounded number of
+    misses (a tiny or highly repetitive pool) it scans the pool once.
+    """
+    picked = []
+    seen = {correct, *exclude}
+    n = len(pool)
+    tries = 0
+    max_tries = 8 * k + 16
+    while n and len(picked) < k and tries < max_tries:
+        tries += 1
+        text = pool[rng.randrange(n)]
+        if text not in seen:
+            seen.add(text)
+            picked.append(text)
+
+    if len(picked) < k:
+        rest = [text for text in dict.fromkeys(pool) if text not in seen]
+        picked.extend(rng.sample(rest, min(k - len(picked), len(rest))))
+    return picked
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.constants import COLLECTION_MISTAKES
+from app.core.config import settings
+from app.db.indexes import declare_index, declare_query
+
+# one document per (user, word)
+declare_index(COLLECTION_MISTAKES, [("user_id", ASCENDING), ("word_id", ASCENDING)], unique=True)
+# due-review queue: range scan on next_due per user
+declare_index(COLLECTION_MISTAKES, [("user_id", ASCENDING), ("next_due", ASCENDING)])
+declare_query(COLLECTION_MISTAKES, "due for review", {"user_id": "u", "next_due": {"$lte": datetime(2030, 1, 1)}},
+              sort=[("next_due", ASCENDING)], limit=2)
+declare_query(COLLECTION_MISTAKES, "due among candidates",
+              {"user_id": "u", "word_id": {"$in": ["a", "b"]}, "next_due": {"$lte": datetime(2030, 1, 1)}})
+
+
+class IntervalPolicy:
+    """
+    Decides when a mistake word is next due for review.
+
+    A policy runs inside the mistake upsert as aggregation-pipeline stages,
+    after `count` and `last_wrong` have been updated, and must `$set`
+    `next_due`. Policies that need extra state (e.g. an SM-2 ease factor)
+    can keep it on the same mistake document.
+    """
+
+    def update_stages(self) -> List[dict]:
+        raise NotImplementedError
+
+
+class FixedIntervalPolicy(IntervalPolicy):
+    """
+    Simple memory curve: higher count = longer interval.
+    `schedule` is a list of (minimum count, interval), highest count first.
+    """
+
+    def __init__(self, schedule: Sequence[Tuple[int, timedelta]]):
+        self.schedule = sorted(schedule, key=lambda step: -step[0])
+
+    def interval(self, count: int) -> timedelta:
+        for min_count, interval in self.schedule:
+            if count >= min_count:
+                return interval
+        return self.schedule[-1][1]
+
+    def update_stages(self) -> List[dict]:
+        *branches, (_, default) = self.schedule
+        interval_ms = {
+            "$switch": {
+                "branches": [
+                    {"case": {"$gte": ["$count", min_count]}, "then": _ms(interval)}
+                    for min_count, interval in branches
+                ],
+                "default": _ms(default),
+            }
+        }
+        return [{"$set": {"next_due": {"$add": ["$last_wrong", interval_ms]}}}]
+
+
+def _ms(interval: timedelta) -> int:
+    return int(interval.total_seconds() * 1000)
+
+
+POLICIES: Dict[str, IntervalPolicy] = {
+    "fixed": FixedIntervalPolicy([
+        (3, timedelta(days=7)),
+        (2, timedelta(days=3)),
+        (0, timedelta(days=1)),
+    ]),
+}
+
+
+class ReviewScheduler:
+    """
+    Records mistakes with a precomputed `next_due` and serves the due queue
+    as an indexed range query on (user_id, next_due).
+    """
+
+    def __init__(self, policy: IntervalPolicy):
+        self.policy = policy
+
+    def mistake_updates(self, user_id: str, word_ids: List[str], now: datetime) -> List[UpdateOne]:
+        """
+        One upsert per distinct word: bump count, stamp last_wrong, reschedule.
+        """
+        pipeline = [
+            {"$set": {"count": {"$add": [{"$ifNull": ["$count", 0]}, 1]}, "last_wrong": now}},
+            *self.policy.update_stages(),
+        ]
+        return [
+            UpdateOne({"user_id": user_id, "word_id": word_id}, pipeline, upsert=True)
+            for word_id in dict.fromkeys(word_ids)
+        ]
+
+    async def due_word_ids(self, db, user_id: str, now: datetime, limit: Optional[int] = None) -> List[str]:
+        """
+        Word IDs due at `now`, most overdue first, capped at `limit` if given.
+        """
+        cursor = db[COLLECTION_MISTAKES]\
+            .find({"user_id": user_id, "next_due": {"$lte": now}}, {"_id": 0, "word_id": 1})\
+            .sort("next_due", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [m["word_id"] async for m in cursor]
+
+    async def due_among(self, db, user_id: str, word_ids: List[str], now: datetime) -> Set[str]:
+        """
+        Which of `word_ids` are due at `now`. Bounded by len(word_ids), not by the user's backlog.
+        """
+        if not word_ids:
+            return set()
+        cursor = db[COLLECTION_MISTAKES].find(
+            {"user_id": user_id, "word_id": {"$in": word_ids}, "next_due": {"$lte": now}},
+            {"_id": 0, "word_id": 1}
+        )
+        return {m["word_id"] async for m in cursor}
+
+    async def reschedule_all(self, db, query=None):
+        """
+        Recompute next_due for existing mistakes, e.g. after changing policy or migrating.
+        """
+        return await db[COLLECTION_MISTAKES].update_many(query or {}, self.policy.update_stages())
+
+
+scheduler = ReviewScheduler(POLICIES[settings.REVIEW_POLICY])
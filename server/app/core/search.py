@@ -0,0 +1,246 @@
+"""
+In-memory word search.
+
+Māori forms are normalized (lowercase, macrons and other diacritics
+dropped, punctuation folded to spaces) and stored in a character trie,
+which answers exact, prefix and bounded edit-distance lookups. English
+glosses go into an inverted index of tokens. Both map to word IDs.
+
+The index follows the word catalog: `sync()` diffs a new catalog snapshot
+against the words it already holds and only re-indexes words that were
+added, edited or removed, so an import touching a few words costs a few
+trie updates rather than a rebuild. `follow()` does the same for the app,
+with the O(N) diff in a worker thread so the event loop only applies the
+changes.
+"""
+import asyncio
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.distractors import STOPWORDS
+
+MAX_DISTANCE = 2
+
+_separators = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """
+    "Whakapākehā!" → "whakapakeha", "kai-hoko" → "kai hoko".
+    """
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _separators.sub(" ", stripped).strip()
+
+
+def english_tokens(text: str) -> Set[str]:
+    tokens = set(normalize(text).split())
+    return tokens - STOPWORDS or tokens
+
+
+class TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.ids: Set[str] = set()
+
+
+class Trie:
+    def __init__(self):
+        self.root = TrieNode()
+
+    def add(self, key: str, word_id: str):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, TrieNode())
+        node.ids.add(word_id)
+
+    def remove(self, key: str, word_id: str):
+        path = [self.root]
+        for ch in key:
+            node = path[-1].children.get(ch)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].ids.discard(word_id)
+        # prune the branch back to the last node still in use
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.ids or node.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    def _find(self, key: str) -> Optional[TrieNode]:
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, key: str) -> Set[str]:
+        node = self._find(key)
+        return set(node.ids) if node else set()
+
+    def prefix(self, key: str, limit: int) -> List[Tuple[str, Set[str]]]:
+        """
+        Up to `limit` (form, ids) pairs starting with `key`, shortest forms first.
+        """
+        node = self._find(key)
+        if node is None:
+            return []
+        found = []
+        level = [(key, node)]
+        while level and len(found) < limit:
+            level.sort(key=lambda item: item[0])
+            found.extend((form, n.ids) for form, n in level if n.ids)
+            level = [(form + ch, child) for form, n in level for ch, child in n.children.items()]
+        return found[:limit]
+
+    def fuzzy(self, key: str, max_distance: int) -> List[Tuple[int, str, Set[str]]]:
+        """
+        Every (distance, form, ids) within `max_distance` edits (Levenshtein) of `key`.
+
+        Walks the trie carrying one row of the edit-distance table per node
+        and abandons a branch once every cell of its row exceeds the bound.
+        """
+        results = []
+        first_row = list(range(len(key) + 1))
+        stack = [(ch, child, ch, first_row) for ch, child in self.root.children.items()]
+        while stack:
+            ch, node, form, previous = stack.pop()
+            row = [previous[0] + 1]
+            for col in range(1, len(key) + 1):
+                row.append(min(
+                    row[col - 1] + 1,
+                    previous[col] + 1,
+                    previous[col - 1] + (key[col - 1] != ch),
+                ))
+            if node.ids and row[-1] <= max_distance:
+                results.append((row[-1], form, node.ids))
+            if min(row) <= max_distance:
+                stack.extend((c, n, form + c, row) for c, n in node.children.items())
+        return results
+
+
+class WordSearchIndex:
+    """
+    Trie over normalized Māori forms plus an English token index, keyed by word ID.
+    """
+
+    def __init__(self):
+        self.trie = Trie()
+        self.tokens: Dict[str, Set[str]] = defaultdict(set)
+        # word ID → (maori, english) as last indexed
+        self.words: Dict[str, Tuple[str, str]] = {}
+        self.snapshot = None
+        self._following = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word_id: str, maori: str, english: str):
+        self.remove(word_id)
+        self.words[word_id] = (maori, english)
+        self.trie.add(normalize(maori), word_id)
+        for token in english_tokens(english):
+            self.tokens[token].add(word_id)
+
+    def remove(self, word_id: str):
+        old = self.words.pop(word_id, None)
+        if old is None:
+            return
+        maori, english = old
+        self.trie.remove(normalize(maori), word_id)
+        for token in english_tokens(english):
+            ids = self.tokens.get(token)
+            if ids is not None:
+                ids.discard(word_id)
+                if not ids:
+                    del self.tokens[token]
+
+    def diff(self, snapshot) -> Tuple[List[str], Dict[str, Tuple[str, str]]]:
+        """
+        (removed IDs, {added or edited ID: (maori, english)}) against a catalog snapshot.
+        Only reads the index, so it can run in a worker thread while searches go on.
+        """
+        current = dict(zip(snapshot.ids, zip(snapshot.maori, snapshot.english)))
+        removed = [w for w in list(self.words) if w not in current]
+        changed = {w: entry for w, entry in current.items() if self.words.get(w) != entry}
+        return removed, changed
+
+    def apply(self, snapshot, removed: List[str], changed: Dict[str, Tuple[str, str]]) -> int:
+        for word_id in removed:
+            self.remove(word_id)
+        for word_id, entry in changed.items():
+            self.add(word_id, *entry)
+        self.snapshot = snapshot
+        return len(removed) + len(changed)
+
+    def sync(self, snapshot) -> int:
+        """
+        Bring the index in line with a catalog snapshot. Returns the number of words re-indexed.
+        Snapshots are immutable, so each one is diffed once.
+        """
+        if snapshot is self.snapshot:
+            return 0
+        return self.apply(snapshot, *self.diff(snapshot))
+
+    async def follow(self, snapshot) -> int:
+        """
+        `sync()` for a catalog listener: diff off the loop, apply on it, one snapshot at a time.
+        """
+        async with self._following:
+            if snapshot is self.snapshot:
+                return 0
+            removed, changed = await asyncio.to_thread(self.diff, snapshot)
+            return self.apply(snapshot, removed, changed)
+
+    def search(self, query: str, mode: str = "auto", limit: int = 10,
+               max_distance: int = 1) -> List[Tuple[str, str, int]]:
+        """
+        Ranked (word ID, match kind, edit distance) triples.
+
+        Modes: "exact", "prefix" and "fuzzy" match Māori forms, "english"
+        matches gloss tokens (all of them), "auto" tries exact, prefix,
+        English and then fuzzy until `limit` words are found.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        max_distance = min(max_distance, MAX_DISTANCE)
+        results: List[Tuple[str, str, int]] = []
+        seen: Set[str] = set()
+
+        def take(ids: Iterable[str], kind: str, distance: int = 0):
+            for word_id in sorted(ids, key=lambda w: (len(self.words[w][0]), self.words[w][0], w)):
+                if len(results) >= limit:
+                    return
+                if word_id not in seen:
+                    seen.add(word_id)
+                    results.append((word_id, kind, distance))
+
+        if mode in ("exact", "auto"):
+            take(self.trie.exact(key), "exact")
+        if mode in ("prefix", "auto"):
+            for form, ids in self.trie.prefix(key, limit + 1):
+                take(ids, "exact" if form == key else "prefix")
+        if mode in ("english", "auto"):
+            take(self.english(key), "english")
+        if mode in ("fuzzy", "auto") and len(results) < limit:
+            for distance, form, ids in sorted(self.trie.fuzzy(key, max_distance), key=lambda r: (r[0], r[1])):
+                take(ids, "exact" if distance == 0 else "fuzzy", distance)
+        return results
+
+    def english(self, key: str) -> Set[str]:
+        postings = [self.tokens.get(token, set()) for token in english_tokens(key)]
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+
+search_index = WordSearchIndex()
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.metrics import observe_span
+
+
+class PasswordPoolSaturated(Exception):
+    """
+    Raised when too many password jobs are already queued.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification on a small dedicated thread pool.
+
+    bcrypt is deliberately slow (~100–300ms) but releases the GIL, so moving
+    it off the event loop keeps every other request flowing. At most
+    `max_pending` jobs may be queued or running; beyond that callers get
+    PasswordPoolSaturated immediately instead of waiting in an unbounded queue.
+    A job counts as pending until it has actually finished in the pool, even
+    if the request awaiting it was cancelled.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        # guards _pending and the metrics, updated from the pool's threads
+        self._lock = threading.Lock()
+        # metrics
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated()
+            self._pending += 1
+        queued_at = time.perf_counter()
+        timing = {}
+
+        def job():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timing["run"] = time.perf_counter() - started_at
+                self._record(started_at - queued_at, timing["run"])
+
+        future = self._executor.submit(job)
+        future.add_done_callback(self._job_done)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if "run" in timing:
+                observe_span("bcrypt", timing["run"])
+
+    def _job_done(self, future):
+        # runs when the job finishes (or is cancelled before it starts), not when its caller gives up
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, wait: float, run: float):
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.run_seconds_total += run
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "run_seconds_total": self.run_seconds_total,
+            }
+
+
+pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+password_pool = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.constants import COLLECTION_NAME, COLLECTION_META, META_WORDS_VERSION, META_WORD_INDEX
+from app.core.config import settings
+from app.db.indexes import declare_index, declare_query
+from app.utils.assets import StaticAsset
+
+# deltas kept per snapshot (one per `since` version clients ask about)
+MAX_CACHED_DELTAS = 16
+
+# dense word index, used as the bit position in learned-word bitmaps
+declare_index(COLLECTION_NAME, "idx", unique=True, sparse=True)
+declare_query(COLLECTION_NAME, "catalog load", {}, expect_collscan=True)
+
+
+class CatalogSnapshot:
+    """
+    Immutable, in-memory view of the words collection.
+
+    Words are kept in parallel tuples ordered by their dense word index
+    (`idx`, assigned at import time), so position i of `ids`, `indexes`,
+    `maori` and `english` always describes the same word.
+
+    Precomputed distractors live in one flat array, `distractor_k` slots per
+    word, holding catalog positions (-1 for an empty slot).
+
+    `revs` holds the catalog version in which each word's text last changed
+    (0 if it predates revisions); it drives the delta exports clients sync with.
+    """
+
+    def __init__(self, ids=(), indexes=(), maori=(), english=(), version=0, distractors=(), distractor_k=0,
+                 revs=()):
+        self.ids: Tuple[str, ...] = tuple(ids)
+        self.indexes: Tuple[int, ...] = tuple(indexes)
+        self.maori: Tuple[str, ...] = tuple(maori)
+        self.english: Tuple[str, ...] = tuple(english)
+        self.version: int = version
+        self.revs: Tuple[int, ...] = tuple(revs) or (0,) * len(self.ids)
+        self.positions: Dict[str, int] = {wid: i for i, wid in enumerate(self.ids)}
+        self.by_index: Dict[int, int] = {idx: i for i, idx in enumerate(self.indexes)}
+        # one past the highest dense index; bitmaps over the catalog never need more bits
+        self.index_limit: int = self.indexes[-1] + 1 if self.indexes else 0
+        self.distractor_k = distractor_k
+        self.distractors = array("i", [-1]) * (len(self.ids) * distractor_k)
+        for pos, similar in enumerate(distractors):
+            slot = pos * distractor_k
+            for idx in similar or ():
+                other = self.by_index.get(idx)
+                if other is not None and slot < (pos + 1) * distractor_k:
+                    self.distractors[slot] = other
+                    slot += 1
+        # encoding tasks, shared by concurrent requests for the same asset
+        self._export: Optional[asyncio.Future] = None
+        self._deltas: "OrderedDict[int, asyncio.Future]" = OrderedDict()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, word_id):
+        return word_id in self.positions
+
+    def word(self, word_id: str) -> Optional[dict]:
+        """
+        Return {"id", "maori", "english"} for a word ID, or None if unknown.
+        """
+        pos = self.positions.get(word_id)
+        if pos is None:
+            return None
+        return self.word_at(pos)
+
+    def word_at(self, pos: int) -> dict:
+        return {"id": self.ids[pos], "maori": self.maori[pos], "english": self.english[pos]}
+
+    def index_of(self, word_id: str) -> Optional[int]:
+        """
+        Dense word index for a word ID, or None if unknown.
+        """
+        pos = self.positions.get(word_id)
+        return None if pos is None else self.indexes[pos]
+
+    def similar_english(self, word_id: str) -> List[str]:
+        """
+        English glosses of the word's precomputed distractor candidates (best first).
+        """
+        pos = self.positions.get(word_id)
+        if pos is None or not self.distractor_k:
+            return []
+        start = pos * self.distractor_k
+        return [self.english[p] for p in self.distractors[start:start + self.distractor_k] if p >= 0]
+
+    def id_of_index(self, index: int) -> Optional[str]:
+        pos = self.by_index.get(index)
+        return None if pos is None else self.ids[pos]
+
+    def _encode(self, positions, since: Optional[int] = None) -> StaticAsset:
+        payload = {"version": self.version}
+        if since is not None:
+            payload["since"] = since
+        payload["words"] = [self.word_at(pos) for pos in positions]
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return StaticAsset(body, "application/json", 0.0)
+
+    async def export(self) -> StaticAsset:
+        """
+        The whole word list as JSON ({"version", "words": [{id, maori, english}]}),
+        encoded and compressed once per snapshot, in a worker thread.
+        """
+        if self._export is None:
+            self._export = asyncio.ensure_future(asyncio.to_thread(self._encode, range(len(self.ids))))
+        return await asyncio.shield(self._export)
+
+    async def delta(self, since: int) -> StaticAsset:
+        """
+        Words whose text changed after catalog version `since` ({"version", "since", "words"}).
+        Words are never deleted, so applying the delta to a copy at `since` brings it up to date.
+        """
+        task = self._deltas.get(since)
+        if task is None:
+            positions = (pos for pos, rev in enumerate(self.revs) if rev > since)
+            task = asyncio.ensure_future(asyncio.to_thread(self._encode, positions, since))
+            self._deltas[since] = task
+            if len(self._deltas) > MAX_CACHED_DELTAS:
+                self._deltas.popitem(last=False)
+        return await asyncio.shield(task)
+
+
+class WordCatalog:
+    """
+    Process-wide word catalog, loaded once and shared by all requests.
+
+    The catalog is versioned by a counter document in the meta collection.
+    Whoever changes the words collection calls `bump_version()`; every
+    worker re-reads the counter at most once per CATALOG_CHECK_SECONDS and
+    reloads its snapshot when the counter has moved.
+
+    Derived in-memory structures (the search index) register with
+    `on_load()` and are updated once per new snapshot, not per request.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._listeners: List[Callable[[CatalogSnapshot], Any]] = []
+
+    def on_load(self, listener: Callable[[CatalogSnapshot], Awaitable[Any]]):
+        """
+        Await `listener(snapshot)` whenever a new snapshot is loaded.
+
+        Listeners run after the catalog lock is released (requests already
+        see the new snapshot) and should push CPU-heavy work to a thread.
+        A failing listener is logged; it never fails the load.
+        """
+        self._listeners.append(listener)
+
+    async def _notify(self, snapshot: CatalogSnapshot):
+        for listener in self._listeners:
+            try:
+                await listener(snapshot)
+            except Exception as e:
+                print(f"⚠️  catalog listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._checked_at < settings.CATALOG_CHECK_SECONDS
+        )
+
+    def invalidate(self):
+        """
+        Drop the current snapshot so the next `get()` reloads it.
+        """
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    async def get(self, db) -> CatalogSnapshot:
+        """
+        Return the current snapshot, loading or refreshing it if needed.
+        """
+        if self._is_fresh():
+            return self._snapshot
+
+        loaded = None
+        async with self._lock:
+            if self._is_fresh():
+                # another request refreshed while we waited
+                return self._snapshot
+            version = await get_words_version(db)
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = loaded = await load_snapshot(db, version)
+            self._checked_at = time.monotonic()
+            snapshot = self._snapshot
+        if loaded is not None:
+            await self._notify(loaded)
+        return snapshot
+
+    async def refresh(self, db) -> CatalogSnapshot:
+        """
+        Force a reload from the database.
+        """
+        self.invalidate()
+        return await self.get(db)
+
+    async def bump_version(self, db):
+        """
+        Mark the words collection as changed for every worker.
+        """
+        await db[COLLECTION_META].update_one(
+            {"_id": META_WORDS_VERSION},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+        self.invalidate()
+
+
+async def get_words_version(db) -> int:
+    """
+    Read the words collection version marker (0 if never set).
+    """
+    doc = await db[COLLECTION_META].find_one({"_id": META_WORDS_VERSION})
+    return doc.get("version", 0) if doc else 0
+
+
+async def load_snapshot(db, version: int) -> CatalogSnapshot:
+    """
+    Read every word once, projecting only the fields the catalog keeps.
+    Words that were inserted without a dense index get one assigned first.
+    """
+    projection = {"_id": 1, "idx": 1, "maori": 1, "english": 1, "distractors": 1, "rev": 1}
+    docs = await db[COLLECTION_NAME].find({}, projection).to_list(None)
+    if any("idx" not in word for word in docs):
+        await assign_word_indexes(db, docs)
+        docs = await db[COLLECTION_NAME].find({}, projection).to_list(None)
+
+    docs = sorted((word for word in docs if "idx" in word), key=lambda word: word["idx"])
+    return CatalogSnapshot(
+        [str(word["_id"]) for word in docs],
+        [word["idx"] for word in docs],
+        [word["maori"] for word in docs],
+        [word["english"] for word in docs],
+        version,
+        [word.get("distractors") for word in docs],
+        settings.DISTRACTOR_TOP_K,
+        [word.get("rev", 0) for word in docs],
+    )
+
+
+async def reserve_word_indexes(db, count: int, floor: int = 0) -> int:
+    """
+    Atomically reserve `count` consecutive dense word indexes; returns the first.
+    `floor` guards against a missing counter when words already carry indexes.
+    """
+    meta = db[COLLECTION_META]
+    await meta.update_one({"_id": META_WORD_INDEX}, {"$max": {"next": floor}}, upsert=True)
+    doc = await meta.find_one_and_update(
+        {"_id": META_WORD_INDEX},
+        {"$inc": {"next": count}},
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["next"] - count
+
+
+async def assign_word_indexes(db, docs=None) -> int:
+    """
+    Give every word in `docs` (default: the whole words collection) that lacks
+    one a dense index, in _id order. Returns the number of indexes assigned.
+    """
+    if docs is None:
+        docs = await db[COLLECTION_NAME].find({}, {"_id": 1, "idx": 1}).to_list(None)
+    missing = sorted((word["_id"] for word in docs if "idx" not in word))
+    if not missing:
+        return 0
+    floor = max((word["idx"] for word in docs if "idx" in word), default=-1) + 1
+    start = await reserve_word_indexes(db, len(missing), floor)
+    await db[COLLECTION_NAME].bulk_write(
+        [
+            UpdateOne({"_id": word_id, "idx": {"$exists": False}}, {"$set": {"idx": start + i}})
+            for i, word_id in enumerate(missing)
+        ],
+        ordered=False
+    )
+    return len(missing)
+
+
+catalog = WordCatalog()
+# encode the full export as soon as a snapshot loads, not on the first download
+catalog.on_load(CatalogSnapshot.export)
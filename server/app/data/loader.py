@@ -1,7 +1,71 @@
 import json
 from importlib.resources import files
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Union
+
+_decoder = json.JSONDecoder()
+
+
+def default_words_path():
+    return files("app.data").joinpath("words.json")
+
+
+def iter_words(source: Optional[Union[str, IO[str]]] = None, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Stream word dicts from a JSON array or JSONL file without loading it whole.
+    `source` is a path or an open text file; defaults to the bundled words.json.
+    """
+    if source is None:
+        with default_words_path().open("r", encoding="utf-8") as f:
+            yield from iter_words(f, chunk_size)
+        return
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_words(f, chunk_size)
+        return
+
+    buf = ""
+    pos = 0
+    in_array = None
+    eof = False
+    while True:
+        # skip whitespace and the array's punctuation between items
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if in_array is None and pos < len(buf):
+            in_array = buf[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if pos < len(buf) and buf[pos] == "]" and in_array:
+            return
+        try:
+            if pos >= len(buf):
+                raise ValueError("need more data")
+            item, end = _decoder.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                if buf[pos:].strip():
+                    raise ValueError(f"Malformed word data near: {buf[pos:pos + 80]!r}")
+                return
+            chunk = source.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """
+    Group an iterable into lists of at most `size` items.
+    """
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
 
 def load_words_from_file():
     # returns a Python list of dicts
-    data = files("app.data").joinpath("words.json").read_text(encoding="utf-8")
-    return json.loads(data)
\ No newline at end of file
+    return list(iter_words())
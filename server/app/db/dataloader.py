@@ -0,0 +1,63 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class RequestLoader:
+    """
+    Request-scoped loader for MongoDB reads.
+
+    - `load(key, fetch)` runs `fetch` at most once per key per request;
+      repeated lookups share the same result.
+    - `gather(...)` awaits independent loads concurrently, so a handler
+      waits for its slowest query instead of the sum of all of them.
+    - `round_trips` counts the MongoDB commands the request actually issued
+      (catalog refreshes and cache misses included), as reported by the
+      command listener in app/core/metrics.py.
+    """
+
+    def __init__(self):
+        self._loads: Dict[Hashable, asyncio.Future] = {}
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = self._loads.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._loads[key] = future
+        return future
+
+    def count_round_trip(self):
+        # called from Motor's executor threads
+        with self._lock:
+            self.round_trips += 1
+
+    @staticmethod
+    async def gather(*awaitables):
+        return await asyncio.gather(*awaitables)
+
+
+_current: ContextVar[Optional[RequestLoader]] = ContextVar("request_loader", default=None)
+
+
+def current_loader() -> RequestLoader:
+    """
+    The loader of the request being served (a throwaway one outside a request).
+    """
+    return _current.get() or RequestLoader()
+
+
+def begin_request() -> RequestLoader:
+    loader = RequestLoader()
+    _current.set(loader)
+    return loader
+
+
+def record_round_trip():
+    """
+    Charge one MongoDB command to the request whose context it ran in, if any.
+    """
+    if (loader := _current.get()) is not None:
+        loader.count_round_trip()
@@ -0,0 +1,129 @@
+"""
+Declarative index registry.
+
+Modules that own a collection declare its indexes (and the query shapes
+they run) next to the code that needs them:
+
+    declare_index(COLLECTION_CODES, [("email", ASCENDING), ("code", ASCENDING)])
+    declare_query(COLLECTION_CODES, "verify code", {"email": "x@example.com", "code": "abc123"})
+
+`create_indexes()` builds everything declared, `check_indexes()` compares
+the declarations with what exists, and app/scripts/index_advisor.py runs
+explain() on the declared query shapes to flag collection scans.
+"""
+import importlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Modules whose import registers declarations.
+DECLARING_MODULES = (
+    "app.api.auth",
+    "app.api.quiz",
+    "app.core.history",
+    "app.core.manifest",
+    "app.core.progress",
+    "app.core.scheduler",
+    "app.data.catalog",
+    "app.scripts.import_words",
+)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+
+    @property
+    def options(self) -> dict:
+        options = {}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return options
+
+    def describe(self) -> str:
+        keys = ", ".join(f"{k}:{d}" for k, d in self.keys)
+        opts = " ".join(f"{k}={v}" for k, v in self.options.items())
+        return f"{self.collection} ({keys}) {opts}".rstrip()
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    collection: str
+    name: str
+    filter: dict
+    sort: Optional[Sequence[Tuple[str, int]]] = None
+    limit: Optional[int] = None
+    # full scans that are intended (e.g. loading the catalog)
+    expect_collscan: bool = False
+
+
+INDEXES: List[IndexSpec] = []
+QUERY_SHAPES: List[QueryShape] = []
+
+
+def declare_index(collection: str, keys, unique=False, sparse=False, expire_after_seconds=None) -> IndexSpec:
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    spec = IndexSpec(collection, tuple((k, d) for k, d in keys), unique, sparse, expire_after_seconds)
+    if spec not in INDEXES:
+        INDEXES.append(spec)
+    return spec
+
+
+def declare_query(collection: str, name: str, filter: dict, sort=None, limit=None, expect_collscan=False) -> QueryShape:
+    shape = QueryShape(collection, name, filter, tuple(sort) if sort else None, limit, expect_collscan)
+    if not any(q.name == name and q.collection == collection for q in QUERY_SHAPES):
+        QUERY_SHAPES.append(shape)
+    return shape
+
+
+def load_declarations():
+    for module in DECLARING_MODULES:
+        importlib.import_module(module)
+
+
+async def create_indexes(db):
+    load_declarations()
+    for spec in INDEXES:
+        await db[spec.collection].create_index(list(spec.keys), **spec.options)
+
+
+def _existing_matches(spec: IndexSpec, info: dict) -> bool:
+    return (
+        tuple((k, d if isinstance(d, str) else int(d)) for k, d in info["key"]) == spec.keys
+        and bool(info.get("unique")) == spec.unique
+        and bool(info.get("sparse")) == spec.sparse
+        and info.get("expireAfterSeconds") == spec.expire_after_seconds
+    )
+
+
+async def check_indexes(db) -> Dict[str, List[str]]:
+    """
+    Compare declared indexes with those in the database.
+    Returns {"missing": [...], "undeclared": [...]} as readable descriptions.
+    """
+    load_declarations()
+    report = {"missing": [], "undeclared": []}
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in INDEXES:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    for collection, specs in by_collection.items():
+        existing = await db[collection].index_information()
+        existing.pop("_id_", None)
+        matched = set()
+        for spec in specs:
+            name = next((n for n, info in existing.items() if _existing_matches(spec, info)), None)
+            if name is None:
+                report["missing"].append(spec.describe())
+            else:
+                matched.add(name)
+        report["undeclared"].extend(f"{collection}.{n}" for n in existing if n not in matched)
+    return report
@@ -1,5 +1,7 @@
-from app.constants import COLLECTION_USERS
+from app.db.indexes import create_indexes as create_declared_indexes
 
 async def create_indexes(db):
-    await db[COLLECTION_USERS].create_index("username", unique=True)
-    await db[COLLECTION_USERS].create_index("email", unique=True)
+    """
+    Build every index declared through app.db.indexes.declare_index().
+    """
+    await create_declared_indexes(db)
@@ -0,0 +1,118 @@
+"""
+One-time schema and seed setup, coordinated across workers.
+
+Index builds and word seeding are recorded in a schema version marker in
+the meta collection. On boot a worker only reads that marker (one
+find_one by _id); setup runs only when the marker is behind, and then by
+exactly one process holding a lock document while the others wait for the
+marker to move. The holder renews its lock while setup runs, so a slow
+setup is never taken over; waiting workers keep waiting while it does
+(bounded only if SCHEMA_SETUP_WAIT_SECONDS is set).
+
+    python -m app.db.migrations      # run setup ahead of a deploy
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from app.constants import COLLECTION_META, META_SCHEMA_VERSION, META_SCHEMA_LOCK
+from app.core.config import settings
+from app.db.init import create_indexes
+from app.data.catalog import assign_word_indexes
+from app.scripts.import_words import import_words_if_empty
+from app.scripts.build_distractors import build_distractors
+
+# Bump whenever declared indexes or the seed data change.
+SCHEMA_VERSION = 5
+
+LOCK_TTL = timedelta(minutes=5)
+LOCK_RENEW_SECONDS = LOCK_TTL.total_seconds() / 3
+
+
+async def get_schema_version(db) -> int:
+    doc = await db[COLLECTION_META].find_one({"_id": META_SCHEMA_VERSION})
+    return doc.get("version", 0) if doc else 0
+
+
+async def run_setup(db):
+    """
+    Build indexes, seed words and fill in distractor lists. All steps are idempotent.
+    Words stored before dense indexes existed get one first: the distractor
+    build only sees indexed words.
+    """
+    await create_indexes(db)
+    await import_words_if_empty()
+    await assign_word_indexes(db)
+    await build_distractors(db)
+
+
+async def renew_lock(meta, owner: str, every: float = LOCK_RENEW_SECONDS):
+    """
+    Keep pushing our lock's expiry out while setup runs (cancelled when it ends).
+    """
+    while True:
+        await asyncio.sleep(every)
+        result = await meta.update_one(
+            {"_id": META_SCHEMA_LOCK, "owner": owner},
+            {"$set": {"expires_at": datetime.now(timezone.utc) + LOCK_TTL}}
+        )
+        if result.matched_count == 0:
+            print("⚠️  schema setup lock was lost; another worker may run setup too")
+            return
+
+
+async def ensure_schema(db, wait_seconds: float = None, poll_seconds: float = 0.5) -> bool:
+    """
+    Bring the database up to SCHEMA_VERSION. Returns True if this process ran the setup.
+    `wait_seconds` (default SCHEMA_SETUP_WAIT_SECONDS; 0 = no limit) bounds the wait for another worker.
+    """
+    if await get_schema_version(db) >= SCHEMA_VERSION:
+        return False
+
+    meta = db[COLLECTION_META]
+    owner = uuid.uuid4().hex
+    if wait_seconds is None:
+        wait_seconds = settings.SCHEMA_SETUP_WAIT_SECONDS
+    deadline = asyncio.get_running_loop().time() + wait_seconds if wait_seconds else None
+    while True:
+        now = datetime.now(timezone.utc)
+        # a crashed holder leaves a lock behind; reclaim it once it has expired
+        await meta.delete_one({"_id": META_SCHEMA_LOCK, "expires_at": {"$lt": now}})
+        try:
+            await meta.insert_one({"_id": META_SCHEMA_LOCK, "owner": owner, "expires_at": now + LOCK_TTL})
+            break
+        except DuplicateKeyError:
+            pass
+        await asyncio.sleep(poll_seconds)
+        if await get_schema_version(db) >= SCHEMA_VERSION:
+            return False
+        if deadline is not None and asyncio.get_running_loop().time() > deadline:
+            raise RuntimeError("Timed out waiting for another worker to finish schema setup")
+
+    renewal = asyncio.create_task(renew_lock(meta, owner))
+    try:
+        if await get_schema_version(db) >= SCHEMA_VERSION:
+            return False
+        print(f"🛠  schema setup → version {SCHEMA_VERSION}")
+        await run_setup(db)
+        await meta.update_one(
+            {"_id": META_SCHEMA_VERSION},
+            {"$set": {"version": SCHEMA_VERSION, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        return True
+    finally:
+        renewal.cancel()
+        await meta.delete_one({"_id": META_SCHEMA_LOCK, "owner": owner})
+
+
+async def main():
+    from app.db.mongodb import db
+    ran = await ensure_schema(db)
+    print("✅ Schema setup complete." if ran else f"📦 Schema already at version {SCHEMA_VERSION}.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from app.core.config import settings
+from app.core.metrics import command_listener
 
-client = AsyncIOMotorClient(settings.MONGO_URI)
+client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[command_listener])
 db = client[settings.DB_NAME]
@@ -1,28 +1,70 @@
+import asyncio
 import pathlib
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
+import re
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from contextlib import asynccontextmanager
 
-from app.api import vocabulary, quiz, auth
-from app.scripts.import_words import import_words_if_empty
+from app.api import vocabulary, quiz, auth, metrics, progress
 from app.db.mongodb import db
-from app.db.init import create_indexes
+from app.db.migrations import SCHEMA_VERSION, ensure_schema, get_schema_version
+from app.db.indexes import check_indexes
+from app.core.config import settings
+from app.data.catalog import catalog
+from app.db.dataloader import begin_request
+from app.core.metrics import begin_span, finish_request
+from app.utils.email import email_queue
+from app.core.manifest import manifest_signer
+from app.utils.assets import IMMUTABLE, REVALIDATE, AssetCache, asset_response
 
 # ─── 1. Locate the client/build directory ───────────────────────
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]  # → .../server
 BUILD_DIR    = PROJECT_ROOT / "client" / "build"
-STATIC_DIR   = BUILD_DIR / "static"
 INDEX_FILE   = BUILD_DIR / "index.html"
 
+# Built client files, held in memory with gzip/brotli variants
+assets = AssetCache(BUILD_DIR, settings.ASSET_CHECK_SECONDS)
+
 # ─── 2. Lifespan hook: initialize database at startup ────────────
+async def warm_catalog():
+    try:
+        await catalog.get(db)
+    except Exception as e:
+        print(f"Catalog warm-up failed, will load on first request: {e}")
+
+async def report_index_drift():
+    try:
+        report = await check_indexes(db)
+    except Exception as e:
+        print(f"Index check failed: {e}")
+        return
+    for spec in report["missing"]:
+        print(f"⚠️  missing index: {spec}")
+    for name in report["undeclared"]:
+        print(f"ℹ️  undeclared index: {name}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("🚀 startup: import words and create indexes…")
-    await import_words_if_empty()
-    await create_indexes(db)
+    # Up-to-date workers only read the schema marker; setup runs once per
+    # schema version, under a lock, however many workers boot together.
+    if settings.SCHEMA_SETUP_ON_STARTUP:
+        await ensure_schema(db)
+    elif await get_schema_version(db) < SCHEMA_VERSION:
+        print(f"⚠️  schema is behind version {SCHEMA_VERSION}; run `python -m app.db.migrations`")
+    if manifest_signer is None:
+        print("⚠️  QUIZ_MANIFEST_SECRET is not set: quiz manifests are disabled and every "
+              "quiz result is checked against the words collection")
+    assets.preload()
+    print(f"🚀 startup: {len(assets)} client files cached, warming word catalog in the background…")
+    # requests that arrive first simply load the catalog themselves
+    warmup = asyncio.create_task(warm_catalog())
+    index_check = asyncio.create_task(report_index_drift())
+    await email_queue.start()
     yield
     print("🛑 shutdown")
+    warmup.cancel()
+    index_check.cancel()
+    await email_queue.stop()
 
 # ─── 3. Create FastAPI application ──────────────────────────────
 app = FastAPI(
@@ -31,39 +73,74 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# ─── 4. Mount static files ─────────────────────────────────────
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# ─── 3b. Per-request data loader: dedupes reads and reports DB round-trips ─
+@app.middleware("http")
+async def count_db_round_trips(request: Request, call_next):
+    loader = begin_request()
+    response = await call_next(request)
+    response.headers["X-DB-Round-Trips"] = str(loader.round_trips)
+    return response
+
+def _route_label(request: Request) -> str:
+    # route template (e.g. /quiz/), not the raw path, to keep label cardinality bounded
+    route = request.scope.get("route")
+    return route.path if route else "unmatched"
+
+# ─── 3c. Request metrics: latency, MongoDB commands/bytes, bcrypt & SMTP time ─
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+    span = begin_span()
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish_request(span, request.method, _route_label(request), 500)
+        raise
+    total = finish_request(span, request.method, _route_label(request), response.status_code)
+    response.headers["Server-Timing"] = span.server_timing(total)
+    return response
+
+# ─── 4. Static files: hashed build output, cached for a year ──
+@app.get("/static/{asset_path:path}", include_in_schema=False)
+async def serve_static(asset_path: str, request: Request):
+    asset = await assets.get(f"static/{asset_path}")
+    if asset is None:
+        raise HTTPException(status_code=404)
+    return asset_response(asset, request, IMMUTABLE)
 
 # ─── 5. Include application routers ────────────────────────────
 app.include_router(vocabulary.router, prefix="/vocabulary", tags=["Vocabulary"])
 app.include_router(quiz.router,       prefix="/quiz",       tags=["Quiz"])
 app.include_router(auth.router,       prefix="/auth",       tags=["Authentication"])
+app.include_router(progress.router,   prefix="/progress",   tags=["Progress"])
+app.include_router(metrics.router)
 
 # ─── 6. Root path: serve the React frontend index ──────────────
-@app.get("/", response_class=HTMLResponse)
-async def serve_index():
-    # Debug: print whether index.html exists
-    exists = INDEX_FILE.exists()
-    print(f"serve_index → {INDEX_FILE} exists? {exists}")
-    if not exists:
+async def index_response(request: Request):
+    asset = await assets.get("index.html")
+    if asset is None:
         raise HTTPException(status_code=500, detail="index.html not found")
-    return HTMLResponse(INDEX_FILE.read_text(encoding="utf-8"))
+    return asset_response(asset, request, REVALIDATE)
+
+@app.get("/", response_class=HTMLResponse)
+async def serve_index(request: Request):
+    return await index_response(request)
 
 # ─── 7. SPA catch-all: return index for any unmatched frontend route ─
+# These prefixes are handled by FastAPI or static files
+API_PREFIXES = re.compile(r"(?:static|vocabulary|quiz|auth|progress|metrics|docs|openapi\.json|redoc)(?:/|$)")
+
 @app.get("/{full_path:path}", response_class=HTMLResponse)
-async def spa_catchall(full_path: str):
-    # These prefixes are handled by FastAPI or static files
-    allowed_prefixes = (
-        "static",       # static assets
-        "vocabulary",   # API routes
-        "quiz",
-        "auth",
-        "docs",         # Swagger UI
-        "openapi.json", # OpenAPI spec
-        "redoc",        # Redoc UI
-    )
-    if full_path.startswith(allowed_prefixes):
+async def spa_catchall(full_path: str, request: Request):
+    if API_PREFIXES.match(full_path):
         # Delegate to FastAPI for 404 or docs
         raise HTTPException(status_code=404)
+    # top-level build files (favicon.ico, manifest.json, ...) are served as-is;
+    # only preloaded ones, so deep links and junk URLs never reach the disk
+    if full_path in assets:
+        asset = await assets.get(full_path)
+        if asset is not None:
+            return asset_response(asset, request, REVALIDATE)
     # Otherwise serve the frontend index
-    return HTMLResponse(INDEX_FILE.read_text(encoding="utf-8"))
+    return await index_response(request)
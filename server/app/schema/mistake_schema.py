@@ -1,6 +1,6 @@
 # app/schema/mistake_schema.py
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 
 class MistakeSubmission(BaseModel):
@@ -10,9 +10,11 @@ class MistakeSubmission(BaseModel):
     Fields:
     - user_id (str): User identifier or session ID. Default is 'anonymous'.
     - wrong_word_ids (List[str]): List of word ObjectId (as string) the user answered incorrectly in this quiz.
+    - manifest (str): Optional signed quiz manifest from the X-Quiz-Manifest header of GET /quiz/.
     """
     user_id: Optional[str] = Field(default="anonymous", description="User identifier or session ID")
     wrong_word_ids: List[str] = Field(..., description="List of word _id values the user answered incorrectly")
+    manifest: Optional[str] = Field(default=None, description="Signed quiz manifest returned with the quiz")
 
 class QuizItem(BaseModel):
     """
@@ -30,3 +32,31 @@ class QuizItem(BaseModel):
     options: List[str]
     answer: str
     is_review: bool = False
+
+class QuizBatchRequest(BaseModel):
+    """
+    Schema for generating many quizzes in one call.
+
+    Either `user_ids` (one quiz per user, e.g. a whole class) or `user_id`
+    with `count` (a session of quizzes for one user; each reviews different mistakes).
+
+    Fields:
+    - user_ids (List[str]): Users to generate one quiz each for.
+    - user_id (str): Single user for a session of `count` quizzes.
+    - count (int): Number of quizzes for `user_id`.
+    - limit (int): Questions per quiz.
+    - seed (int): Optional seed for a reproducible batch.
+    """
+    user_ids: Optional[List[str]] = Field(default=None, min_length=1, max_length=500)
+    user_id: Optional[str] = None
+    count: int = Field(default=1, ge=1, le=50)
+    limit: int = Field(default=10, ge=1, le=100)
+    seed: Optional[int] = None
+
+    @model_validator(mode="after")
+    def one_target(self):
+        if (self.user_ids is None) == (self.user_id is None):
+            raise ValueError("Provide either user_ids or user_id")
+        if self.user_ids is not None and self.count != 1:
+            raise ValueError("count applies to a single user_id")
+        return self
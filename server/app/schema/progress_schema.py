@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class DailyProgress(BaseModel):
+    """
+    Activity counters for one (UTC) day.
+    """
+    day: str = Field(..., description="YYYY-MM-DD")
+    quizzes: int = 0
+    questions: int = 0
+    wrong_answers: int = 0
+    words_learned: int = 0
+
+class ProgressResponse(BaseModel):
+    """
+    Schema for a user's progress summary.
+
+    Fields:
+    - quizzes / questions / wrong_answers / words_learned (int): Lifetime totals.
+      `questions` only counts quizzes submitted with a manifest (their size is known).
+    - current_streak (int): Consecutive active days up to today or yesterday.
+    - longest_streak (int): Longest run of consecutive active days.
+    - last_active_day (str): Last day with a quiz or study session.
+    - daily (List[DailyProgress]): Active days in the requested window, most recent first.
+    """
+    user_id: str
+    quizzes: int = 0
+    questions: int = 0
+    wrong_answers: int = 0
+    words_learned: int = 0
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_active_day: Optional[str] = None
+    daily: List[DailyProgress] = Field(default_factory=list)
@@ -1,9 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict
 
 class UserLearnedWords(BaseModel):
     """
-    Stores the list of word IDs that a user has learned.
+    Stores the set of words that a user has learned, as a bitmap over dense word indexes.
+
+    Fields:
+    - user_id (str): User identifier.
+    - learned_bits (Dict[str, int]): 64-bit chunks of the bitmap keyed by chunk number (see app/core/bitmap.py).
     """
     user_id: str = Field(..., description="User ID", alias="_id")
-    learned_ids: List[str] = Field(default_factory=list, description="List of learned word IDs")
+    learned_bits: Dict[str, int] = Field(default_factory=dict, description="Learned-word bitmap chunks")
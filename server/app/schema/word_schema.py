@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Literal
 
 class WordPublic(BaseModel):
     """
@@ -12,4 +13,15 @@ class WordPublic(BaseModel):
     id: str
     maori: str
     english: str
+
+class WordMatch(WordPublic):
+    """
+    A word search hit.
+
+    Fields:
+    - match (str): "exact", "prefix" or "fuzzy" (Māori form, macrons ignored) or "english" (gloss tokens)
+    - distance (int): Edit distance from the query (fuzzy matches only, otherwise 0)
+    """
+    match: Literal["exact", "prefix", "fuzzy", "english"]
+    distance: int = 0
     
\ No newline at end of file
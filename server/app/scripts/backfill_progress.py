@@ -0,0 +1,147 @@
+"""
+Rebuild or reconcile progress rollups from quiz history buckets and learned-word bitmaps.
+
+Rollup writes are best-effort next to the submission's own writes (see
+app/core/progress.py), so run this after a deploy to backfill and then
+periodically to repair rollups that missed an update. For every user
+with quiz history, learned words or rollups (run
+app/scripts/migrate_quiz_history.py first if legacy quiz_history
+documents remain):
+
+- `progress_daily`: quizzes and wrong answers per day are raised to at
+  least what the history shows (`$max`), so re-running is harmless and
+  days already counted live are not double-counted; days whose buckets
+  were archived keep their rollups
+- `progress`: totals and streaks are recomputed from the daily documents
+  (`words_learned` at least the size of the user's learned bitmap) and
+  applied as a delta against the stored document, so live updates that
+  land while the backfill runs are kept, never overwritten
+
+Legacy history only recorded submissions with at least one wrong answer,
+so quiz counts backfilled from it are a lower bound; `questions` is not
+known for past quizzes and is left as is.
+
+    python -m app.scripts.backfill_progress [--batch-size 500]
+"""
+import argparse
+import asyncio
+
+from typing import List
+
+from pymongo import UpdateOne
+
+from app.constants import (
+    COLLECTION_PROGRESS,
+    COLLECTION_PROGRESS_DAILY,
+    COLLECTION_QUIZ_BUCKETS,
+    COLLECTION_USER_LEARNED,
+)
+from app.core.bitmap import WordBitmap
+from app.core.progress import COUNTERS, streaks
+
+# a user-day can span several buckets
+HISTORY_BY_DAY = [
+    {"$group": {
+        "_id": {"user_id": "$user_id", "day": "$day"},
+        "quizzes": {"$sum": "$count"},
+        "wrong_answers": {"$sum": "$wrong_count"},
+    }},
+]
+
+
+def daily_update(row) -> UpdateOne:
+    key = row["_id"]
+    return UpdateOne(
+        {"user_id": key["user_id"], "day": key["day"]},
+        {"$max": {"quizzes": row["quizzes"], "wrong_answers": row["wrong_answers"]}},
+        upsert=True,
+    )
+
+
+def user_rollup(daily_docs, learned_count: int) -> dict:
+    """
+    Totals and streaks for one user from their daily documents (any order).
+    """
+    daily_docs = sorted(daily_docs, key=lambda d: d["day"])
+    totals = {name: sum(d.get(name, 0) for d in daily_docs) for name in COUNTERS}
+    totals["words_learned"] = max(totals["words_learned"], learned_count)
+    totals.update(streaks([d["day"] for d in daily_docs]))
+    return totals
+
+
+def reconcile_pipeline(current: dict, target: dict) -> List[dict]:
+    """
+    Update-pipeline moving a `progress` document towards `target` (from user_rollup()).
+
+    Counters are raised by their shortfall against `current` (read just
+    before) and never lowered, so live `$inc`s are added on top. Streaks
+    are replaced only when the history saw a later active day than the
+    document, and merged with `$max` on the same day.
+    """
+    deltas = {name: max(0, target[name] - current.get(name, 0)) for name in COUNTERS}
+    stored_day = {"$ifNull": ["$last_active_day", ""]}
+    newer = {"$gt": [target["last_active_day"], stored_day]}
+    same_day = {"$eq": [target["last_active_day"], stored_day]}
+    return [
+        {"$set": {
+            **{name: {"$add": [{"$ifNull": [f"${name}", 0]}, delta]} for name, delta in deltas.items()},
+            "current_streak": {"$switch": {
+                "branches": [
+                    {"case": newer, "then": target["current_streak"]},
+                    {"case": same_day, "then": {"$max": ["$current_streak", target["current_streak"]]}},
+                ],
+                "default": {"$ifNull": ["$current_streak", target["current_streak"]]},
+            }},
+            "longest_streak": {"$max": [{"$ifNull": ["$longest_streak", 0]}, target["longest_streak"]]},
+            "last_active_day": {"$cond": [newer, target["last_active_day"], "$last_active_day"]},
+        }},
+    ]
+
+
+async def active_user_ids(db) -> set:
+    """
+    Everyone with a learned-word bitmap or an existing rollup (quiz history users are added by the caller).
+    """
+    users = {doc["_id"] async for doc in db[COLLECTION_USER_LEARNED].find({}, {"_id": 1})}
+    users.update(doc["_id"] async for doc in db[COLLECTION_PROGRESS].find({}, {"_id": 1}))
+    return users
+
+
+async def backfill_progress(db, batch_size=500):
+    """
+    Backfill or reconcile every active user. Returns the number of users updated.
+    """
+    users = await active_user_ids(db)
+    pending = []
+    async for row in db[COLLECTION_QUIZ_BUCKETS].aggregate(HISTORY_BY_DAY, allowDiskUse=True):
+        users.add(row["_id"]["user_id"])
+        pending.append(daily_update(row))
+        if len(pending) >= batch_size:
+            await db[COLLECTION_PROGRESS_DAILY].bulk_write(pending, ordered=False)
+            pending = []
+    if pending:
+        await db[COLLECTION_PROGRESS_DAILY].bulk_write(pending, ordered=False)
+
+    for user_id in sorted(users):
+        daily_docs = await db[COLLECTION_PROGRESS_DAILY].find({"user_id": user_id}).to_list(None)
+        learned = await db[COLLECTION_USER_LEARNED].find_one({"_id": user_id}, {"learned_bits": 1})
+        learned_count = len(WordBitmap.from_chunks((learned or {}).get("learned_bits") or {}))
+        current = await db[COLLECTION_PROGRESS].find_one({"_id": user_id}) or {}
+        await db[COLLECTION_PROGRESS].update_one(
+            {"_id": user_id}, reconcile_pipeline(current, user_rollup(daily_docs, learned_count)), upsert=True
+        )
+    return len(users)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from app.db.mongodb import db
+    users = await backfill_progress(db, args.batch_size)
+    print(f"✅ Backfilled progress for {users} users.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
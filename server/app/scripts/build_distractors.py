@@ -0,0 +1,63 @@
+"""
+Build (or incrementally refresh) the per-word distractor lists.
+
+Scores every word against a shortlist of others (see app/core/distractors.py)
+and stores the top DISTRACTOR_TOP_K as `distractors` (dense word indexes) on
+each word document. Only lists that changed are written.
+
+    python -m app.scripts.build_distractors            # full rebuild
+"""
+import argparse
+import asyncio
+from typing import Iterable, Optional
+
+from pymongo import UpdateOne
+
+from app.constants import COLLECTION_NAME
+from app.core.config import settings
+from app.core.distractors import DistractorIndex
+from app.data.catalog import catalog
+
+
+async def build_distractors(db, changed_maori: Optional[Iterable[str]] = None, bump_version: bool = True) -> int:
+    """
+    Full rebuild, or an incremental one for the given (new or edited) words.
+    Returns the number of word documents updated.
+    """
+    coll = db[COLLECTION_NAME]
+    words = await coll.find(
+        {"idx": {"$exists": True}},
+        {"_id": 0, "idx": 1, "maori": 1, "english": 1, "explanation": 1, "distractors": 1}
+    ).to_list(None)
+    current = {w["idx"]: w["distractors"] for w in words if "distractors" in w}
+    changed = None if changed_maori is None else set(changed_maori)
+
+    def compute():
+        index = DistractorIndex(words, settings.DISTRACTOR_TOP_K)
+        if changed is None:
+            return {idx: others for idx, others in index.build().items() if current.get(idx) != others}
+        return index.update(current, {w["idx"] for w in words if w["maori"] in changed})
+
+    # CPU-bound over the whole dictionary; keep the event loop serving requests
+    lists = await asyncio.to_thread(compute)
+
+    if lists:
+        await coll.bulk_write(
+            [UpdateOne({"idx": idx}, {"$set": {"distractors": others}}) for idx, others in lists.items()],
+            ordered=False
+        )
+        if bump_version:
+            await catalog.bump_version(db)
+    return len(lists)
+
+
+async def main():
+    from app.db.mongodb import db
+
+    argparse.ArgumentParser(description="Rebuild the distractor index for every word.").parse_args()
+    updated = await build_distractors(db)
+    print(f"✅ Distractor lists updated for {updated} words.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
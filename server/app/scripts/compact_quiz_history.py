@@ -0,0 +1,105 @@
+"""
+Archive quiz history buckets older than the retention window.
+
+Buckets whose day is more than QUIZ_HISTORY_RETENTION_DAYS ago are written,
+one JSON line per bucket, to a gzip file per day under
+QUIZ_HISTORY_ARCHIVE_DIR (<dir>/<YYYY-MM>/<YYYY-MM-DD>.jsonl.gz) and then
+deleted. A day is streamed in (user_id, _id) order and flushed a few users
+at a time, so memory holds at most FLUSH_BUCKETS buckets plus one user's
+day. A file is fsynced before its buckets are deleted; files are only
+ever appended to (as extra gzip members, which `zcat` and `gzip.open`
+read transparently), so an interrupted run can at worst repeat a bucket,
+identified by its `_id`.
+
+    python -m app.scripts.compact_quiz_history [--retention-days 365] [--archive-dir DIR] [--dry-run]
+"""
+import argparse
+import asyncio
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+
+from bson import json_util
+from bson.json_util import JSONOptions, JSONMode
+from pymongo import ASCENDING
+
+from app.constants import COLLECTION_QUIZ_BUCKETS
+from app.core.config import settings
+from app.core.progress import day_key
+
+JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=True)
+# buckets held before a flush; a user's buckets for the day are never split
+FLUSH_BUCKETS = 1000
+
+
+def archive_path(archive_dir: str, day: str) -> str:
+    return os.path.join(archive_dir, day[:7], f"{day}.jsonl.gz")
+
+
+def write_archive(path: str, buckets) -> None:
+    """
+    Append buckets to a gzip JSONL file and flush it to disk.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for bucket in buckets:
+                gz.write(json_util.dumps(bucket, json_options=JSON_OPTIONS).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+async def compact_quiz_history(db, retention_days=None, archive_dir=None, dry_run=False, now=None):
+    """
+    Archive and delete expired buckets, one day at a time.
+    Returns (days archived, buckets archived).
+    """
+    retention_days = retention_days if retention_days is not None else settings.QUIZ_HISTORY_RETENTION_DAYS
+    archive_dir = archive_dir or settings.QUIZ_HISTORY_ARCHIVE_DIR
+    cutoff = day_key((now or datetime.now(timezone.utc)) - timedelta(days=retention_days))
+
+    collection = db[COLLECTION_QUIZ_BUCKETS]
+    days = await collection.distinct("day", {"day": {"$lt": cutoff}})
+    archived = 0
+    for day in sorted(days):
+        if dry_run:
+            archived += await collection.count_documents({"day": day})
+            continue
+        path = archive_path(archive_dir, day)
+        pending, user_id = [], None
+        cursor = collection.find({"day": day}).sort([("user_id", ASCENDING), ("_id", ASCENDING)])
+        async for bucket in cursor:
+            if bucket["user_id"] != user_id and len(pending) >= FLUSH_BUCKETS:
+                archived += await flush(collection, path, pending)
+                pending = []
+            user_id = bucket["user_id"]
+            pending.append(bucket)
+        if pending:
+            archived += await flush(collection, path, pending)
+    return len(days), archived
+
+
+async def flush(collection, path: str, buckets) -> int:
+    """
+    Archive buckets, then delete them; returns how many were archived.
+    """
+    await asyncio.to_thread(write_archive, path, buckets)
+    await collection.delete_many({"_id": {"$in": [b["_id"] for b in buckets]}})
+    return len(buckets)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--archive-dir", default=None)
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+
+    from app.db.mongodb import db
+    days, buckets = await compact_quiz_history(db, args.retention_days, args.archive_dir, args.dry_run)
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"✅ {verb} {buckets} quiz history buckets from {days} days.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
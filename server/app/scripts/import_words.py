@@ -1,18 +1,136 @@
+"""
+Import a word dictionary into MongoDB.
+
+Streams a JSON array or JSONL file in bounded batches and upserts each
+batch with one unordered bulk_write keyed on `maori`. Each batch is
+diffed against what is stored first, so re-importing the same file writes
+nothing and an edited file only touches the changed entries. New and
+edited words are stamped with `rev`, the catalog version the import
+publishes, for GET /vocabulary/catalog?since= deltas.
+
+    python -m app.scripts.import_words [path] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
 from app.db.mongodb import db
 from app.constants import COLLECTION_NAME
-import json
-from pathlib import Path
+from app.data.catalog import catalog, get_words_version, reserve_word_indexes
+from app.data.loader import iter_batches, iter_words
+from app.scripts.build_distractors import build_distractors
+from app.db.indexes import declare_index, declare_query
+
+# import upserts are keyed on the Māori form
+declare_index(COLLECTION_NAME, "maori", unique=True)
+declare_query(COLLECTION_NAME, "import diff", {"maori": {"$in": ["ahi", "wai"]}})
+
+WORD_FIELDS = ("english", "explanation")
+
+
+def diff_batch(batch, existing):
+    """
+    Compare incoming words with stored ones (both keyed by maori).
+
+    Returns (new words, {maori: changed fields}, unchanged count). Within a
+    batch the last entry for a maori form wins.
+    """
+    incoming = {w["maori"]: w for w in batch}
+    new = []
+    changed = {}
+    unchanged = 0
+    for maori, word in incoming.items():
+        fields = {k: word[k] for k in WORD_FIELDS if k in word}
+        stored = existing.get(maori)
+        if stored is None:
+            new.append(word)
+            continue
+        delta = {k: v for k, v in fields.items() if stored.get(k) != v}
+        if delta:
+            changed[maori] = delta
+        else:
+            unchanged += 1
+    return new, changed, unchanged
+
+
+async def import_batch(db, batch, touched=None, rev=None):
+    """
+    Upsert one batch: one read to diff, one unordered bulk_write to apply.
+    Maori forms of new or edited words are added to `touched` if given, and
+    stamped with `rev` if given.
+    """
+    coll = db[COLLECTION_NAME]
+    maori_forms = list({w["maori"] for w in batch})
+    existing = {
+        doc["maori"]: doc
+        async for doc in coll.find({"maori": {"$in": maori_forms}}, {"_id": 0, "maori": 1, **{k: 1 for k in WORD_FIELDS}})
+    }
+    new, changed, unchanged = diff_batch(batch, existing)
+    if touched is not None:
+        touched.update(word["maori"] for word in new)
+        touched.update(changed)
+
+    stamp = {"rev": rev} if rev is not None else {}
+    ops = [UpdateOne({"maori": maori}, {"$set": {**delta, **stamp}}) for maori, delta in changed.items()]
+    if new:
+        # dense word indexes key the per-user learned bitmaps
+        start = await reserve_word_indexes(db, len(new))
+        ops.extend(
+            UpdateOne(
+                {"maori": word["maori"]},
+                {
+                    "$set": {**{k: word[k] for k in WORD_FIELDS if k in word}, **stamp},
+                    "$setOnInsert": {"idx": start + i},
+                },
+                upsert=True
+            )
+            for i, word in enumerate(new)
+        )
+    if ops:
+        await coll.bulk_write(ops, ordered=False)
+    return {"inserted": len(new), "updated": len(changed), "unchanged": unchanged}
+
+
+async def import_words(db, source=None, batch_size=1000):
+    """
+    Stream `source` (path or file; default: bundled words.json) into the words collection.
+    Refreshes the distractor lists around new/edited words, and bumps the
+    catalog version only if something changed.
+    """
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+    touched = set()
+    # the version bump_version() below publishes (imports are not run concurrently)
+    rev = await get_words_version(db) + 1
+    for batch in iter_batches(iter_words(source), batch_size):
+        for key, count in (await import_batch(db, batch, touched, rev)).items():
+            totals[key] += count
+
+    if touched:
+        await build_distractors(db, touched, bump_version=False)
+    if totals["inserted"] or totals["updated"]:
+        await catalog.bump_version(db)
+    return totals
+
 
 async def import_words_if_empty():
-    existing_count = await db[COLLECTION_NAME].count_documents({})
-    if existing_count > 0:
-        print(f"📦 Database already contains {existing_count} words. Skipping import.")
+    if await db[COLLECTION_NAME].find_one({}, {"_id": 1}):
+        print("📦 Database already contains words. Skipping import.")
         return
 
-    base_dir = Path(__file__).resolve().parent.parent
-    json_path = base_dir / "data" / "words.json"
-    with open(json_path) as f:
-        data = json.load(f)
+    totals = await import_words(db)
+    print(f"✅ Imported {totals['inserted']} words into MongoDB.")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import a word dictionary (JSON array or JSONL).")
+    parser.add_argument("path", nargs="?", help="dictionary file (default: bundled words.json)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    totals = await import_words(db, args.path, args.batch_size)
+    print(f"✅ {totals['inserted']} inserted, {totals['updated']} updated, {totals['unchanged']} unchanged.")
+
 
-    await db[COLLECTION_NAME].insert_many(data)
-    print(f"✅ Imported {len(data)} words into MongoDB.")
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Explain every declared query shape and flag the ones that scan a whole
+collection instead of using an index.
+
+    python -m app.scripts.index_advisor
+"""
+import asyncio
+
+from app.db.indexes import QUERY_SHAPES, check_indexes, load_declarations
+
+
+def plan_stages(plan):
+    """
+    Yield every stage name in an explain() plan tree.
+    With the slot-based engine (MongoDB 7+) the winning plan wraps the
+    classic tree in `queryPlan`, next to the engine-specific `slotBasedPlan`.
+    """
+    if not plan:
+        return
+    if "queryPlan" in plan:
+        yield from plan_stages(plan["queryPlan"])
+        return
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain_shape(db, shape):
+    command = {"find": shape.collection, "filter": shape.filter}
+    if shape.sort:
+        command["sort"] = dict(shape.sort)
+    if shape.limit:
+        command["limit"] = shape.limit
+    result = await db.command("explain", command, verbosity="queryPlanner")
+    return result["queryPlanner"]["winningPlan"]
+
+
+async def advise(db):
+    """
+    Returns a list of (shape, stages) for unexpected collection scans.
+    """
+    load_declarations()
+    flagged = []
+    for shape in QUERY_SHAPES:
+        stages = list(plan_stages(await explain_shape(db, shape)))
+        if "COLLSCAN" in stages and not shape.expect_collscan:
+            flagged.append((shape, stages))
+    return flagged
+
+
+async def main():
+    from app.db.mongodb import db
+
+    report = await check_indexes(db)
+    for spec in report["missing"]:
+        print(f"⚠️  missing index: {spec}")
+
+    flagged = await advise(db)
+    for shape, stages in flagged:
+        print(f"🐢 {shape.collection} · {shape.name}: {' → '.join(stages)}")
+    if not flagged:
+        print(f"✅ {len(QUERY_SHAPES)} query shapes use indexes.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
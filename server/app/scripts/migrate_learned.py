@@ -0,0 +1,65 @@
+"""
+Convert user_learned documents from `learned_ids` string arrays to `learned_bits` bitmaps.
+
+Legacy:  {_id: user_id, learned_ids: ["<word ObjectId>", ...]}
+Current: {_id: user_id, learned_bits: {"<chunk no>": Int64, ...}}
+
+Bits are OR-ed in with `$bit` and `learned_ids` is unset in the same update,
+so the migration is idempotent and safe alongside live traffic. IDs of
+words that no longer exist are dropped.
+
+    python -m app.scripts.migrate_learned [--batch-size 500]
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.constants import COLLECTION_USER_LEARNED
+from app.core.bitmap import WordBitmap
+from app.data.catalog import catalog
+
+
+def legacy_doc_to_update(doc, words):
+    """
+    Build the update that moves one document's learned_ids into its bitmap.
+    """
+    bitmap = WordBitmap.from_indexes(
+        idx for idx in map(words.index_of, doc.get("learned_ids", [])) if idx is not None
+    )
+    update = {"$unset": {"learned_ids": ""}}
+    if bitmap:
+        update["$bit"] = {f"learned_bits.{chunk}": {"or": value} for chunk, value in bitmap.to_chunks().items()}
+    return UpdateOne({"_id": doc["_id"]}, update)
+
+
+async def migrate_learned(db, batch_size=500):
+    """
+    Rewrite every legacy user_learned document. Returns the number of users migrated.
+    """
+    words = await catalog.refresh(db)
+    users = 0
+    pending = []
+    async for doc in db[COLLECTION_USER_LEARNED].find({"learned_ids": {"$exists": True}}):
+        users += 1
+        pending.append(legacy_doc_to_update(doc, words))
+        if len(pending) >= batch_size:
+            await db[COLLECTION_USER_LEARNED].bulk_write(pending, ordered=False)
+            pending = []
+    if pending:
+        await db[COLLECTION_USER_LEARNED].bulk_write(pending, ordered=False)
+    return users
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from app.db.mongodb import db
+    users = await migrate_learned(db, args.batch_size)
+    print(f"✅ Migrated learned words for {users} users.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Migrate mistakes from the legacy embedded-array format to one document per (user, word).
+
+Legacy:  user_mistakes  {_id: user_id, wrong_words: [{id, count, last_wrong}, ...]}
+Current: mistakes       {user_id, word_id, count, last_wrong, next_due}
+
+The migration is idempotent: re-running it keeps the larger count and the
+later last_wrong of the two formats, so it is safe to run while traffic is
+already writing the new format. Afterwards every entry is rescheduled so
+next_due reflects the current review policy.
+
+    python -m app.scripts.migrate_mistakes [--batch-size 1000] [--drop-legacy]
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.constants import COLLECTION_MISTAKES, COLLECTION_USER_MISTAKES
+from app.core.scheduler import scheduler
+from app.db.init import create_indexes
+
+
+def legacy_doc_to_updates(doc):
+    """
+    Turn one legacy user_mistakes document into upserts for the mistakes collection.
+    """
+    user_id = doc["_id"]
+    updates = []
+    for w in doc.get("wrong_words", []):
+        if "id" not in w:
+            continue
+        update = {"$max": {"count": w.get("count", 1)}}
+        if w.get("last_wrong") is not None:
+            update["$max"]["last_wrong"] = w["last_wrong"]
+        updates.append(UpdateOne({"user_id": user_id, "word_id": w["id"]}, update, upsert=True))
+    return updates
+
+
+async def migrate_mistakes(db, batch_size=1000, drop_legacy=False):
+    """
+    Copy every legacy mistake entry into the mistakes collection in unordered batches.
+    Returns (users migrated, entries written).
+    """
+    await create_indexes(db)
+    users = 0
+    entries = 0
+    pending = []
+    async for doc in db[COLLECTION_USER_MISTAKES].find({"wrong_words": {"$exists": True}}):
+        users += 1
+        pending.extend(legacy_doc_to_updates(doc))
+        if len(pending) >= batch_size:
+            await db[COLLECTION_MISTAKES].bulk_write(pending, ordered=False)
+            entries += len(pending)
+            pending = []
+    if pending:
+        await db[COLLECTION_MISTAKES].bulk_write(pending, ordered=False)
+        entries += len(pending)
+
+    await scheduler.reschedule_all(db)
+    if drop_legacy:
+        await db[COLLECTION_USER_MISTAKES].drop()
+    return users, entries
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop-legacy", action="store_true", help="drop user_mistakes after copying")
+    args = parser.parse_args()
+
+    from app.db.mongodb import db
+    users, entries = await migrate_mistakes(db, args.batch_size, args.drop_legacy)
+    print(f"✅ Migrated {entries} mistake entries for {users} users.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Move legacy quiz_history documents (one per submission) into day buckets.
+
+Legacy:  quiz_history          {user_id, wrong_word_ids, timestamp}
+Current: quiz_history_buckets  {user_id, day, count, wrong_count, first, last, submissions: [...]}
+
+Legacy documents are grouped per user and day (in timestamp order) and
+written as buckets with deterministic IDs ("legacy:<user>:<day>:<n>"),
+replacing any earlier run's output, so the migration is idempotent. New
+submissions go to separate buckets, so it is safe alongside live traffic.
+
+    python -m app.scripts.migrate_quiz_history [--batch-size 500] [--drop-legacy]
+"""
+import argparse
+import asyncio
+
+from pymongo import ReplaceOne
+
+from app.constants import COLLECTION_QUIZ_BUCKETS, COLLECTION_QUIZ_HISTORY
+from app.core.config import settings
+from app.db.init import create_indexes
+
+LEGACY_BY_DAY = [
+    {"$sort": {"user_id": 1, "timestamp": 1}},
+    {"$group": {
+        "_id": {
+            "user_id": "$user_id",
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+        },
+        "submissions": {"$push": {"at": "$timestamp", "wrong_word_ids": {"$ifNull": ["$wrong_word_ids", []]}}},
+    }},
+]
+
+
+def legacy_day_to_buckets(row, bucket_size):
+    """
+    Turn one user-day of legacy submissions into bucket replacements.
+    """
+    user_id, day = row["_id"]["user_id"], row["_id"]["day"]
+    submissions = row["submissions"]
+    writes = []
+    for n, start in enumerate(range(0, len(submissions), bucket_size)):
+        chunk = submissions[start:start + bucket_size]
+        bucket_id = f"legacy:{user_id}:{day}:{n}"
+        writes.append(ReplaceOne({"_id": bucket_id}, {
+            "_id": bucket_id,
+            "user_id": user_id,
+            "day": day,
+            "count": len(chunk),
+            "wrong_count": sum(len(s["wrong_word_ids"]) for s in chunk),
+            "first": chunk[0]["at"],
+            "last": chunk[-1]["at"],
+            "submissions": chunk,
+        }, upsert=True))
+    return writes
+
+
+async def migrate_quiz_history(db, batch_size=500, drop_legacy=False, bucket_size=None):
+    """
+    Bucket every legacy submission. Returns the number of submissions migrated.
+    """
+    bucket_size = bucket_size or settings.QUIZ_HISTORY_BUCKET_SIZE
+    await create_indexes(db)
+
+    migrated = 0
+    pending = []
+    async for row in db[COLLECTION_QUIZ_HISTORY].aggregate(LEGACY_BY_DAY, allowDiskUse=True):
+        migrated += len(row["submissions"])
+        pending.extend(legacy_day_to_buckets(row, bucket_size))
+        if len(pending) >= batch_size:
+            await db[COLLECTION_QUIZ_BUCKETS].bulk_write(pending, ordered=False)
+            pending = []
+    if pending:
+        await db[COLLECTION_QUIZ_BUCKETS].bulk_write(pending, ordered=False)
+
+    if drop_legacy:
+        await db[COLLECTION_QUIZ_HISTORY].drop()
+    return migrated
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--drop-legacy", action="store_true", help="drop quiz_history after migrating")
+    args = parser.parse_args()
+
+    from app.db.mongodb import db
+    migrated = await migrate_quiz_history(db, args.batch_size, args.drop_legacy)
+    print(f"✅ Migrated {migrated} quiz submissions into day buckets.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
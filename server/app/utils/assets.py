@@ -0,0 +1,164 @@
+"""
+In-memory cache for the built React client.
+
+Files under client/build are read once, kept with precompressed gzip and brotli
+(from requirements.txt; skipped if the package is missing) variants and a content
+ETag, and re-read only when their mtime changes. Each file's mtime is
+checked at most every `check_seconds`, off the event loop. Misses are
+remembered for as long (up to MAX_MISSES paths), so repeated requests for
+files that don't exist don't touch the disk either.
+"""
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import pathlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# not worth compressing (already compressed or tiny)
+MIN_COMPRESS_BYTES = 256
+# paths remembered as missing (oldest forgotten first)
+MAX_MISSES = 4096
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/manifest+json")
+
+
+class StaticAsset:
+    __slots__ = ("body", "gzip", "br", "etag", "media_type", "mtime", "checked")
+
+    def __init__(self, body: bytes, media_type: str, mtime: float):
+        self.body = body
+        self.media_type = media_type
+        self.mtime = mtime
+        self.checked = time.monotonic()
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.gzip = self.br = None
+        if len(body) >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body)
+                if len(compressed) < len(body):
+                    self.br = compressed
+
+    def variant(self, accept_encoding: str):
+        """
+        Pick (body, content-encoding, etag) for an Accept-Encoding header.
+        """
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        if self.br is not None and "br" in accepted:
+            return self.br, "br", f'"{self.etag}-br"'
+        if self.gzip is not None and "gzip" in accepted:
+            return self.gzip, "gzip", f'"{self.etag}-gz"'
+        return self.body, None, f'"{self.etag}"'
+
+
+def _load(path: pathlib.Path) -> Optional[StaticAsset]:
+    try:
+        mtime = path.stat().st_mtime
+        body = path.read_bytes()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    return StaticAsset(body, media_type, mtime)
+
+
+def _mtime(path: pathlib.Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+class AssetCache:
+    def __init__(self, root: pathlib.Path, check_seconds: float = 2.0):
+        self.root = root.resolve()
+        self.check_seconds = check_seconds
+        self._assets: Dict[str, StaticAsset] = {}
+        self._misses: "OrderedDict[str, float]" = OrderedDict()
+
+    def preload(self):
+        """
+        Read every file under the build directory (startup, blocking).
+        """
+        if not self.root.is_dir():
+            return
+        for path in self.root.rglob("*"):
+            if path.is_file():
+                asset = _load(path)
+                if asset is not None:
+                    self._assets[path.relative_to(self.root).as_posix()] = asset
+
+    def _resolve(self, relpath: str) -> Optional[pathlib.Path]:
+        path = (self.root / relpath).resolve()
+        if path == self.root or self.root not in path.parents:
+            return None
+        return path
+
+    def _miss(self, relpath: str):
+        self._misses[relpath] = time.monotonic()
+        self._misses.move_to_end(relpath)
+        if len(self._misses) > MAX_MISSES:
+            self._misses.popitem(last=False)
+
+    async def get(self, relpath: str) -> Optional[StaticAsset]:
+        asset = self._assets.get(relpath)
+        if asset is not None and time.monotonic() - asset.checked < self.check_seconds:
+            return asset
+        missed_at = self._misses.get(relpath)
+        if missed_at is not None and time.monotonic() - missed_at < self.check_seconds:
+            return None
+
+        path = self._resolve(relpath)
+        if path is None:
+            self._miss(relpath)
+            return None
+        if asset is not None:
+            mtime = await asyncio.to_thread(_mtime, path)
+            if mtime == asset.mtime:
+                asset.checked = time.monotonic()
+                return asset
+        asset = await asyncio.to_thread(_load, path)
+        if asset is None:
+            self._assets.pop(relpath, None)
+            self._miss(relpath)
+        else:
+            self._assets[relpath] = asset
+            self._misses.pop(relpath, None)
+        return asset
+
+    def __contains__(self, relpath: str) -> bool:
+        return relpath in self._assets
+
+    def __len__(self):
+        return len(self._assets)
+
+
+def asset_response(asset: StaticAsset, request: Request, cache_control: str) -> Response:
+    body, encoding, etag = asset.variant(request.headers.get("accept-encoding", ""))
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in _etags(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=asset.media_type, headers=headers)
+
+
+def _etags(header: str):
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
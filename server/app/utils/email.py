@@ -1,29 +1,302 @@
+import asyncio
 import smtplib
-from smtplib import SMTPAuthenticationError, SMTPConnectError, SMTPException
+import threading
+import time
+from datetime import datetime, timezone
 from email.message import EmailMessage
+from smtplib import SMTPException
+from typing import Awaitable, Callable, Dict, List, Optional
+
 from app.core.config import settings
+from app.constants import COLLECTION_EMAIL_DEAD_LETTERS
+from app.db.mongodb import db
+from app.core.metrics import observe_span
+
 
-def send_verification_email(to_email: str, code: str) -> None:
+def build_verification_email(to_email: str, code: str) -> EmailMessage:
     """
-    Send a plain‐text email containing the verification code.
-    This runs in a background thread/task so blocking smtplib is acceptable.
+    Build the plain‐text email containing the verification code.
     """
     msg = EmailMessage()
     msg["Subject"] = "Your verification code"
     msg["From"] = settings.SMTP_SENDER
     msg["To"] = to_email
     msg.set_content(f"Your verification code is: {code}\nIt expires in {settings.VERIFICATION_CODE_EXPIRE_MINUTES} minutes.")
+    return msg
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP connections open between sends.
+
+    Opening a session costs a TCP connect, STARTTLS and LOGIN; reusing one
+    costs a NOOP. All methods block and are meant to run in a worker thread.
+    """
+
+    def __init__(self, max_idle: int):
+        self.max_idle = max_idle
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            if self._alive(conn):
+                return conn
+            self.discard(conn)
+
+    def release(self, conn: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        self.discard(conn)
+
+    def discard(self, conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except (SMTPException, OSError):
+            conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+    def deliver_batch(
+        self,
+        messages: List[EmailMessage],
+        errors: Optional[List[Optional[Exception]]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> List[Optional[Exception]]:
+        """
+        Send messages over pooled connections; returns one error (or None) per message sent.
+        A failed message retires its connection, and the next one reconnects.
+        `errors` is filled in as messages go out, and once `stop` is set no
+        further message is started, so a caller that gives up knows which
+        messages were never attempted.
+        """
+        errors = [] if errors is None else errors
+        conn = None
+        for msg in messages:
+            if stop is not None and stop.is_set():
+                break
+            try:
+                if conn is None:
+                    conn = self.acquire()
+                conn.send_message(msg)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+                if conn is not None:
+                    self.discard(conn)
+                    conn = None
+        if conn is not None:
+            self.release(conn)
+        return errors
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+        smtp.starttls()
+        smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
+
+    @staticmethod
+    def _alive(conn: smtplib.SMTP) -> bool:
+        try:
+            return conn.noop()[0] == 250
+        except (SMTPException, OSError):
+            return False
+
+
+class Delivery:
+    __slots__ = ("message", "attempts")
+
+    def __init__(self, message: EmailMessage):
+        self.message = message
+        self.attempts = 0
+
+
+async def record_dead_letter(delivery: Delivery, error: Exception):
+    """
+    Persist an email that could not be delivered after all retries.
+    """
+    await db[COLLECTION_EMAIL_DEAD_LETTERS].insert_one({
+        "to": delivery.message["To"],
+        "subject": delivery.message["Subject"],
+        "body": delivery.message.get_content(),
+        "attempts": delivery.attempts,
+        "error": f"{type(error).__name__}: {error}",
+        "failed_at": datetime.now(timezone.utc),
+    })
+
 
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as smtp:
-            smtp.starttls()
-            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            smtp.send_message(msg)
-    except SMTPAuthenticationError as e:
-        print(f"SMTP auth failed: {e}")
-    except SMTPConnectError as e:
-        print(f"SMTP connection failed: {e}")
-    except SMTPException as e:
-        print(f"SMTP error occurred: {e}")
-    except Exception as e:
-        print(f"Unexpected error during sending email: {e}")
+class EmailQueueStopped(Exception):
+    """
+    Recorded as the error of messages still waiting to be (re)tried at shutdown.
+    """
+
+
+class EmailQueue:
+    """
+    Async email delivery: queued, batched, retried with exponential backoff.
+
+    Once `start()`ed (from the app lifespan), `submit()` only enqueues and
+    worker tasks drain the queue in batches over pooled SMTP connections.
+    When the queue is not running (scripts, tests) `submit()` delivers
+    inline with the same pool and retry policy. Messages that still fail
+    after `max_attempts` go to the dead-letter sink, as do messages still
+    queued or waiting for a retry when the queue is stopped.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        backoff_seconds: float,
+        dead_letter: Callable[[Delivery, Exception], Awaitable[None]] = record_dead_letter,
+    ):
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.dead_letter = dead_letter
+        self.sent = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # retry task → the delivery it will re-queue
+        self._retries: Dict[asyncio.Task, Delivery] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Drain what is queued (up to `timeout`), then stop workers and close connections.
+        Messages still undelivered (queued, backing off before a retry, or in a
+        batch cut short) are dead-lettered; the message being sent when a batch
+        is cut short may still go out, so its dead letter can be a duplicate.
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        workers = self._tasks
+        # taken before awaiting: each retry task drops out of _retries once it's cancelled
+        undelivered = list(self._retries.values())
+        for task in [*workers, *self._retries]:
+            task.cancel()
+        # a worker cancelled mid-batch dead-letters the rest of its batch before it exits
+        await asyncio.gather(*workers, return_exceptions=True)
+        while not self._queue.empty():
+            undelivered.append(self._queue.get_nowait())
+        self._tasks = []
+        self._retries.clear()
+        if undelivered:
+            print(f"Email queue stopped with {len(undelivered)} messages undelivered")
+        for delivery in undelivered:
+            await self._record_failure(delivery, EmailQueueStopped("email queue stopped before delivery"))
+        await asyncio.to_thread(self.pool.close_all)
+
+    async def submit(self, message: EmailMessage):
+        delivery = Delivery(message)
+        if self.running:
+            await self._queue.put(delivery)
+            return
+        while await self._deliver([delivery]):
+            await asyncio.sleep(self._backoff(delivery))
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                for delivery in await self._deliver(batch):
+                    task = asyncio.create_task(self._retry_later(delivery))
+                    self._retries[task] = delivery
+                    task.add_done_callback(lambda t: self._retries.pop(t, None))
+            except Exception as e:
+                print(f"Email worker error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, batch: List[Delivery]) -> List[Delivery]:
+        """
+        Send a batch; dead-letter exhausted messages and return those to retry.
+        """
+        started = time.perf_counter()
+        errors: List[Optional[Exception]] = []
+        stop = threading.Event()
+        try:
+            await asyncio.to_thread(self.pool.deliver_batch, [d.message for d in batch], errors, stop)
+        except asyncio.CancelledError:
+            # shutting down mid-batch: whatever isn't known to be sent goes to the dead letter
+            stop.set()
+            done = list(errors)
+            undelivered = [d for d, error in zip(batch, done) if error is not None] + batch[len(done):]
+            self.sent += done.count(None)
+            for delivery in undelivered:
+                await self._record_failure(delivery, EmailQueueStopped("email queue stopped mid-batch"))
+            raise
+        observe_span("smtp", time.perf_counter() - started)
+        retries = []
+        for delivery, error in zip(batch, errors):
+            delivery.attempts += 1
+            if error is None:
+                self.sent += 1
+            elif delivery.attempts >= self.max_attempts:
+                print(f"Email to {delivery.message['To']} failed after {delivery.attempts} attempts: {error}")
+                await self._record_failure(delivery, error)
+            else:
+                retries.append(delivery)
+        return retries
+
+    async def _record_failure(self, delivery: Delivery, error: Exception):
+        self.failed += 1
+        try:
+            await self.dead_letter(delivery, error)
+        except Exception as e:
+            print(f"Could not record dead letter: {e}")
+
+    async def _retry_later(self, delivery: Delivery):
+        await asyncio.sleep(self._backoff(delivery))
+        await self._queue.put(delivery)
+
+    def _backoff(self, delivery: Delivery) -> float:
+        return self.backoff_seconds * 2 ** (delivery.attempts - 1)
+
+
+email_queue = EmailQueue(
+    SMTPConnectionPool(max_idle=settings.EMAIL_QUEUE_WORKERS),
+    workers=settings.EMAIL_QUEUE_WORKERS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    backoff_seconds=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+)
+
+
+async def send_verification_email(to_email: str, code: str) -> None:
+    """
+    Queue the verification code email for delivery.
+    """
+    await email_queue.submit(build_verification_email(to_email, code))
@@ -0,0 +1,269 @@
+"""
+Benchmark the API hot paths against synthetic data.
+
+Seeds a dedicated database (--db-name, default te_reo_maori_bench; it is
+dropped first, so the name must end in "_bench") with a synthetic
+dictionary and users with large mistake and
+learned histories, then drives the endpoints at a fixed concurrency and
+reports p50/p95/p99 latency, throughput and MongoDB round-trips per request
+(from the X-DB-Round-Trips header).
+
+    # in-process, through the ASGI transport (needs a local mongod)
+    python -m benchmarks.run --words 50000 --users 200 --requests 2000 --concurrency 32
+
+    # against a running server (seed the same --db-name first)
+    python -m benchmarks.run --target http://localhost:8000 --skip-seed
+
+    # save a baseline / compare with one (exit 1 on regression)
+    python -m benchmarks.run --save benchmarks/baselines/local.json
+    python -m benchmarks.run --compare benchmarks/baselines/local.json
+
+The scheduler and learned-word writes rely on update pipelines and `$bit`,
+so a real mongod is required; mongomock does not implement them.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+
+BENCH_DB_NAME = "te_reo_maori_bench"
+BENCH_DB_SUFFIX = "_bench"
+
+for var, value in (
+    ("SMTP_HOST", "localhost"),
+    ("SMTP_USER", "bench@example.com"),
+    ("SMTP_PASSWORD", "unused"),
+    ("SMTP_SENDER", "bench@example.com"),
+):
+    os.environ.setdefault(var, value)
+
+import httpx  # noqa: E402
+
+SCENARIOS = ("quiz", "quiz_result", "vocabulary", "login")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.round_trips = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, response):
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return
+        self.latencies[name].append(seconds)
+        if (trips := response.headers.get("X-DB-Round-Trips")) is not None:
+            self.round_trips[name].append(int(trips))
+
+    def summary(self, wall_seconds):
+        results = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[name])
+            trips = self.round_trips[name]
+            results[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "throughput_rps": round(len(values) / wall_seconds, 1) if wall_seconds else 0.0,
+                "db_round_trips": round(sum(trips) / len(trips), 2) if trips else None,
+            }
+        return results
+
+
+def make_request(name, rng, args, word_ids):
+    from benchmarks.seed import BENCH_PASSWORD, login_username, user_ids
+
+    user_id = rng.choice(user_ids(args.users))
+    if name == "quiz":
+        return "GET", "/quiz/", {"params": {"user_id": user_id, "limit": args.limit}}
+    if name == "quiz_result":
+        wrong = rng.sample(word_ids, min(3, len(word_ids)))
+        return "POST", "/quiz/quiz_result", {"json": {"user_id": user_id, "wrong_word_ids": wrong}}
+    if name == "vocabulary":
+        return "GET", "/vocabulary/", {"params": {"user_id": user_id, "limit": args.limit}}
+    if name == "login":
+        username = login_username(rng.randrange(args.logins))
+        return "POST", "/auth/login", {"json": {"username": username, "password": BENCH_PASSWORD}}
+    raise ValueError(f"unknown scenario {name}")
+
+
+async def drive(client, scenario, args, word_ids, recorder):
+    rng = random.Random(args.seed)
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = make_request(scenario, rng, args, word_ids)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            recorder.record(scenario, time.perf_counter() - start, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return time.perf_counter() - started
+
+
+def check_db_name(name):
+    """
+    The benchmark drops its database, so only ever touch one named *_bench.
+    """
+    if not name.endswith(BENCH_DB_SUFFIX):
+        raise ValueError(f"refusing to use database {name!r}: benchmark databases must end in {BENCH_DB_SUFFIX!r}")
+    return name
+
+
+async def run(args):
+    from app.constants import COLLECTION_NAME
+    from app.core.config import settings
+    from app.db.mongodb import db
+
+    # settings are read at import; make sure they picked up --db-name
+    if settings.DB_NAME != check_db_name(args.db_name):
+        raise RuntimeError(f"app settings use DB_NAME={settings.DB_NAME!r}, expected {args.db_name!r}")
+    if not args.skip_seed:
+        from benchmarks.seed import seed_all
+
+        await db.client.drop_database(check_db_name(settings.DB_NAME))
+        started = time.perf_counter()
+        await seed_all(db, args.words, args.users, args.mistakes, args.learned, args.logins, args.seed)
+        print(f"🌱 seeded {args.words} words, {args.users} users in {time.perf_counter() - started:.1f}s")
+    word_ids = [str(doc["_id"]) async for doc in db[COLLECTION_NAME].find({}, {"_id": 1})]
+
+    results = {}
+    if args.target == "asgi":
+        from app.main import app
+
+        # run the app's lifespan (schema setup, catalog warm-up) like a server would
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                results = await run_scenarios(client, args, word_ids)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.target, limits=limits, timeout=60) as client:
+            results = await run_scenarios(client, args, word_ids)
+    return results
+
+
+async def run_scenarios(client, args, word_ids):
+    results = {}
+    for scenario in args.scenarios:
+        recorder = Recorder()
+        # warm-up requests are not recorded
+        warmup = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+        await drive(client, scenario, warmup, word_ids, Recorder())
+        wall = await drive(client, scenario, args, word_ids, recorder)
+        results.update(recorder.summary(wall))
+    return results
+
+
+def print_report(results):
+    header = f"{'endpoint':<12} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'db/req':>7}"
+    print(header)
+    print("─" * len(header))
+    for name, r in results.items():
+        trips = "-" if r["db_round_trips"] is None else r["db_round_trips"]
+        print(
+            f"{name:<12} {r['requests']:>6} {r['errors']:>4} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+            f"{r['p99_ms']:>8} {r['throughput_rps']:>8} {trips:>7}"
+        )
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions against a saved baseline: p95 latency beyond `tolerance`
+    (relative), more DB round-trips per request, or new errors.
+    """
+    problems = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {base['p95_ms']} → {current['p95_ms']} ms")
+        if (current["db_round_trips"] or 0) > (base["db_round_trips"] or 0):
+            problems.append(f"{name}: db round-trips {base['db_round_trips']} → {current['db_round_trips']}")
+        if current["errors"] > base["errors"]:
+            problems.append(f"{name}: errors {base['errors']} → {current['errors']}")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths.")
+    parser.add_argument("--target", default="asgi", help='"asgi" (in-process) or a server URL')
+    parser.add_argument("--db-name", default=BENCH_DB_NAME,
+                        help="database to seed and drop (must end in _bench; DB_NAME is ignored)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda s: s.split(","))
+    parser.add_argument("--words", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--mistakes", type=int, default=500, help="mistake words per user")
+    parser.add_argument("--learned", type=int, default=5000, help="learned words per user")
+    parser.add_argument("--logins", type=int, default=50, help="verified accounts for /auth/login")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=10, help="quiz / vocabulary size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --db-name")
+    parser.add_argument("--save", help="write results to this JSON baseline")
+    parser.add_argument("--compare", help="compare with this JSON baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 increase")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    try:
+        check_db_name(args.db_name)
+    except ValueError as e:
+        sys.exit(str(e))
+    # overrides any DB_NAME exported for the app; must happen before app modules load settings
+    os.environ["DB_NAME"] = args.db_name
+
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("save", "compare", "tolerance")}
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "python": platform.python_version(), "results": results}, f, indent=2)
+        print(f"💾 baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("words") != args.words:
+            print("⚠️  baseline was recorded with a different dataset size")
+        problems = compare(results, baseline, args.tolerance)
+        for problem in problems:
+            print(f"🐢 {problem}")
+        if problems:
+            sys.exit(1)
+        print("✅ no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Synthetic data for the benchmark harness.
+
+Words get unique, Māori-looking forms built from syllables, dense `idx`
+values like the importer assigns, and English glosses drawn from a small
+vocabulary. Each synthetic user gets a mistake history (with `next_due`
+computed by the configured review policy) and a learned-word bitmap.
+"""
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+
+from bson import ObjectId
+
+from app.constants import (
+    COLLECTION_MISTAKES,
+    COLLECTION_NAME,
+    COLLECTION_USER_LEARNED,
+    COLLECTION_USERS,
+)
+from app.core.bitmap import WordBitmap
+from app.core.scheduler import scheduler
+from app.core.security import pwd_ctx
+from app.data.catalog import catalog
+
+SYLLABLES = [c + v for c in ("", "h", "k", "m", "n", "ng", "p", "r", "t", "w", "wh") for v in "aeiouāēīōū"]
+GLOSSES = (
+    "water fire house land sea sky person child food river mountain tree bird "
+    "fish canoe wind rain sun moon star song word love to go to eat to see big small"
+).split()
+
+BENCH_PASSWORD = "bench-password"
+
+
+def word_form(n: int) -> str:
+    """
+    Unique word for every n >= 0 (n written in base len(SYLLABLES)).
+    """
+    parts = []
+    while True:
+        n, r = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[r])
+        if n == 0:
+            return "".join(parts)
+        n -= 1
+
+
+def synthetic_words(count: int, rng: random.Random):
+    for i in range(count):
+        yield {
+            "_id": ObjectId(),
+            "idx": i,
+            "maori": word_form(i),
+            "english": f"{rng.choice(GLOSSES)} {i}",
+            "explanation": "synthetic benchmark word",
+        }
+
+
+def user_ids(count: int):
+    return [f"bench-user-{n}" for n in range(count)]
+
+
+def login_username(n: int) -> str:
+    return f"bench_login_{n}"
+
+
+async def seed_words(db, count: int, rng: random.Random, batch_size: int = 10000):
+    coll = db[COLLECTION_NAME]
+    ids = []
+    words = synthetic_words(count, rng)
+    while batch := list(islice(words, batch_size)):
+        await coll.insert_many(batch, ordered=False)
+        ids.extend(str(w["_id"]) for w in batch)
+    await catalog.bump_version(db)
+    return ids
+
+
+async def seed_users(db, word_ids, users: int, mistakes: int, learned: int, rng: random.Random):
+    """
+    `mistakes` mistake documents and `learned` learned words per user.
+    """
+    now = datetime.utcnow()
+    policy = scheduler.policy
+    for user_id in user_ids(users):
+        docs = []
+        for word_id in rng.sample(word_ids, min(mistakes, len(word_ids))):
+            count = rng.randint(1, 6)
+            last_wrong = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            docs.append({
+                "user_id": user_id,
+                "word_id": word_id,
+                "count": count,
+                "last_wrong": last_wrong,
+                "next_due": last_wrong + policy.interval(count),
+            })
+        if docs:
+            await db[COLLECTION_MISTAKES].insert_many(docs, ordered=False)
+
+        bits = WordBitmap.from_indexes(rng.sample(range(len(word_ids)), min(learned, len(word_ids))))
+        await db[COLLECTION_USER_LEARNED].insert_one({"_id": user_id, "learned_bits": bits.to_chunks()})
+
+
+async def seed_login_users(db, count: int):
+    """
+    Verified accounts for /auth/login. They share one bcrypt hash (at the
+    configured cost) so seeding doesn't take count × bcrypt time.
+    """
+    password_hash = pwd_ctx.hash(BENCH_PASSWORD)
+    await db[COLLECTION_USERS].insert_many([
+        {
+            "username": login_username(n),
+            "email": f"{login_username(n)}@example.com",
+            "password_hash": password_hash,
+            "email_verified": True,
+            "created_at": datetime.utcnow(),
+        }
+        for n in range(count)
+    ])
+
+
+async def seed_all(db, words: int, users: int, mistakes: int, learned: int, logins: int, seed: int = 0):
+    rng = random.Random(seed)
+    word_ids = await seed_words(db, words, rng)
+    await seed_users(db, word_ids, users, mistakes, learned, rng)
+    await seed_login_users(db, logins)
+    return word_ids
@@ -8,6 +8,8 @@ from app.data.loader import load_words_from_file
 
 from app.main import app
 from app.constants import COLLECTION_NAME
+from app.data.catalog import catalog
+from app.core.cache import read_cache
 from app.core.config import settings
 from app.utils.email import smtplib as email_smtplib
 from tests.dummy_smtp import DummySMTP
@@ -22,6 +24,7 @@ def stub_hash(monkeypatch):
 def reset_and_patch_smtp(monkeypatch):
     # clear any old messages
     DummySMTP.sent.clear()
+    DummySMTP.connections = 0
     # patch the app’s SMTP
     monkeypatch.setattr(email_smtplib, "SMTP", DummySMTP)
     yield
@@ -38,8 +41,12 @@ async def clear_test_db(db_client):
     """Clear the test database before each test."""
     print(f"Clearing database: {settings.DB_NAME}")
     await db_client.drop_database(settings.DB_NAME)
+    catalog.invalidate()
+    await read_cache.clear()
     yield
     await db_client.drop_database(settings.DB_NAME)
+    catalog.invalidate()
+    await read_cache.clear()
 
 @pytest_asyncio.fixture(scope="session")
 async def client():
@@ -53,9 +60,12 @@ async def seed_data(db_client):
     words = load_words_from_file()
 
     docs = []
-    for w in words:
-        doc = {"_id": ObjectId(), **w}
+    for i, w in enumerate(words):
+        doc = {"_id": ObjectId(), "idx": i, **w}
         docs.append(doc)
 
     await db_client[settings.DB_NAME][COLLECTION_NAME].insert_many(docs)
+    # words were written behind the app's back, so drop the cached catalog
+    catalog.invalidate()
+    await read_cache.clear()
     return docs
@@ -1,10 +1,12 @@
 # Monkey-patch the real SMTP library so no real emails go out
 class DummySMTP:
     sent = []
+    connections = 0
 
     def __init__(self, host, port):
         DummySMTP.host = host
         DummySMTP.port = port
+        DummySMTP.connections += 1
 
     def starttls(self): pass
     def login(self, user, pwd):
@@ -19,5 +21,10 @@ class DummySMTP:
             "body": msg.get_content()
         })
 
+    # used by the pooled sender to reuse / retire connections
+    def noop(self): return (250, b"OK")
+    def quit(self): pass
+    def close(self): pass
+
     def __enter__(self): return self
     def __exit__(self, *args): pass
@@ -0,0 +1,29 @@
+# In-memory stand-in for the redis.asyncio client calls the read cache uses
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = bytes(value)
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.ttls.pop(key, None)
+
+    async def scan_iter(self, match="*"):
+        prefix = match.rstrip("*")
+        for key in list(self.hashes):
+            if key.startswith(prefix):
+                yield key
@@ -0,0 +1,95 @@
+import gzip
+import os
+
+import brotli
+import pytest
+
+from app.main import assets
+from app.utils.assets import AssetCache, StaticAsset
+
+
+@pytest.mark.asyncio
+async def test_index_is_compressed_and_revalidated(client):
+    resp = await client.get("/some/deep/link", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "no-cache"
+    assert "<html" in resp.text.lower()
+
+    again = await client.get("/", headers={"If-None-Match": resp.headers["etag"], "Accept-Encoding": "gzip"})
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+@pytest.mark.asyncio
+async def test_hashed_static_assets_are_immutable(client):
+    name = next(n for n in (await _static_names()) if n.endswith(".js"))
+    resp = await client.get(f"/{name}")
+    assert resp.status_code == 200
+    assert "immutable" in resp.headers["cache-control"]
+
+    missing = await client.get("/static/js/nope.js")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_api_prefixes_are_not_swallowed(client):
+    assert (await client.get("/quiz/unknown/route")).status_code == 404
+    assert (await client.get("/quizzes")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_cache_reloads_changed_files(tmp_path):
+    path = tmp_path / "index.html"
+    path.write_text("<html>" + "a" * 1000 + "</html>")
+    cache = AssetCache(tmp_path, check_seconds=0)
+    cache.preload()
+    first = await cache.get("index.html")
+    assert gzip.decompress(first.gzip) == first.body
+
+    path.write_text("<html>changed</html>")
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    second = await cache.get("index.html")
+    assert second.body == b"<html>changed</html>"
+    assert second.etag != first.etag
+    assert await cache.get("../outside.html") is None
+
+
+@pytest.mark.asyncio
+async def test_missing_files_are_not_reread(tmp_path, monkeypatch):
+    from app.utils import assets as assets_module
+
+    cache = AssetCache(tmp_path, check_seconds=60)
+    cache.preload()
+    loads = []
+    real_load = assets_module._load
+    monkeypatch.setattr(assets_module, "_load", lambda path: loads.append(path) or real_load(path))
+
+    for _ in range(3):
+        assert await cache.get("no-such-file.js") is None
+    assert len(loads) == 1
+    assert "no-such-file.js" not in cache
+
+
+@pytest.mark.asyncio
+async def test_deep_links_serve_cached_index(client, monkeypatch):
+    from app.utils import assets as assets_module
+
+    monkeypatch.setattr(assets_module, "_load", lambda path: pytest.fail(f"read {path} from disk"))
+    for path in ("/learn/words", "/not-a-file.txt", "/favicon-typo.ico"):
+        r = await client.get(path)
+        assert r.status_code == 200
+        assert r.headers["Cache-Control"] == "no-cache"
+
+
+async def _static_names():
+    assets.preload()
+    return [name for name in assets._assets if name.startswith("static/")]
+
+
+def test_brotli_is_preferred_when_accepted():
+    asset = StaticAsset(b"<html>" + b"kia ora " * 200 + b"</html>", "text/html", 0.0)
+    body, encoding, etag = asset.variant("gzip, deflate, br")
+    assert encoding == "br" and etag.endswith('-br"')
+    assert brotli.decompress(body) == asset.body
+    assert asset.variant("gzip")[1] == "gzip"
+    assert asset.variant("identity")[0] == asset.body
@@ -0,0 +1,57 @@
+import argparse
+
+import httpx
+import pytest
+
+from benchmarks.run import SCENARIOS, check_db_name, compare, parse_args, percentile, run_scenarios
+
+
+def test_db_name_must_be_a_bench_database():
+    assert parse_args([]).db_name == "te_reo_maori_bench"
+    assert check_db_name("custom_bench") == "custom_bench"
+    with pytest.raises(ValueError):
+        check_db_name("te_reo_maori")
+
+
+def test_main_refuses_a_real_database(monkeypatch):
+    from benchmarks import run
+
+    monkeypatch.setenv("DB_NAME", "te_reo_maori")
+    with pytest.raises(SystemExit) as exc:
+        run.main(["--db-name", "te_reo_maori"])
+    assert "refusing" in str(exc.value)
+
+
+def test_percentile_interpolates():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+
+
+def test_compare_flags_regressions():
+    base = {"results": {"quiz": {"p95_ms": 10.0, "db_round_trips": 2, "errors": 0}}}
+    ok = {"quiz": {"p95_ms": 11.0, "db_round_trips": 2, "errors": 0}}
+    slow = {"quiz": {"p95_ms": 20.0, "db_round_trips": 3, "errors": 1}}
+    assert compare(ok, base, tolerance=0.25) == []
+    assert len(compare(slow, base, tolerance=0.25)) == 3
+
+
+@pytest.mark.asyncio
+async def test_harness_drives_every_scenario():
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.url.path))
+        return httpx.Response(200, json=[], headers={"X-DB-Round-Trips": "2"})
+
+    args = argparse.Namespace(**{
+        **vars(parse_args([])), "requests": 6, "warmup": 2, "concurrency": 3, "users": 4, "logins": 2,
+    })
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://bench") as client:
+        results = await run_scenarios(client, args, ["w1", "w2", "w3"])
+
+    assert set(results) == set(SCENARIOS)
+    for name in SCENARIOS:
+        assert results[name]["requests"] == 6
+        assert results[name]["errors"] == 0
+        assert results[name]["db_round_trips"] == 2
+    assert len(seen) == len(SCENARIOS) * 8
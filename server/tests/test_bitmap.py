@@ -0,0 +1,33 @@
+from app.core.bitmap import WordBitmap
+
+
+def test_membership_and_len():
+    bitmap = WordBitmap.from_indexes([0, 5, 63, 64, 50_000])
+    assert 5 in bitmap and 50_000 in bitmap
+    assert 6 not in bitmap and 1_000_000 not in bitmap
+    assert len(bitmap) == 5
+    assert list(bitmap) == [0, 5, 63, 64, 50_000]
+
+
+def test_set_operations():
+    a = WordBitmap.from_indexes([1, 2, 3])
+    b = WordBitmap.from_indexes([3, 4])
+    assert list(a | b) == [1, 2, 3, 4]
+    assert list(a & b) == [3]
+    assert list(a - b) == [1, 2]
+
+
+def test_chunks_round_trip_through_signed_int64():
+    bitmap = WordBitmap.from_indexes([0, 63, 127, 200])
+    chunks = bitmap.to_chunks()
+    assert set(chunks) == {"0", "1", "3"}
+    assert all(-(1 << 63) <= v < (1 << 63) for v in chunks.values())
+    assert WordBitmap.from_chunks(chunks) == bitmap
+    assert WordBitmap().to_chunks() == {}
+
+
+def test_iter_missing_skips_set_bits():
+    bitmap = WordBitmap.from_indexes(range(0, 10_000))
+    bitmap.bits &= ~(1 << 7_777)
+    assert list(bitmap.iter_missing(10_003)) == [7_777, 10_000, 10_001, 10_002]
+    assert list(WordBitmap().iter_missing(3)) == [0, 1, 2]
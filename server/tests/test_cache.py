@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.cache import MISS, MemoryBackend, ReadCache, RedisBackend, build_read_cache
+from app.db.dataloader import RequestLoader
+from tests.fake_redis import FakeRedis
+
+
+def fetcher(value, calls):
+    async def fetch():
+        calls.append(1)
+        return value
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_repeat_reads_skip_the_database():
+    cache = ReadCache(MemoryBackend(max_entries=10, ttl_seconds=60))
+    calls = []
+
+    first = RequestLoader()
+    assert await cache.load(first, "u1", "mistakes:10", fetcher(["a"], calls)) == ["a"]
+    second = RequestLoader()
+    assert await cache.load(second, "u1", "mistakes:10", fetcher(["b"], calls)) == ["a"]
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    await cache.invalidate("u1")
+    assert await cache.load(RequestLoader(), "u1", "mistakes:10", fetcher(["b"], calls)) == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    backend = MemoryBackend(max_entries=2, ttl_seconds=60)
+    cache = ReadCache(backend)
+    for user in ("u1", "u2", "u3"):
+        await cache.set(user, "learned", {})
+    assert await cache.get("u1", "learned") is MISS
+    assert backend.stats()["evictions"] == 1
+    assert await cache.get("u3", "learned") == {}
+
+    backend.ttl_seconds = -1
+    await cache.set("u4", "learned", {})
+    await cache.get("u4", "learned")
+    assert backend.stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_racing_a_write_is_not_cached():
+    cache = ReadCache(MemoryBackend(max_entries=10, ttl_seconds=60))
+    release = asyncio.Event()
+
+    async def slow_fetch():
+        await release.wait()
+        return "stale"
+
+    read = asyncio.create_task(cache.fetch("u1", "upcoming:10", slow_fetch))
+    await asyncio.sleep(0)
+    await cache.invalidate("u1")
+    release.set()
+    assert await read == "stale"
+    assert await cache.get("u1", "upcoming:10") is MISS
+    assert cache._loading == {} and cache._writes == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trips_bson_values():
+    client = FakeRedis()
+    cache = ReadCache(RedisBackend(client, ttl_seconds=30))
+    due = [{"id": "w1", "next_due": datetime(2024, 1, 2, 3, 4, 5)}]
+    await cache.set("u1", "upcoming:10", due)
+    await cache.set("u1", "learned", {"0": -1})
+
+    assert await cache.get("u1", "upcoming:10") == due
+    await cache.update("u1", "learned", lambda chunks: {**chunks, "1": 5})
+    assert await cache.get("u1", "learned") == {"0": -1, "1": 5}
+    assert client.ttls["readmodel:u1"] == 30
+
+    await cache.invalidate("u1", "learned")
+    assert await cache.get("u1", "upcoming:10") == due
+    await cache.clear()
+    assert client.hashes == {}
+
+
+def test_auto_backend_follows_the_worker_count(capsys):
+    assert isinstance(build_read_cache("auto", workers=1).backend, MemoryBackend)
+    assert capsys.readouterr().out == ""
+    assert isinstance(build_read_cache("memory", workers=4).backend, MemoryBackend)
+    assert "use READ_CACHE_BACKEND=redis" in capsys.readouterr().out
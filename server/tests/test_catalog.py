@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+from bson import ObjectId
+
+from app.constants import COLLECTION_NAME
+from app.core.config import settings
+from app.data import catalog as catalog_module
+from app.data.catalog import CatalogSnapshot, WordCatalog
+
+
+def make_snapshot():
+    return CatalogSnapshot(
+        ["a", "b", "c"], [0, 1, 2], ["ahi", "wai", "whare"], ["fire", "water", "house"], 5,
+        revs=[0, 3, 5],
+    )
+
+
+async def test_export_is_encoded_once_per_snapshot():
+    words = make_snapshot()
+    # concurrent downloads share one encoding
+    export, again = await asyncio.gather(words.export(), words.export())
+    assert again is export
+    assert await words.export() is export
+    body = json.loads(export.body)
+    assert body["version"] == 5
+    assert body["words"][1] == {"id": "b", "maori": "wai", "english": "water"}
+    assert export.media_type == "application/json"
+
+
+async def test_delta_lists_words_changed_after_version():
+    words = make_snapshot()
+    assert [w["id"] for w in json.loads((await words.delta(0)).body)["words"]] == ["b", "c"]
+    assert [w["id"] for w in json.loads((await words.delta(3)).body)["words"]] == ["c"]
+    assert json.loads((await words.delta(5)).body) == {"version": 5, "since": 5, "words": []}
+    assert await words.delta(3) is await words.delta(3)
+
+
+async def test_words_without_revisions_only_appear_in_full_export():
+    words = CatalogSnapshot(["a"], [0], ["ahi"], ["fire"], 2)
+    assert json.loads((await words.delta(0)).body)["words"] == []
+    assert len(json.loads((await words.export()).body)["words"]) == 1
+
+
+class FakeWordsDb:
+    """
+    Stands in for the two catalog reads: the version marker and the word list.
+    """
+
+    def __init__(self, version=1):
+        self.version = version
+        self.loads = 0
+
+
+def fake_catalog_reads(monkeypatch):
+    async def get_words_version(db):
+        return db.version
+
+    async def load_snapshot(db, version):
+        db.loads += 1
+        return CatalogSnapshot(["a"], [0], ["ahi"], ["fire"], version)
+
+    monkeypatch.setattr(catalog_module, "get_words_version", get_words_version)
+    monkeypatch.setattr(catalog_module, "load_snapshot", load_snapshot)
+
+
+async def test_listeners_run_once_per_loaded_snapshot(monkeypatch):
+    fake_catalog_reads(monkeypatch)
+    monkeypatch.setattr(settings, "CATALOG_CHECK_SECONDS", 0)
+    db = FakeWordsDb()
+    catalog = WordCatalog()
+    seen = []
+
+    async def record(snapshot):
+        seen.append(snapshot)
+
+    catalog.on_load(record)
+
+    first = await catalog.get(db)
+    assert await catalog.get(db) is first
+    assert seen == [first]
+
+    db.version = 2
+    second = await catalog.get(db)
+    assert seen == [first, second]
+
+
+async def test_invalidate_reloads_even_at_the_same_version(monkeypatch):
+    fake_catalog_reads(monkeypatch)
+    db = FakeWordsDb()
+    catalog = WordCatalog()
+
+    first = await catalog.get(db)
+    catalog.invalidate()
+    assert catalog.snapshot is None
+    second = await catalog.get(db)
+    assert second is not first and second.version == first.version
+    assert db.loads == 2
+
+
+async def test_snapshot_loads_words_in_index_order(clear_test_db, db_client, seed_data):
+    db = db_client[settings.DB_NAME]
+    catalog = WordCatalog()
+
+    words = await catalog.get(db)
+    assert len(words) == len(seed_data)
+    assert words.version == 0
+    last = seed_data[-1]
+    assert words.index_of(str(last["_id"])) == len(seed_data) - 1
+    assert words.word(str(last["_id"]))["maori"] == last["maori"]
+    assert await catalog.get(db) is words
+
+
+async def test_bump_version_publishes_new_words(clear_test_db, db_client, seed_data):
+    db = db_client[settings.DB_NAME]
+    catalog = WordCatalog()
+    before = await catalog.get(db)
+
+    new_id = ObjectId()
+    await db[COLLECTION_NAME].insert_one({"_id": new_id, "maori": "kōrero", "english": "speak"})
+    await catalog.bump_version(db)
+
+    after = await catalog.get(db)
+    assert after.version == before.version + 1
+    assert str(new_id) in after and str(new_id) not in before
+    # inserted without an index, so the load assigned the next free one
+    assert after.index_of(str(new_id)) == len(seed_data)
+
+
+async def test_invalidate_picks_up_writes_without_a_bump(clear_test_db, db_client, seed_data):
+    db = db_client[settings.DB_NAME]
+    catalog = WordCatalog()
+    before = await catalog.get(db)
+
+    first_id = seed_data[0]["_id"]
+    await db[COLLECTION_NAME].update_one({"_id": first_id}, {"$set": {"english": "edited"}})
+    assert (await catalog.get(db)).word(str(first_id))["english"] != "edited"
+
+    catalog.invalidate()
+    after = await catalog.get(db)
+    assert after.version == before.version
+    assert after.word(str(first_id))["english"] == "edited"
+
+
+async def test_failing_listener_does_not_stop_the_load(monkeypatch, capsys):
+    fake_catalog_reads(monkeypatch)
+    catalog = WordCatalog()
+
+    async def broken(snapshot):
+        raise RuntimeError("index exploded")
+
+    catalog.on_load(broken)
+    words = await catalog.get(FakeWordsDb())
+    assert catalog.snapshot is words
+    assert "index exploded" in capsys.readouterr().out
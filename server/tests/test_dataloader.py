@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core.metrics import command_listener
+from app.core.prefetch import QuizPrefetcher
+from app.db.dataloader import RequestLoader, begin_request
+
+
+async def test_repeated_loads_are_deduplicated():
+    loader = RequestLoader()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {"learned": 3}
+
+    a, b = await loader.gather(loader.load("learned", fetch), loader.load("learned", fetch))
+    assert a is b
+    assert len(calls) == 1
+
+    # later loads in the same request reuse the result
+    assert await loader.load("learned", fetch) is a
+    assert len(calls) == 1
+
+
+async def test_independent_loads_run_concurrently():
+    loader = RequestLoader()
+    running = 0
+    peak = 0
+
+    async def fetch():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await loader.gather(*(loader.load(i, fetch) for i in range(3)))
+    assert peak == 3
+
+
+
+async def test_listener_counts_commands_against_the_current_request():
+    event = SimpleNamespace(command_name="find", duration_micros=100, reply={"ok": 1})
+
+    async def request():
+        loader = begin_request()
+        # Motor reports commands from executor threads with the caller's context
+        await asyncio.to_thread(command_listener.succeeded, event)
+        await asyncio.to_thread(command_listener.failed, event)
+        return loader
+
+    first, second = await asyncio.gather(asyncio.create_task(request()), asyncio.create_task(request()))
+    assert (first.round_trips, second.round_trips) == (2, 2)
+
+
+async def test_prefetch_commands_are_not_charged_to_the_request():
+    prefetcher = QuizPrefetcher(max_entries=10, ttl_seconds=60)
+    event = SimpleNamespace(command_name="find", duration_micros=100, reply={"ok": 1})
+
+    async def build():
+        command_listener.succeeded(event)
+        return ["q"]
+
+    async def request():
+        loader = begin_request()
+        prefetcher.schedule("u1", 1, build)
+        await asyncio.sleep(0.01)
+        return loader
+
+    loader = await asyncio.create_task(request())
+    assert prefetcher.pop("u1", 1) == ["q"]
+    assert loader.round_trips == 0
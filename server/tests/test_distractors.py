@@ -0,0 +1,60 @@
+from app.api.quiz import pick_distractors
+from app.core.distractors import DistractorIndex, parse_pos, score, WordFeatures
+from app.core.sampling import make_rng
+from app.data.catalog import CatalogSnapshot
+
+WORDS = [
+    {"idx": 0, "english": "to run", "explanation": "verb"},
+    {"idx": 1, "english": "to rub", "explanation": "verb"},
+    {"idx": 2, "english": "to run, to race", "explanation": "verb"},
+    {"idx": 3, "english": "sun", "explanation": "noun"},
+    {"idx": 4, "english": "to ruin", "explanation": "verb"},
+    {"idx": 5, "english": "rug", "explanation": "noun"},
+]
+
+
+def test_parse_pos():
+    assert parse_pos("adjective/noun") == {"adjective", "noun"}
+    assert parse_pos("grammatical particle") == {"particle"}
+    assert parse_pos("") == set()
+
+
+def test_near_synonyms_are_not_distractors():
+    run = WordFeatures(0, "to run", "verb")
+    assert score(run, WordFeatures(2, "to run, to race", "verb")) is None
+    assert score(run, WordFeatures(9, "To run!", "verb")) is None
+    assert score(run, WordFeatures(1, "to rub", "verb")) > score(run, WordFeatures(5, "rug", "noun"))
+
+
+def test_build_prefers_same_part_of_speech_and_similar_glosses():
+    lists = DistractorIndex(WORDS, k=3).build()
+    assert 2 not in lists[0]
+    assert lists[0][:2] == [1, 4]
+    assert all(0 not in others or idx != 0 for idx, others in lists.items())
+
+
+def test_incremental_update_matches_changes():
+    index = DistractorIndex(WORDS, k=3)
+    current = index.build()
+    words = WORDS + [{"idx": 6, "english": "to rum", "explanation": "verb"}]
+    changed = DistractorIndex(words, k=3).update(current, {6})
+    assert 6 in changed
+    assert 6 in changed[0]
+    assert changed == {
+        idx: others for idx, others in DistractorIndex(words, k=3).build().items() if current.get(idx) != others
+    }
+
+
+def test_quiz_uses_precomputed_distractors():
+    lists = DistractorIndex(WORDS, k=3).build()
+    words = CatalogSnapshot(
+        [f"w{i}" for i in range(6)], range(6), [f"m{i}" for i in range(6)],
+        [w["english"] for w in WORDS], 1, [lists[i] for i in range(6)], 3,
+    )
+    assert words.similar_english("w0") == [WORDS[i]["english"] for i in lists[0]]
+    picked = pick_distractors(words, "w0", "to run", make_rng(1))
+    assert sorted(picked) == sorted(words.similar_english("w0"))
+
+    # words without a list fall back to random glosses
+    bare = CatalogSnapshot(["a", "b"], [0, 1], ["x", "y"], ["one", "two"], 1)
+    assert pick_distractors(bare, "a", "one", make_rng(1)) == ["two"]
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+from app.utils.email import EmailQueue, SMTPConnectionPool, build_verification_email
+from tests.dummy_smtp import DummySMTP
+
+
+def make_queue(dead_letters, **kwargs):
+    async def dead_letter(delivery, error):
+        dead_letters.append((delivery.message["To"], delivery.attempts))
+
+    options = dict(workers=1, batch_size=10, max_attempts=3, backoff_seconds=0)
+    options.update(kwargs)
+    return EmailQueue(SMTPConnectionPool(max_idle=1), dead_letter=dead_letter, **options)
+
+
+async def test_queued_emails_share_one_connection():
+    queue = make_queue([])
+    await queue.start()
+    for i in range(5):
+        await queue.submit(build_verification_email(f"user{i}@example.com", f"c{i}"))
+    await queue.stop()
+
+    assert [m["to"] for m in DummySMTP.sent] == [f"user{i}@example.com" for i in range(5)]
+    assert DummySMTP.connections == 1
+    assert queue.sent == 5
+
+
+async def test_transient_failure_is_retried(monkeypatch):
+    failures = {"left": 1}
+    original = DummySMTP.send_message
+
+    def flaky_send(self, msg):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionResetError("dropped")
+        original(self, msg)
+
+    monkeypatch.setattr(DummySMTP, "send_message", flaky_send)
+    dead_letters = []
+    queue = make_queue(dead_letters)
+    await queue.start()
+    await queue.submit(build_verification_email("retry@example.com", "abc123"))
+    await asyncio.sleep(0.05)
+    await queue.stop()
+
+    assert [m["to"] for m in DummySMTP.sent] == ["retry@example.com"]
+    assert dead_letters == []
+
+
+async def test_exhausted_retries_go_to_dead_letter(monkeypatch):
+    def broken_send(self, msg):
+        raise ConnectionRefusedError("smtp down")
+
+    monkeypatch.setattr(DummySMTP, "send_message", broken_send)
+    dead_letters = []
+    queue = make_queue(dead_letters)
+    # not started: delivered inline with the same retry policy
+    await queue.submit(build_verification_email("lost@example.com", "abc123"))
+
+    assert dead_letters == [("lost@example.com", 3)]
+    assert queue.failed == 1
+
+
+async def test_pending_retries_are_dead_lettered_on_stop(monkeypatch):
+    def broken_send(self, msg):
+        raise ConnectionRefusedError("smtp down")
+
+    monkeypatch.setattr(DummySMTP, "send_message", broken_send)
+    dead_letters = []
+    # long backoff: the retry is still sleeping when the app shuts down
+    queue = make_queue(dead_letters, backoff_seconds=60)
+    await queue.start()
+    await queue.submit(build_verification_email("backoff@example.com", "abc123"))
+    await asyncio.sleep(0.05)
+    await queue.stop()
+
+    assert dead_letters == [("backoff@example.com", 1)]
+    assert queue.failed == 1
+
+
+async def test_batch_cut_short_by_stop_is_dead_lettered(monkeypatch):
+    release = threading.Event()
+    original = DummySMTP.send_message
+
+    def slow_send(self, msg):
+        release.wait(5)
+        original(self, msg)
+
+    monkeypatch.setattr(DummySMTP, "send_message", slow_send)
+    dead_letters = []
+    queue = make_queue(dead_letters)
+    await queue.start()
+    for i in range(3):
+        await queue.submit(build_verification_email(f"slow{i}@example.com", "abc123"))
+    await asyncio.sleep(0.05)
+    stopping = asyncio.ensure_future(queue.stop(timeout=0.05))
+    await asyncio.sleep(0.1)
+    release.set()
+    await stopping
+
+    # the message in flight may or may not have gone out; none of the batch is lost
+    assert dead_letters[-2:] == [("slow1@example.com", 0), ("slow2@example.com", 0)]
+    assert len(DummySMTP.sent) + len(dead_letters) >= 3
+    assert queue.failed == len(dead_letters)
@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from app.constants import COLLECTION_NAME
+from app.core.config import settings
+from app.data.loader import iter_batches, iter_words, load_words_from_file
+from app.scripts.import_words import diff_batch, import_words
+
+WORDS = [
+    {"maori": "ahi", "english": "fire", "explanation": "noun"},
+    {"maori": "wai", "english": "water", "explanation": "noun"},
+    {"maori": "kai", "english": "food", "explanation": "noun"},
+]
+
+
+def test_iter_words_streams_json_array_and_jsonl():
+    as_array = io.StringIO(json.dumps(WORDS))
+    as_jsonl = io.StringIO("\n".join(json.dumps(w) for w in WORDS) + "\n")
+    assert list(iter_words(as_array, chunk_size=8)) == WORDS
+    assert list(iter_words(as_jsonl, chunk_size=8)) == WORDS
+    assert load_words_from_file() == list(iter_words())
+
+
+def test_iter_words_rejects_truncated_file():
+    with pytest.raises(ValueError):
+        list(iter_words(io.StringIO('[{"maori": "ahi"'), chunk_size=4))
+
+
+def test_iter_batches():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_diff_batch_only_reports_changes():
+    existing = {
+        "ahi": {"maori": "ahi", "english": "fire", "explanation": "noun"},
+        "wai": {"maori": "wai", "english": "liquid", "explanation": "noun"},
+    }
+    new, changed, unchanged = diff_batch(WORDS, existing)
+    assert [w["maori"] for w in new] == ["kai"]
+    assert changed == {"wai": {"english": "water"}}
+    assert unchanged == 1
+
+
+@pytest.mark.asyncio
+async def test_reimport_is_idempotent(clear_test_db, db_client):
+    db = db_client[settings.DB_NAME]
+    first = await import_words(db, io.StringIO(json.dumps(WORDS)), batch_size=2)
+    assert first == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    edited = [dict(w) for w in WORDS]
+    edited[1]["english"] = "water, liquid"
+    second = await import_words(db, io.StringIO(json.dumps(edited)), batch_size=2)
+    assert second == {"inserted": 0, "updated": 1, "unchanged": 2}
+
+    docs = await db[COLLECTION_NAME].find({}, {"_id": 0}).sort("idx", 1).to_list(None)
+    assert [d["idx"] for d in docs] == [0, 1, 2]
+    assert docs[1]["english"] == "water, liquid"
+    # every imported word gets distractor candidates (here: the other two words)
+    assert all(sorted(d["distractors"]) == sorted({0, 1, 2} - {d["idx"]}) for d in docs)
@@ -0,0 +1,32 @@
+from app.constants import COLLECTION_CODES, COLLECTION_MISTAKES
+from app.db.indexes import INDEXES, IndexSpec, _existing_matches, load_declarations
+from app.scripts.index_advisor import plan_stages
+
+
+def test_declarations_include_codes_ttl():
+    load_declarations()
+    ttl = [s for s in INDEXES if s.collection == COLLECTION_CODES and s.expire_after_seconds is not None]
+    assert ttl == [IndexSpec(COLLECTION_CODES, (("expires_at", 1),), expire_after_seconds=0)]
+    assert any(s.collection == COLLECTION_MISTAKES and s.unique for s in INDEXES)
+
+
+def test_existing_index_matching():
+    spec = IndexSpec("mistakes", (("user_id", 1), ("count", -1)))
+    assert _existing_matches(spec, {"key": [("user_id", 1), ("count", -1.0)]})
+    assert not _existing_matches(spec, {"key": [("user_id", 1), ("count", -1)], "unique": True})
+    assert not _existing_matches(spec, {"key": [("user_id", 1)]})
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "OR", "inputStages": [
+        {"stage": "IXSCAN"}, {"stage": "COLLSCAN"},
+    ]}}
+    assert list(plan_stages(plan)) == ["LIMIT", "OR", "IXSCAN", "COLLSCAN"]
+
+
+def test_plan_stages_unwraps_slot_based_plans():
+    plan = {
+        "queryPlan": {"stage": "FETCH", "inputStage": {"stage": "COLLSCAN"}},
+        "slotBasedPlan": {"slots": "...", "stages": "[1] scan s1 s2"},
+    }
+    assert list(plan_stages(plan)) == ["FETCH", "COLLSCAN"]
@@ -0,0 +1,60 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.constants import COLLECTION_USED_MANIFESTS
+from app.core.manifest import ManifestError, ManifestReplayed, ManifestSigner, build_manifest_signer, claim
+
+
+def test_manifest_round_trip():
+    signer = ManifestSigner("secret", ttl_seconds=60)
+    token = signer.sign("u1", ["a", "b"], now=1000)
+    assert signer.verify(token, "u1", now=1059) == ["a", "b"]
+
+
+@pytest.mark.parametrize("mutate, user, now", [
+    (lambda t: t[:-2] + ("AA" if not t.endswith("AA") else "BB"), "u1", 1000),  # bad signature
+    (lambda t: t.replace(".", ""), "u1", 1000),                                 # malformed
+    (lambda t: t, "u2", 1000),                                                  # another user
+    (lambda t: t, "u1", 1061),                                                  # expired
+])
+def test_manifest_rejections(mutate, user, now):
+    signer = ManifestSigner("secret", ttl_seconds=60)
+    token = mutate(signer.sign("u1", ["a"], now=1000))
+    with pytest.raises(ManifestError):
+        signer.verify(token, user, now=now)
+
+
+def test_manifests_are_disabled_without_a_secret():
+    assert build_manifest_signer("", 60) is None
+    # two workers configured with the same secret accept each other's manifests
+    token = build_manifest_signer("shared", 60).sign("u1", ["a"])
+    assert build_manifest_signer("shared", 60).verify(token, "u1") == ["a"]
+
+
+def test_manifest_from_other_secret_is_rejected():
+    token = ManifestSigner("one", 60).sign("u1", ["a"])
+    with pytest.raises(ManifestError):
+        ManifestSigner("two", 60).verify(token, "u1")
+
+
+class UsedManifests:
+    def __init__(self):
+        self.ids = set()
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.ids:
+            raise DuplicateKeyError("duplicate nonce")
+        self.ids.add(doc["_id"])
+
+
+async def test_each_manifest_can_be_claimed_once():
+    signer = ManifestSigner("secret", ttl_seconds=60)
+    db = {COLLECTION_USED_MANIFESTS: UsedManifests()}
+    first = signer.claims(signer.sign("u1", ["a"]), "u1")
+    second = signer.claims(signer.sign("u1", ["a"]), "u1")
+    assert first["n"] != second["n"]
+
+    await claim(db, first)
+    await claim(db, second)
+    with pytest.raises(ManifestReplayed):
+        await claim(db, first)
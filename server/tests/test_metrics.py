@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import Registry, begin_span, command_listener, http_requests, observe_span
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    hits = registry.counter("hits_total", "Hits.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", (0.1, 1.0), ("route",))
+    registry.register_collector(lambda: {"queue_depth": 3})
+
+    hits.inc("/quiz/")
+    latency.observe(0.05, "/quiz/")
+    latency.observe(0.5, "/quiz/")
+    text = registry.render()
+
+    assert 'hits_total{route="/quiz/"} 1.0' in text
+    assert 'latency_seconds_bucket{route="/quiz/",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/quiz/",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/quiz/"} 2' in text
+    assert "queue_depth 3.0" in text
+
+
+def test_commands_and_spans_are_attributed_to_the_current_request():
+    span = begin_span()
+    command_listener.succeeded(SimpleNamespace(command_name="find", duration_micros=1500, reply={"ok": 1}))
+    command_listener.succeeded(SimpleNamespace(command_name="update", duration_micros=500, reply={"ok": 1, "n": 1}))
+    observe_span("bcrypt", 0.2)
+
+    assert span.mongo_commands == 2
+    assert span.mongo_seconds == pytest.approx(0.002)
+    assert span.mongo_bytes > 0
+    assert span.spans == {"bcrypt": 0.2}
+    assert span.server_timing(0.3).startswith('db;dur=2.0;desc="2 cmds", bcrypt;dur=200.0')
+
+
+@pytest.mark.asyncio
+async def test_requests_show_up_at_metrics_endpoint(client):
+    before = http_requests.value("GET", "/", "200")
+    r = await client.get("/")
+    assert "total;dur=" in r.headers["Server-Timing"]
+
+    text = (await client.get("/metrics")).text
+    assert http_requests.value("GET", "/", "200") == before + 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/"}' in text
+    assert "read_cache_hits" in text
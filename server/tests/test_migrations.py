@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.constants import COLLECTION_META, COLLECTION_NAME, META_SCHEMA_LOCK
+from app.core.config import settings
+from app.db.migrations import SCHEMA_VERSION, ensure_schema, get_schema_version
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_run_setup_once(clear_test_db, db_client):
+    db = db_client[settings.DB_NAME]
+    results = await asyncio.gather(*(ensure_schema(db, poll_seconds=0.05) for _ in range(4)))
+
+    assert results.count(True) == 1
+    assert await get_schema_version(db) == SCHEMA_VERSION
+    assert await db[COLLECTION_NAME].count_documents({}) > 0
+    assert await db[COLLECTION_META].find_one({"_id": META_SCHEMA_LOCK}) is None
+
+    # an up-to-date worker only reads the marker
+    assert await ensure_schema(db) is False
+
+@pytest.mark.asyncio
+async def test_setup_indexes_legacy_words_before_building_distractors(clear_test_db, db_client):
+    db = db_client[settings.DB_NAME]
+    # a deployment from before dense indexes: words without `idx`
+    await db[COLLECTION_NAME].insert_many([
+        {"maori": "ahi", "english": "fire", "explanation": "noun"},
+        {"maori": "wai", "english": "water", "explanation": "noun"},
+        {"maori": "whare", "english": "house", "explanation": "noun"},
+        {"maori": "kai", "english": "food", "explanation": "noun"},
+        {"maori": "rākau", "english": "tree", "explanation": "noun"},
+    ])
+
+    assert await ensure_schema(db) is True
+
+    words = await db[COLLECTION_NAME].find().to_list(None)
+    assert sorted(w["idx"] for w in words) == list(range(5))
+    assert all(w.get("distractors") for w in words)
+
+@pytest.mark.asyncio
+async def test_setup_lock_is_renewed_while_held(clear_test_db, db_client):
+    from datetime import datetime, timedelta, timezone
+    from app.db.migrations import renew_lock
+
+    meta = db_client[settings.DB_NAME][COLLECTION_META]
+    soon = datetime.now(timezone.utc) + timedelta(seconds=1)
+    await meta.insert_one({"_id": META_SCHEMA_LOCK, "owner": "me", "expires_at": soon})
+
+    renewal = asyncio.create_task(renew_lock(meta, "me", every=0.05))
+    await asyncio.sleep(0.2)
+    renewal.cancel()
+    lock = await meta.find_one({"_id": META_SCHEMA_LOCK})
+    assert lock["expires_at"].replace(tzinfo=timezone.utc) > soon + timedelta(minutes=1)
@@ -0,0 +1,56 @@
+import asyncio
+
+from app.core.prefetch import QuizPrefetcher
+
+
+async def test_prefetched_quiz_is_served_once():
+    prefetcher = QuizPrefetcher(max_entries=10, ttl_seconds=60)
+
+    async def build():
+        return ["q1", "q2"]
+
+    prefetcher.schedule("u1", 2, build)
+    await asyncio.sleep(0)
+    assert prefetcher.pop("u1", 2) == ["q1", "q2"]
+    assert prefetcher.pop("u1", 2) is None
+
+
+async def test_size_mismatch_and_expiry_fall_back():
+    prefetcher = QuizPrefetcher(max_entries=10, ttl_seconds=0)
+
+    async def build():
+        return ["q"]
+
+    prefetcher.schedule("u1", 1, build)
+    await asyncio.sleep(0)
+    assert prefetcher.pop("u1", 1) is None  # expired
+
+    prefetcher.ttl_seconds = 60
+    prefetcher.schedule("u1", 1, build)
+    await asyncio.sleep(0)
+    assert prefetcher.pop("u1", 5) is None  # built for a different size
+
+
+async def test_reschedule_cancels_in_flight_build_and_store_is_bounded():
+    prefetcher = QuizPrefetcher(max_entries=2, ttl_seconds=60)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "stale"
+
+    async def fast():
+        return "fresh"
+
+    prefetcher.schedule("u1", 1, slow)
+    prefetcher.schedule("u1", 1, fast)
+    release.set()
+    await asyncio.sleep(0.01)
+    assert prefetcher.pop("u1", 1) == "fresh"
+
+    for user in ("a", "b", "c"):
+        prefetcher.schedule(user, 1, fast)
+    await asyncio.sleep(0.01)
+    assert len(prefetcher) == 2
+    assert prefetcher.pop("a", 1) is None
+    assert prefetcher.last_limit("c") == 1
@@ -0,0 +1,137 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.constants import COLLECTION_PROGRESS, COLLECTION_QUIZ_HISTORY
+from app.core.progress import current_streak, progress_writes, streaks, user_rollup_pipeline
+from app.scripts.backfill_progress import backfill_progress, reconcile_pipeline, user_rollup
+from app.scripts.migrate_quiz_history import migrate_quiz_history
+
+
+def test_streaks_over_sorted_days():
+    assert streaks([]) == {"current_streak": 0, "longest_streak": 0, "last_active_day": None}
+    days = ["2024-05-01", "2024-05-02", "2024-05-03", "2024-05-07", "2024-05-08"]
+    assert streaks(days) == {"current_streak": 2, "longest_streak": 3, "last_active_day": "2024-05-08"}
+
+
+def test_current_streak_breaks_after_a_missed_day():
+    totals = {"current_streak": 4, "last_active_day": "2024-05-08"}
+    assert current_streak(totals, date(2024, 5, 8)) == 4
+    assert current_streak(totals, date(2024, 5, 9)) == 4
+    assert current_streak(totals, date(2024, 5, 10)) == 0
+    assert current_streak({}, date(2024, 5, 10)) == 0
+
+
+def test_rollup_pipeline_adds_only_given_counters():
+    stages = user_rollup_pipeline("2024-05-08", "2024-05-07", {"quizzes": 1, "wrong_answers": 2})
+    first = stages[0]["$set"]
+    assert first["quizzes"] == {"$add": [{"$ifNull": ["$quizzes", 0]}, 1]}
+    assert first["wrong_answers"] == {"$add": [{"$ifNull": ["$wrong_answers", 0]}, 2]}
+    assert "words_learned" not in first
+    assert stages[1]["$set"]["last_active_day"] == "2024-05-08"
+
+
+def test_progress_writes_validates_counters():
+    now = datetime(2024, 5, 8)
+    with pytest.raises(ValueError):
+        progress_writes(None, "u", now, typos=1)
+    assert progress_writes(None, "u", now, words_learned=0) == []
+
+
+def test_user_rollup_from_daily_docs():
+    docs = [
+        {"day": "2024-05-02", "quizzes": 1, "wrong_answers": 2},
+        {"day": "2024-05-01", "quizzes": 2, "wrong_answers": 1, "words_learned": 3},
+    ]
+    totals = user_rollup(docs, learned_count=10)
+    assert totals["quizzes"] == 3
+    assert totals["wrong_answers"] == 3
+    assert totals["words_learned"] == 10
+    assert totals["current_streak"] == 2
+    assert totals["last_active_day"] == "2024-05-02"
+
+
+def test_reconcile_only_adds_the_shortfall():
+    target = user_rollup([{"day": "2024-05-02", "quizzes": 3, "wrong_answers": 4}], learned_count=0)
+    (stage,) = reconcile_pipeline({"quizzes": 5, "wrong_answers": 1}, target)
+    update = stage["$set"]
+    # live counts ahead of the history are left alone; missing ones are added on top
+    assert update["quizzes"] == {"$add": [{"$ifNull": ["$quizzes", 0]}, 0]}
+    assert update["wrong_answers"] == {"$add": [{"$ifNull": ["$wrong_answers", 0]}, 3]}
+    assert update["longest_streak"] == {"$max": [{"$ifNull": ["$longest_streak", 0]}, 1]}
+
+
+@pytest.mark.asyncio
+async def test_progress_counts_quizzes_and_learned_words(clear_test_db, client, seed_data):
+    user_id = "progress_user"
+    r = await client.get("/vocabulary/", params={"user_id": user_id, "limit": 5})
+    assert r.status_code == 200
+
+    r = await client.get("/quiz/", params={"user_id": user_id, "limit": 3})
+    manifest = r.headers["X-Quiz-Manifest"]
+    wrong = [item["id"] for item in r.json()][:2]
+    r = await client.post("/quiz/quiz_result", json={
+        "user_id": user_id, "wrong_word_ids": wrong, "manifest": manifest,
+    })
+    assert r.status_code == 200
+
+    r = await client.get("/progress/", params={"user_id": user_id})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["quizzes"] == 1
+    assert body["questions"] == 3
+    assert body["wrong_answers"] == 2
+    assert body["words_learned"] == 5
+    assert body["current_streak"] == 1
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    assert [d["day"] for d in body["daily"]] == [today]
+
+
+@pytest.mark.asyncio
+async def test_backfill_progress_is_idempotent(clear_test_db, db_client, seed_data):
+    from app.core.config import settings
+
+    db = db_client[settings.DB_NAME]
+    today = datetime.now(timezone.utc).replace(hour=12, tzinfo=None)
+    await db[COLLECTION_QUIZ_HISTORY].insert_many([
+        {"user_id": "old_user", "wrong_word_ids": ["a", "b"], "timestamp": today - timedelta(days=1)},
+        {"user_id": "old_user", "wrong_word_ids": ["c"], "timestamp": today},
+        {"user_id": "old_user", "wrong_word_ids": ["d"], "timestamp": today},
+    ])
+    assert await migrate_quiz_history(db) == 3
+    assert await backfill_progress(db) == 1
+    assert await backfill_progress(db) == 1
+
+    totals = await db[COLLECTION_PROGRESS].find_one({"_id": "old_user"})
+    assert totals["quizzes"] == 3
+    assert totals["wrong_answers"] == 4
+    assert totals["current_streak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_backfill_covers_users_with_only_learned_words(clear_test_db, db_client):
+    from app.constants import COLLECTION_USER_LEARNED
+    from app.core.bitmap import WordBitmap
+    from app.core.config import settings
+
+    db = db_client[settings.DB_NAME]
+    learned = WordBitmap.from_indexes([1, 2, 3]).to_chunks()
+    await db[COLLECTION_USER_LEARNED].insert_one({"_id": "reader", "learned_bits": learned})
+
+    assert await backfill_progress(db) == 1
+    totals = await db[COLLECTION_PROGRESS].find_one({"_id": "reader"})
+    assert totals["words_learned"] == 3
+    assert totals["quizzes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_rollup_write_does_not_raise(capsys):
+    class Failing:
+        async def update_one(self, *args, **kwargs):
+            from pymongo.errors import AutoReconnect
+            raise AutoReconnect("primary stepped down")
+
+    writes = progress_writes({"progress": Failing(), "progress_daily": Failing()}, "u", datetime(2024, 5, 8), quizzes=1)
+    for write in writes:
+        await write
+    assert "reconciled by backfill_progress" in capsys.readouterr().out
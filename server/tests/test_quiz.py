@@ -0,0 +1,174 @@
+import json
+import pytest
+from datetime import timedelta
+from app.constants import COLLECTION_MISTAKES, COLLECTION_QUIZ_BUCKETS
+from app.core.config import settings
+from app.api.quiz import build_session
+from app.core.sampling import make_rng
+from app.data.catalog import CatalogSnapshot
+
+@pytest.mark.asyncio
+async def test_get_quiz_is_reproducible_with_seed(clear_test_db, client, seed_data):
+    params = {"user_id": "anonymous", "limit": 5, "seed": 123}
+    r1 = await client.get("/quiz/", params=params)
+    r2 = await client.get("/quiz/", params=params)
+    assert r1.status_code == 200
+    assert r1.json() == r2.json()
+    # first call loads the catalog (meta + words) and the mistakes; the repeat is all memory
+    assert r1.headers["X-DB-Round-Trips"] == "3"
+    assert r2.headers["X-DB-Round-Trips"] == "0"
+
+    body = r1.json()
+    assert len(body) == 5
+    for item in body:
+        assert item["answer"] in item["options"]
+        assert len(item["options"]) == len(set(item["options"])) == 4
+
+@pytest.mark.asyncio
+async def test_submit_quiz_result_increments_and_appends(clear_test_db, client, db_client, seed_data):
+    user_id = "quiz_user"
+    ids = [str(doc["_id"]) for doc in seed_data[:3]]
+
+    r = await client.post("/quiz/quiz_result", json={"user_id": user_id, "wrong_word_ids": ids[:2]})
+    assert r.status_code == 200
+    assert r.json()["wrong_count"] == 2
+
+    r = await client.post("/quiz/quiz_result", json={"user_id": user_id, "wrong_word_ids": ids[1:]})
+    assert r.status_code == 200
+
+    docs = await db_client[settings.DB_NAME][COLLECTION_MISTAKES].find({"user_id": user_id}).to_list(None)
+    counts = {m["word_id"]: m["count"] for m in docs}
+    assert counts == {ids[0]: 1, ids[1]: 2, ids[2]: 1}
+
+    # both submissions share the user's bucket for today
+    buckets = await db_client[settings.DB_NAME][COLLECTION_QUIZ_BUCKETS].find({"user_id": user_id}).to_list(None)
+    assert len(buckets) == 1
+    assert buckets[0]["count"] == 2
+    assert buckets[0]["wrong_count"] == 4
+    assert [s["wrong_word_ids"] for s in buckets[0]["submissions"]] == [ids[:2], ids[1:]]
+
+@pytest.mark.asyncio
+async def test_get_quiz_prioritizes_top_mistakes(clear_test_db, client, db_client, seed_data):
+    user_id = "review_user"
+    ids = [str(doc["_id"]) for doc in seed_data]
+    await db_client[settings.DB_NAME][COLLECTION_MISTAKES].insert_many([
+        {"user_id": user_id, "word_id": ids[0], "count": 1, "last_wrong": None},
+        {"user_id": user_id, "word_id": ids[1], "count": 5, "last_wrong": None},
+        {"user_id": user_id, "word_id": ids[2], "count": 3, "last_wrong": None},
+    ])
+
+    r = await client.get("/quiz/", params={"user_id": user_id, "limit": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert [item["id"] for item in body] == [ids[1], ids[2]]
+    assert all(item["is_review"] for item in body)
+
+@pytest.mark.asyncio
+async def test_submit_quiz_result_schedules_next_due(clear_test_db, client, db_client, seed_data):
+    user_id = "due_user"
+    word_id = str(seed_data[0]["_id"])
+    for _ in range(2):
+        r = await client.post("/quiz/quiz_result", json={"user_id": user_id, "wrong_word_ids": [word_id]})
+        assert r.status_code == 200
+
+    doc = await db_client[settings.DB_NAME][COLLECTION_MISTAKES].find_one({"user_id": user_id})
+    assert doc["count"] == 2
+    assert doc["next_due"] - doc["last_wrong"] == timedelta(days=3)
+
+@pytest.mark.asyncio
+async def test_submission_invalidates_cached_mistakes(clear_test_db, client, seed_data):
+    user_id = "cache_user"
+    word_id = str(seed_data[7]["_id"])
+    params = {"user_id": user_id, "limit": 3}
+
+    r = await client.get("/quiz/", params=params)
+    assert not any(item["is_review"] for item in r.json())
+
+    await client.post("/quiz/quiz_result", json={"user_id": user_id, "wrong_word_ids": [word_id]})
+    r = await client.get("/quiz/", params=params)
+    assert r.headers["X-DB-Round-Trips"] == "1"
+    assert r.json()[0]["id"] == word_id and r.json()[0]["is_review"]
+
+@pytest.mark.asyncio
+async def test_quiz_batch_streams_one_quiz_per_user(clear_test_db, client, db_client, seed_data):
+    word_id = str(seed_data[4]["_id"])
+    await client.post("/quiz/quiz_result", json={"user_id": "student_1", "wrong_word_ids": [word_id]})
+
+    r = await client.post("/quiz/batch", json={"user_ids": ["student_1", "student_2", "student_3"], "limit": 4})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    # catalog load (meta + words); all three users' mistakes come from one aggregation
+    assert r.headers["X-DB-Round-Trips"] == "3"
+
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["user_id"] for line in lines] == ["student_1", "student_2", "student_3"]
+    assert all(len(line["quiz"]) == 4 for line in lines)
+    assert lines[0]["quiz"][0]["id"] == word_id and lines[0]["quiz"][0]["is_review"]
+    assert not any(item["is_review"] for line in lines[1:] for item in line["quiz"])
+
+@pytest.mark.asyncio
+async def test_quiz_batch_session_spreads_mistakes(clear_test_db, client, db_client, seed_data):
+    ids = [str(doc["_id"]) for doc in seed_data[:4]]
+    await client.post("/quiz/quiz_result", json={"user_id": "session_user", "wrong_word_ids": ids})
+
+    r = await client.post("/quiz/batch", json={"user_id": "session_user", "count": 2, "limit": 2, "seed": 7})
+    quizzes = [json.loads(line)["quiz"] for line in r.text.splitlines()]
+    reviewed = [[item["id"] for item in quiz if item["is_review"]] for quiz in quizzes]
+    assert len(reviewed[0]) == len(reviewed[1]) == 2
+    assert not set(reviewed[0]) & set(reviewed[1])
+
+@pytest.mark.asyncio
+async def test_quiz_batch_requires_one_target(client):
+    r = await client.post("/quiz/batch", json={"user_ids": ["a"], "user_id": "b"})
+    assert r.status_code == 422
+    r = await client.post("/quiz/batch", json={"limit": 5})
+    assert r.status_code == 422
+
+@pytest.mark.asyncio
+async def test_submission_with_manifest_skips_word_lookup(clear_test_db, client, db_client, seed_data):
+    user_id = "manifest_user"
+    r = await client.get("/quiz/", params={"user_id": user_id, "limit": 3})
+    manifest = r.headers["X-Quiz-Manifest"]
+    quizzed = [item["id"] for item in r.json()]
+    never_quizzed = next(str(d["_id"]) for d in seed_data if str(d["_id"]) not in quizzed)
+
+    r = await client.post("/quiz/quiz_result", json={
+        "user_id": user_id, "wrong_word_ids": [quizzed[0], never_quizzed], "manifest": manifest,
+    })
+    assert r.status_code == 200
+    assert r.json()["wrong_count"] == 1
+    # manifest claim + mistakes bulk write + history insert + two progress rollups; no $in on words
+    assert r.headers["X-DB-Round-Trips"] == "5"
+
+    r = await client.post("/quiz/quiz_result", json={
+        "user_id": user_id, "wrong_word_ids": [quizzed[0]], "manifest": manifest,
+    })
+    assert r.status_code == 409
+
+    r = await client.post("/quiz/quiz_result", json={
+        "user_id": "someone_else", "wrong_word_ids": [quizzed[0]], "manifest": manifest,
+    })
+    assert r.status_code == 400
+
+def test_build_session_does_not_repeat_words():
+    n = 40
+    words = CatalogSnapshot([f"w{i}" for i in range(n)], range(n), [f"m{i}" for i in range(n)],
+                            [f"e{i}" for i in range(n)], 1)
+    mistakes = [{"id": "w0"}, {"id": "w1"}, {"id": "w2"}]
+    session = build_session(words, mistakes, limit=5, count=6, rng=make_rng(3))
+
+    assert [len(quiz) for quiz in session] == [5] * 6
+    ids = [item.id for quiz in session for item in quiz]
+    assert len(set(ids)) == 30
+    assert [item.id for item in session[0] if item.is_review] == ["w0", "w1", "w2"]
+    assert not any(item.is_review for quiz in session[1:] for item in quiz)
+
+    # a session longer than the catalog still fills every quiz
+    session = build_session(words, [], limit=10, count=6, rng=make_rng(3))
+    assert [len(quiz) for quiz in session] == [10] * 6
+
+@pytest.mark.asyncio
+async def test_get_quiz_rejects_out_of_range_limits(client):
+    for limit in (0, 101, 10**20):
+        r = await client.get("/quiz/", params={"user_id": "anonymous", "limit": limit})
+        assert r.status_code == 422
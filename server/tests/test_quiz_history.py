@@ -0,0 +1,92 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.constants import COLLECTION_QUIZ_BUCKETS, COLLECTION_QUIZ_HISTORY
+from app.core.config import settings
+from app.core.history import bucket_update
+from app.scripts import compact_quiz_history as compact_quiz_history_module
+from app.scripts.compact_quiz_history import archive_path, compact_quiz_history, write_archive
+from app.scripts.migrate_quiz_history import legacy_day_to_buckets, migrate_quiz_history
+
+
+def test_bucket_update_targets_open_bucket_for_the_day():
+    now = datetime(2024, 5, 8, 23, 59)
+    filter, update = bucket_update("u", ["a", "b"], now, bucket_size=50)
+    assert filter == {"user_id": "u", "day": "2024-05-08", "count": {"$lt": 50}}
+    assert update["$push"] == {"submissions": {"at": now, "wrong_word_ids": ["a", "b"]}}
+    assert update["$inc"] == {"count": 1, "wrong_count": 2}
+
+
+def test_legacy_day_is_split_into_full_buckets():
+    at = datetime(2024, 5, 8)
+    row = {
+        "_id": {"user_id": "u", "day": "2024-05-08"},
+        "submissions": [{"at": at + timedelta(minutes=i), "wrong_word_ids": ["x"] * i} for i in range(5)],
+    }
+    writes = legacy_day_to_buckets(row, bucket_size=2)
+    docs = [w._doc for w in writes]
+    assert [d["_id"] for d in docs] == ["legacy:u:2024-05-08:0", "legacy:u:2024-05-08:1", "legacy:u:2024-05-08:2"]
+    assert [d["count"] for d in docs] == [2, 2, 1]
+    assert docs[1]["wrong_count"] == 5
+    assert docs[1]["first"] == at + timedelta(minutes=2)
+
+
+def test_write_archive_appends_gzip_members(tmp_path):
+    path = archive_path(str(tmp_path), "2024-05-08")
+    assert path.endswith("2024-05/2024-05-08.jsonl.gz")
+    write_archive(path, [{"_id": "a", "count": 1}])
+    write_archive(path, [{"_id": "b", "count": 2}])
+    with gzip.open(path, "rt") as f:
+        assert [json.loads(line)["_id"] for line in f] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_compaction_archives_only_expired_buckets(clear_test_db, db_client, tmp_path):
+    db = db_client[settings.DB_NAME]
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=40)
+    for when in (old, old, now):
+        await db[COLLECTION_QUIZ_BUCKETS].update_one(*bucket_update("u", ["w"], when, bucket_size=1), upsert=True)
+
+    days, buckets = await compact_quiz_history(db, retention_days=30, archive_dir=str(tmp_path), now=now)
+    assert (days, buckets) == (1, 2)
+    remaining = await db[COLLECTION_QUIZ_BUCKETS].find().to_list(None)
+    assert [b["day"] for b in remaining] == [now.strftime("%Y-%m-%d")]
+    with gzip.open(archive_path(str(tmp_path), old.strftime("%Y-%m-%d")), "rt") as f:
+        assert len(f.readlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_compaction_flushes_whole_users(clear_test_db, db_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(compact_quiz_history_module, "FLUSH_BUCKETS", 2)
+    db = db_client[settings.DB_NAME]
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=40)
+    for user_id in ("b", "a", "b", "a", "a", "c"):
+        await db[COLLECTION_QUIZ_BUCKETS].update_one(*bucket_update(user_id, ["w"], old, bucket_size=1), upsert=True)
+
+    days, buckets = await compact_quiz_history(db, retention_days=30, archive_dir=str(tmp_path), now=now)
+    assert (days, buckets) == (1, 6)
+    assert await db[COLLECTION_QUIZ_BUCKETS].count_documents({}) == 0
+    with gzip.open(archive_path(str(tmp_path), old.strftime("%Y-%m-%d")), "rt") as f:
+        assert [json.loads(line)["user_id"] for line in f] == ["a", "a", "a", "b", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_migration_is_idempotent(clear_test_db, db_client):
+    db = db_client[settings.DB_NAME]
+    at = datetime(2024, 5, 8, 12)
+    await db[COLLECTION_QUIZ_HISTORY].insert_many([
+        {"user_id": "u", "wrong_word_ids": ["a"], "timestamp": at},
+        {"user_id": "u", "wrong_word_ids": ["b", "c"], "timestamp": at + timedelta(hours=1)},
+    ])
+    assert await migrate_quiz_history(db) == 2
+    assert await migrate_quiz_history(db, drop_legacy=True) == 2
+
+    buckets = await db[COLLECTION_QUIZ_BUCKETS].find().to_list(None)
+    assert len(buckets) == 1
+    assert buckets[0]["count"] == 2 and buckets[0]["wrong_count"] == 3
+    assert COLLECTION_QUIZ_HISTORY not in await db.list_collection_names()
@@ -0,0 +1,37 @@
+from app.core.sampling import make_rng, sample_distractors, sample_indices
+
+
+def test_sample_indices_are_distinct_and_skip_excluded():
+    rng = make_rng(1)
+    picked = sample_indices(1000, 50, rng, exclude={0, 1, 2})
+    assert len(picked) == 50
+    assert len(set(picked)) == 50
+    assert not {0, 1, 2} & set(picked)
+
+
+def test_sample_indices_dense_exclusion_returns_remainder():
+    rng = make_rng(2)
+    picked = sample_indices(5, 10, rng, exclude={0, 2})
+    assert sorted(picked) == [1, 3, 4]
+
+
+def test_sample_distractors_never_returns_correct_or_duplicates():
+    pool = ["fire", "water", "water", "land", "sky", "fire"]
+    rng = make_rng(3)
+    for _ in range(50):
+        picked = sample_distractors(pool, "fire", 3, rng)
+        assert "fire" not in picked
+        assert len(picked) == len(set(picked)) == 3
+
+
+def test_sample_distractors_small_pool():
+    assert sample_distractors(["fire"], "fire", 3, make_rng(4)) == []
+    assert sample_distractors(["fire", "land"], "fire", 3, make_rng(4)) == ["land"]
+
+
+def test_same_seed_same_draws():
+    pool = [f"word{i}" for i in range(10_000)]
+    a = sample_distractors(pool, "word0", 3, make_rng(42))
+    b = sample_distractors(pool, "word0", 3, make_rng(42))
+    assert a == b
+    assert sample_indices(10_000, 10, make_rng(7)) == sample_indices(10_000, 10, make_rng(7))
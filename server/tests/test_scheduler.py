@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from app.core.scheduler import POLICIES, FixedIntervalPolicy
+
+
+def test_fixed_policy_intervals():
+    policy = POLICIES["fixed"]
+    assert policy.interval(1) == timedelta(days=1)
+    assert policy.interval(2) == timedelta(days=3)
+    assert policy.interval(3) == timedelta(days=7)
+    assert policy.interval(10) == timedelta(days=7)
+
+
+def test_fixed_policy_stages_match_python_intervals():
+    policy = FixedIntervalPolicy([(0, timedelta(days=1)), (5, timedelta(days=30))])
+    (stage,) = policy.update_stages()
+    switch = stage["$set"]["next_due"]["$add"][1]["$switch"]
+    assert switch["branches"] == [{"case": {"$gte": ["$count", 5]}, "then": 30 * 86_400_000}]
+    assert switch["default"] == 86_400_000
+
+
+def evaluate_interval_ms(switch, count):
+    for branch in switch["branches"]:
+        field, min_count = branch["case"]["$gte"]
+        assert field == "$count"
+        if count >= min_count:
+            return branch["then"]
+    return switch["default"]
+
+
+def test_pipeline_interval_matches_interval_for_every_count():
+    custom = FixedIntervalPolicy([(0, timedelta(days=1)), (5, timedelta(days=30))])
+    for policy in (POLICIES["fixed"], custom):
+        (stage,) = policy.update_stages()
+        last_wrong, switch = stage["$set"]["next_due"]["$add"]
+        assert last_wrong == "$last_wrong"
+        for count in range(12):
+            ms = evaluate_interval_ms(switch["$switch"], count)
+            assert timedelta(milliseconds=ms) == policy.interval(count), count
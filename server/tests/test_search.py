@@ -0,0 +1,92 @@
+import time
+
+from app.core.search import WordSearchIndex, normalize
+from app.data.catalog import CatalogSnapshot
+
+WORDS = [
+    ("w0", "āhua", "shape, form"),
+    ("w1", "āhuatanga", "characteristic, feature"),
+    ("w2", "ahi", "fire"),
+    ("w3", "whare", "house, building"),
+    ("w4", "wharekai", "dining hall"),
+    ("w5", "kai-hoko", "shopkeeper, trader"),
+]
+
+
+def snapshot(words, version=1):
+    ids, maori, english = zip(*words)
+    return CatalogSnapshot(ids, range(len(ids)), maori, english, version)
+
+
+def build(words=WORDS):
+    index = WordSearchIndex()
+    index.sync(snapshot(words))
+    return index
+
+
+def test_normalize_drops_macrons_and_punctuation():
+    assert normalize("Whakapākehā!") == "whakapakeha"
+    assert normalize("kai-hoko") == "kai hoko"
+    assert normalize("  Ō ") == "o"
+
+
+def test_exact_and_prefix_ignore_macrons():
+    index = build()
+    assert index.search("ahua", mode="exact") == [("w0", "exact", 0)]
+    assert [w for w, *_ in index.search("āhu", mode="prefix")] == ["w0", "w1"]
+    assert [w for w, *_ in index.search("whare", mode="prefix")] == ["w3", "w4"]
+    assert index.search("whare", mode="prefix")[0][1] == "exact"
+
+
+def test_fuzzy_is_bounded_by_edit_distance():
+    index = build()
+    assert index.search("whaer", mode="fuzzy", max_distance=2)[0] == ("w3", "fuzzy", 2)
+    assert index.search("whaer", mode="fuzzy", max_distance=1) == []
+    assert index.search("kai hoki", mode="fuzzy") == [("w5", "fuzzy", 1)]
+
+
+def test_english_requires_every_token():
+    index = build()
+    assert index.search("dining hall", mode="english") == [("w4", "english", 0)]
+    assert index.search("the fire", mode="english") == [("w2", "english", 0)]
+    assert index.search("fire hall", mode="english") == []
+
+
+def test_auto_ranks_exact_then_prefix_then_fuzzy():
+    index = build()
+    assert index.search("ahu", limit=5) == [("w0", "prefix", 0), ("w1", "prefix", 0), ("w2", "fuzzy", 1)]
+    assert index.search("ahi", limit=5)[0] == ("w2", "exact", 0)
+
+
+def test_sync_reindexes_only_changed_words():
+    index = build()
+    first = index.snapshot
+    assert index.sync(first) == 0
+
+    edited = [w for w in WORDS if w[0] != "w2"] + [("w3", "whare", "house"), ("w6", "wai", "water")]
+    edited = list({w[0]: w for w in edited}.values())
+    assert index.sync(snapshot(edited, version=2)) == 3  # w2 removed, w3 edited, w6 added
+    assert index.search("ahi", mode="exact") == []
+    assert index.search("building", mode="english") == []
+    assert index.search("water", mode="english") == [("w6", "english", 0)]
+    # the removed word's trie branch is pruned, its neighbours stay
+    assert "i" not in index.trie.root.children["a"].children["h"].children
+    assert [w for w, *_ in index.search("ahu", mode="prefix")] == ["w0", "w1"]
+
+
+def test_lookups_stay_fast_on_a_large_catalog():
+    words = [(f"w{i}", f"kupu{i:05d}", f"gloss {i}") for i in range(50000)]
+    index = build(words)
+    started = time.perf_counter()
+    for query in ("kupu1234", "kupu4999", "kupu00042"):
+        index.search(query, mode="prefix")
+        index.search(query, mode="exact")
+    assert (time.perf_counter() - started) / 6 < 0.005
+
+
+async def test_follow_applies_the_diff_once_per_snapshot():
+    index = WordSearchIndex()
+    words = snapshot(WORDS)
+    assert await index.follow(words) == len(WORDS)
+    assert await index.follow(words) == 0
+    assert index.search("ahi", mode="exact") == [("w2", "exact", 0)]
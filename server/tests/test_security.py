@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.security import PasswordHasher, PasswordPoolSaturated
+
+
+async def test_jobs_run_off_the_event_loop():
+    pool = PasswordHasher(workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+    job_thread = await pool.run(threading.get_ident)
+    assert job_thread != loop_thread
+    assert pool.stats()["completed"] == 1
+
+
+async def test_saturated_pool_rejects_immediately():
+    pool = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    first = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordPoolSaturated):
+        await pool.run(lambda: None)
+    assert pool.rejected == 1
+
+    release.set()
+    assert await first is True
+    assert pool.pending == 0
+
+
+async def test_cancelled_caller_keeps_running_job_pending():
+    pool = PasswordHasher(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+
+    caller = asyncio.ensure_future(pool.run(slow))
+    await asyncio.to_thread(started.wait)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    # bcrypt is still running in the pool, so the slot is still taken
+    assert pool.pending == 1
+    with pytest.raises(PasswordPoolSaturated):
+        await pool.run(lambda: None)
+
+    release.set()
+    while pool.pending:
+        await asyncio.sleep(0.001)
+    assert await pool.run(lambda: "ok") == "ok"
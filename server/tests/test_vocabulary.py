@@ -1,12 +1,17 @@
 import pytest 
 from datetime import datetime, timedelta
+import io
+import json
 import math
 from app.constants import (
     COLLECTION_NAME,
     COLLECTION_USER_LEARNED,
-    COLLECTION_USER_MISTAKES,
+    COLLECTION_MISTAKES,
 )
 from app.core.config import settings
+from app.core.bitmap import WordBitmap
+from app.core.cache import read_cache
+from app.scripts.import_words import import_words
 
 @pytest.mark.asyncio
 async def test_get_vocabulary_empty(clear_test_db, client):
@@ -46,18 +51,19 @@ async def test_get_vocabulary_priority_rules(clear_test_db, client, db_client, s
     not_due_ids = seed_ids[3:5]
     mistakes = []
     for _id in due_ids:
-        mistakes.append({"id": _id, "last_wrong": now - timedelta(days=2), "count": 1})
+        last_wrong = now - timedelta(days=2)
+        mistakes.append({"user_id": user_id, "word_id": _id, "last_wrong": last_wrong,
+                         "next_due": last_wrong + timedelta(days=1), "count": 1})
     for _id in not_due_ids:
-        mistakes.append({"id": _id, "last_wrong": now, "count": 1})
-    await db_client[settings.DB_NAME][COLLECTION_USER_MISTAKES].insert_one({
-        "_id": user_id,
-        "wrong_words": mistakes
-    })
+        mistakes.append({"user_id": user_id, "word_id": _id, "last_wrong": now,
+                         "next_due": now + timedelta(days=1), "count": 1})
+    await db_client[settings.DB_NAME][COLLECTION_MISTAKES].insert_many(mistakes)
 
     # 2) Learned IDs (won't be needed here because unlearned are enough)
     learned_ids = set(seed_ids[5:8])
+    learned = WordBitmap.from_indexes(doc["idx"] for doc in seed_data[5:8])
     await db_client[settings.DB_NAME][COLLECTION_USER_LEARNED].insert_one({
-        "_id": user_id, "learned_ids": list(learned_ids)
+        "_id": user_id, "learned_bits": learned.to_chunks()
     })
 
     # call endpoint
@@ -83,4 +89,88 @@ async def test_get_vocabulary_priority_rules(clear_test_db, client, db_client, s
     # 3) Since there were plenty of unlearned, no learned words should appear
     last_segment = [item["id"] for item in results if item["id"] in learned_ids]
     assert last_segment == [], "Learned words only appear if unlearned pool was insufficient"
-    
\ No newline at end of file
+    
+@pytest.mark.asyncio
+async def test_get_vocabulary_never_serves_due_mistakes_as_new(clear_test_db, client, db_client, seed_data):
+    """
+    Due mistakes beyond the review slots must not come back as "new" words,
+    however many of them there are compared to `limit`.
+    """
+    user_id = "test_user"
+    limit = 5
+    now = datetime.utcnow()
+    due_ids = [str(doc["_id"]) for doc in seed_data[:limit + 3]]
+    await db_client[settings.DB_NAME][COLLECTION_MISTAKES].insert_many([
+        {"user_id": user_id, "word_id": _id, "last_wrong": now - timedelta(days=2),
+         "next_due": now - timedelta(days=1), "count": 1}
+        for _id in due_ids
+    ])
+
+    response = await client.get("/vocabulary/", params={"user_id": user_id, "limit": limit})
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()]
+    assert len(ids) == limit
+    assert ids[0] in due_ids
+    assert not any(_id in due_ids for _id in ids[1:])
+
+@pytest.mark.asyncio
+async def test_get_vocabulary_marks_words_learned_in_bitmap(clear_test_db, client, db_client, seed_data):
+    user_id = "bitmap_user"
+    r = await client.get("/vocabulary/", params={"user_id": user_id, "limit": 4})
+    assert r.status_code == 200
+    returned = {item["id"] for item in r.json()}
+
+    doc = await db_client[settings.DB_NAME][COLLECTION_USER_LEARNED].find_one({"_id": user_id})
+    learned = WordBitmap.from_chunks(doc["learned_bits"])
+    assert {str(d["_id"]) for d in seed_data if d["idx"] in learned} == returned
+
+@pytest.mark.asyncio
+async def test_stale_learned_cache_does_not_recount_words(clear_test_db, client, db_client, seed_data):
+    user_id = "stale_user"
+    # another worker already taught the first four words, but this worker's cache says none
+    learned = WordBitmap.from_indexes(doc["idx"] for doc in seed_data[:4])
+    await db_client[settings.DB_NAME][COLLECTION_USER_LEARNED].insert_one({
+        "_id": user_id, "learned_bits": learned.to_chunks()
+    })
+    await read_cache.set(user_id, "learned", {})
+
+    r = await client.get("/vocabulary/", params={"user_id": user_id, "limit": 6})
+    assert r.status_code == 200
+    r = await client.get("/progress/", params={"user_id": user_id})
+    assert r.json()["words_learned"] == 2
+
+@pytest.mark.asyncio
+async def test_search_vocabulary_ignores_macrons(clear_test_db, client, seed_data):
+    word = next(d for d in seed_data if d["maori"] == "āwhina")
+    r = await client.get("/vocabulary/search", params={"q": "awhina"})
+    assert r.status_code == 200
+    assert r.json()[0] == {"id": str(word["_id"]), "maori": "āwhina", "english": word["english"],
+                           "match": "exact", "distance": 0}
+
+    r = await client.get("/vocabulary/search", params={"q": "awhna", "mode": "fuzzy"})
+    assert [m["maori"] for m in r.json()] == ["āwhina"]
+
+    r = await client.get("/vocabulary/search", params={"q": "x", "max_distance": 3})
+    assert r.status_code == 422
+
+@pytest.mark.asyncio
+async def test_catalog_export_and_delta(clear_test_db, client, db_client, seed_data):
+    r = await client.get("/vocabulary/catalog", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "gzip"
+    body = r.json()
+    assert len(body["words"]) == len(seed_data)
+    assert body["words"][0] == {"id": str(seed_data[0]["_id"]), "maori": seed_data[0]["maori"],
+                                "english": seed_data[0]["english"]}
+
+    r = await client.get("/vocabulary/catalog", headers={"If-None-Match": r.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert r.status_code == 304
+
+    version = body["version"]
+    edited = [{"maori": seed_data[0]["maori"], "english": "edited"}]
+    await import_words(db_client[settings.DB_NAME], io.StringIO(json.dumps(edited)))
+
+    r = await client.get("/vocabulary/catalog", params={"since": version})
+    delta = r.json()
+    assert delta["version"] == version + 1
+    assert [w["english"] for w in delta["words"]] == ["edited"]